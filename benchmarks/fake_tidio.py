@@ -0,0 +1,387 @@
+"""
+Local stand-in for the Tidio OpenAPI, with simulated latency, rate limits and
+errors. Serves deterministic accounts of any size for benchmarks.
+
+Run from the repository root:
+
+    uv run python -m benchmarks.fake_tidio --port 8900 --latency 0.05
+
+and point the server at it with TIDIO_API_BASE_URL=http://127.0.0.1:8900.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, fields
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+WORDS = (
+    "hello order premium plan charged twice invoice refund duplicate payment "
+    "support contact form login password reset account delivery shipping "
+    "address package tracking number cancel subscription upgrade thanks"
+).split()
+
+
+@dataclass(frozen=True)
+class FakeTidioConfig:
+    """
+    Attributes:
+        latency (float): Seconds added to every response.
+        jitter (float): Up to this many seconds are randomly added to latency.
+        rate_limit (int): Requests per second, further ones get 429. 0 disables.
+        error_rate (float): Share of requests failing with 503.
+        tickets (int): Number of tickets.
+        contacts (int): Number of contacts.
+        operators (int): Number of operators.
+        messages (int): Messages per ticket. Ticket 1 also has one message
+            longer than the default response text limit of the server.
+        message_size (int): Approximate length of a message in characters.
+        page_size (int): Items per list page.
+        seed (int): Seed of the generated data and simulated failures.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit: int = 0
+    error_rate: float = 0.0
+    tickets: int = 500
+    contacts: int = 2000
+    operators: int = 20
+    messages: int = 10
+    message_size: int = 400
+    page_size: int = 100
+    seed: int = 0
+
+
+class FakeTidio:
+    """
+    Generates the account lazily and keeps encoded responses, so the stand-in
+    stays cheap next to the server under test.
+    """
+
+    def __init__(self, config: FakeTidioConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._window = 0
+        self._window_requests = 0
+        self._ticket_bodies: dict[int, bytes] = {}
+        self._next_id = config.tickets + 1
+        self.requests = 0
+
+    def department(self, index: int) -> dict:
+        return {"id": _uuid(1, index), "name": f"Department {index}"}
+
+    def operator(self, index: int) -> dict:
+        return {
+            "id": _uuid(2, index),
+            "name": f"Operator {index}",
+            "email": f"operator{index}@example.com",
+        }
+
+    def contact(self, index: int) -> dict:
+        return {
+            "id": _uuid(3, index),
+            "email": f"contact{index}@example.com",
+            "first_name": f"First{index}",
+            "last_name": f"Last{index}",
+            "phone": f"+48{index:09d}",
+            "created_at": _timestamp(index),
+        }
+
+    def ticket(self, ticket_id: int) -> dict:
+        rng = random.Random(self.config.seed * 1_000_003 + ticket_id)
+
+        return {
+            "id": ticket_id,
+            "subject": _text(rng, 40),
+            "status": rng.choice(["open", "pending", "solved"]),
+            "priority": rng.choice(["low", "normal", "urgent"]),
+            "contact_id": _uuid(3, ticket_id % max(1, self.config.contacts)),
+            "contact_email": f"contact{ticket_id}@example.com",
+            "assigned_operator_id": _uuid(2, rng.randrange(self.config.operators)),
+            "assigned_department_id": _uuid(1, rng.randrange(5)),
+            "created_at": _timestamp(ticket_id),
+            "updated_at": _timestamp(ticket_id + 1),
+        }
+
+    def ticket_details(self, ticket_id: int) -> bytes:
+        body = self._ticket_bodies.get(ticket_id)
+        if body is None:
+            rng = random.Random(self.config.seed * 7_000_003 + ticket_id)
+            messages = [
+                {
+                    "id": ticket_id * 10_000 + index,
+                    "type": rng.choice(["contact", "operator", "note"]),
+                    "message_content": f"<p>{_text(rng, self.config.message_size)}</p>",
+                    "author_id": _uuid(2, rng.randrange(self.config.operators)),
+                    "created_at": _timestamp(ticket_id + index),
+                    "attachments": [],
+                }
+                for index in range(self.config.messages)
+            ]
+            if ticket_id == 1 and messages:
+                messages[0]["message_content"] = _text(rng, 12_000)
+
+            body = json.dumps({**self.ticket(ticket_id), "messages": messages})
+            self._ticket_bodies[ticket_id] = body = body.encode()
+
+        return body
+
+    def page(self, request: Request, items_key: str, total: int, item) -> Response:
+        start = int(request.query_params.get("cursor") or 0)
+        end = min(total, start + self.config.page_size)
+
+        return _json(
+            {
+                items_key: [item(index) for index in range(start, end)],
+                "meta": {
+                    "cursor": str(end) if end < total else None,
+                    "limit": self.config.page_size,
+                },
+            }
+        )
+
+    def new_id(self) -> int:
+        self._next_id += 1
+
+        return self._next_id
+
+    def simulate(self) -> Response | None:
+        """
+        Returns:
+            Response | None: A rate limit or error response to send instead of
+                the real one.
+        """
+        self.requests += 1
+
+        if self.config.rate_limit:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window = window
+                self._window_requests = 0
+
+            self._window_requests += 1
+            if self._window_requests > self.config.rate_limit:
+                return _json(
+                    {"message": "Too many requests"},
+                    status_code=429,
+                    headers={
+                        "Retry-After": "1",
+                        "X-RateLimit-Remaining": "0",
+                    },
+                )
+
+        if self._rng.random() < self.config.error_rate:
+            return _json({"message": "Service unavailable"}, status_code=503)
+
+        return None
+
+    async def delay(self) -> None:
+        latency = self.config.latency + self._rng.uniform(0, self.config.jitter)
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+
+def create_app(config: FakeTidioConfig = None) -> Starlette:
+    """
+    Build the ASGI app of the stand-in.
+    """
+    fake = FakeTidio(config or FakeTidioConfig())
+
+    def endpoint(handler):
+        async def simulated(request: Request) -> Response:
+            await fake.delay()
+
+            return fake.simulate() or await handler(request)
+
+        return simulated
+
+    async def departments(request: Request) -> Response:
+        return _json({"departments": [fake.department(index) for index in range(5)]})
+
+    async def operators(request: Request) -> Response:
+        return fake.page(request, "operators", fake.config.operators, fake.operator)
+
+    async def contacts(request: Request) -> Response:
+        email = request.query_params.get("email")
+        if email is None:
+            return fake.page(request, "contacts", fake.config.contacts, fake.contact)
+
+        index = email.removeprefix("contact").removesuffix("@example.com")
+        matches = []
+        if index.isdigit() and int(index) < fake.config.contacts:
+            matches.append(fake.contact(int(index)))
+
+        return _json({"contacts": matches, "meta": {"cursor": None}})
+
+    async def contact(request: Request) -> Response:
+        contact_id = request.path_params["contact_id"]
+        index = _uuid_index(contact_id, 3)
+        if index is None or index >= fake.config.contacts:
+            return _json({"message": "Contact not found"}, status_code=404)
+
+        if request.method == "DELETE":
+            return Response(status_code=204)
+
+        return _json(fake.contact(index))
+
+    async def contacts_batch(request: Request) -> Response:
+        body = json.loads(await request.body())
+        if request.method == "PATCH":
+            return Response(status_code=204)
+
+        return _json(
+            {
+                "contacts": [
+                    {"id": _uuid(3, fake.new_id()), "email": contact.get("email")}
+                    for contact in body.get("contacts") or []
+                ]
+            }
+        )
+
+    async def tickets(request: Request) -> Response:
+        if request.method == "PATCH":
+            return Response(status_code=204)
+
+        return fake.page(
+            request,
+            "tickets",
+            fake.config.tickets,
+            lambda index: fake.ticket(index + 1),
+        )
+
+    async def ticket(request: Request) -> Response:
+        ticket_id = request.path_params["ticket_id"]
+        if not 1 <= ticket_id <= fake.config.tickets:
+            return _json({"message": "Ticket not found"}, status_code=404)
+
+        if request.method in ("PATCH", "DELETE"):
+            return Response(status_code=204)
+
+        return Response(fake.ticket_details(ticket_id), media_type="application/json")
+
+    async def create_ticket(request: Request) -> Response:
+        return _json({"id": fake.new_id()})
+
+    async def reply(request: Request) -> Response:
+        return _json({"id": fake.new_id()})
+
+    return Starlette(
+        routes=[
+            Route("/departments", endpoint(departments)),
+            Route("/operators", endpoint(operators)),
+            Route("/contacts", endpoint(contacts)),
+            Route(
+                "/contacts/batch", endpoint(contacts_batch), methods=["POST", "PATCH"]
+            ),
+            Route(
+                "/contacts/{contact_id}", endpoint(contact), methods=["GET", "DELETE"]
+            ),
+            Route("/tickets", endpoint(tickets), methods=["GET", "PATCH"]),
+            Route("/tickets/as-contact", endpoint(create_ticket), methods=["POST"]),
+            Route(
+                "/tickets/{ticket_id:int}",
+                endpoint(ticket),
+                methods=["GET", "PATCH", "DELETE"],
+            ),
+            Route("/tickets/{ticket_id:int}/reply", endpoint(reply), methods=["POST"]),
+        ]
+    )
+
+
+def _json(data: dict, status_code: int = 200, headers: dict = None) -> Response:
+    return Response(
+        json.dumps(data),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def _text(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+
+    return " ".join(words)
+
+
+def _uuid(kind: int, index: int) -> str:
+    return f"{kind:08x}-0000-4000-8000-{index:012x}"
+
+
+def _uuid_index(value: str, kind: int) -> int | None:
+    prefix = f"{kind:08x}-0000-4000-8000-"
+    if not value.startswith(prefix):
+        return None
+
+    try:
+        return int(value[len(prefix) :], 16)
+    except ValueError:
+        return None
+
+
+def _timestamp(index: int) -> str:
+    day, hour = divmod(index, 24)
+
+    return f"2025-{1 + day // 28 % 12:02d}-{1 + day % 28:02d}T{hour:02d}:00:00+00:00"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add an option for every FakeTidioConfig field, e.g. --error-rate.
+    """
+    for config_field in fields(FakeTidioConfig):
+        parser.add_argument(
+            f"--{config_field.name.replace('_', '-')}",
+            type=type(config_field.default),
+            default=config_field.default,
+        )
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeTidioConfig:
+    return FakeTidioConfig(
+        **{
+            config_field.name: getattr(args, config_field.name)
+            for config_field in fields(FakeTidioConfig)
+        }
+    )
+
+
+def config_to_arguments(config: FakeTidioConfig) -> list[str]:
+    arguments = []
+    for config_field in fields(FakeTidioConfig):
+        value = getattr(config, config_field.name)
+        arguments += [f"--{config_field.name.replace('_', '-')}", str(value)]
+
+    return arguments
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(config_from_arguments(args)),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
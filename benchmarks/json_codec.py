@@ -0,0 +1,148 @@
+"""
+Compare JSON codecs on realistic Tidio payloads.
+
+Run from the repository root:
+
+    uv run python -m benchmarks.json_codec
+"""
+
+import argparse
+import json
+import random
+import timeit
+
+import json_codec
+from json_codec import CODECS, get_codec
+
+LOREM = (
+    "Hello, I ordered the premium plan last week but I was charged twice. "
+    "Could you please check my invoice and refund the duplicate payment? "
+    "I already tried to contact support through the contact form. "
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(LOREM) for _ in range(words))
+
+
+def ticket(rng: random.Random, ticket_id: int, messages: int) -> dict:
+    """
+    A ticket as returned by GET /tickets/{ticket_id}.
+    """
+    return {
+        "id": ticket_id,
+        "subject": _text(rng, 8),
+        "status": rng.choice(["open", "pending", "solved"]),
+        "priority": rng.choice(["low", "normal", "urgent"]),
+        "contact_id": f"{rng.getrandbits(128):032x}",
+        "assigned_operator_id": f"{rng.getrandbits(64):016x}",
+        "assigned_department_id": rng.randint(1, 20),
+        "created_at": "2025-03-01T12:00:00+00:00",
+        "updated_at": "2025-03-02T08:30:00+00:00",
+        "tags": rng.sample(["billing", "refund", "bug", "vip", "login"], 2),
+        "messages": [
+            {
+                "id": ticket_id * 1000 + index,
+                "type": rng.choice(["contact", "operator", "note"]),
+                "message_content": f"<p>{_text(rng, 60)}</p><br><p>{_text(rng, 30)}</p>",
+                "author_id": f"{rng.getrandbits(64):016x}",
+                "created_at": "2025-03-01T12:05:00+00:00",
+                "attachments": [],
+            }
+            for index in range(messages)
+        ],
+    }
+
+
+def payloads(seed: int = 0) -> dict[str, dict]:
+    rng = random.Random(seed)
+
+    return {
+        "tickets page (100 tickets)": {
+            "tickets": [
+                {k: v for k, v in ticket(rng, i, 0).items() if k != "messages"}
+                for i in range(100)
+            ],
+            "meta": {"cursor": "abc", "limit": 100},
+        },
+        "ticket details (200 messages)": ticket(rng, 1, 200),
+        "tickets details (20 x 50 messages)": {
+            "tickets": [ticket(rng, i, 50) for i in range(20)]
+        },
+    }
+
+
+def _best(statement, number: int) -> float:
+    """
+    Returns:
+        float: Best time of one call in microseconds.
+    """
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+
+def run(number: int) -> list[dict]:
+    codecs = [
+        get_codec(name)
+        for name, module in [
+            ("json", json),
+            ("orjson", json_codec.orjson),
+            ("msgspec", json_codec.msgspec),
+        ]
+        if name in CODECS and module is not None
+    ]
+
+    results = []
+    for payload_name, payload in payloads().items():
+        # The baseline is what the client and FastMCP did before: default
+        # stdlib json.dumps and json.loads of the whole body.
+        raw = json.dumps(payload).encode()
+        baseline = {
+            "decode": _best(lambda raw=raw: json.loads(raw), number),
+            "encode": _best(lambda p=payload: json.dumps(p).encode(), number),
+        }
+
+        for codec in codecs:
+            encoded = codec.dumps(payload)
+            decode = _best(lambda c=codec, e=encoded: c.loads(e), number)
+            encode = _best(lambda c=codec, p=payload: c.dumps(p), number)
+            results.append(
+                {
+                    "payload": payload_name,
+                    "codec": codec.name,
+                    "size_kb": len(encoded) / 1024,
+                    "decode_us": decode,
+                    "encode_us": encode,
+                    "decode_speedup": baseline["decode"] / decode,
+                    "encode_speedup": baseline["encode"] / encode,
+                }
+            )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=50, help="Calls per round")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.number)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'payload':<36} {'codec':<8} {'KiB':>7} {'decode µs':>10} "
+        f"{'x':>5} {'encode µs':>10} {'x':>5}"
+    )
+    for row in results:
+        print(
+            f"{row['payload']:<36} {row['codec']:<8} {row['size_kb']:>7.1f} "
+            f"{row['decode_us']:>10.1f} {row['decode_speedup']:>5.1f} "
+            f"{row['encode_us']:>10.1f} {row['encode_speedup']:>5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
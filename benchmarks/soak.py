@@ -0,0 +1,420 @@
+"""
+Load and soak test of the server over the MCP protocol.
+
+Run from the repository root:
+
+    uv run python -m benchmarks.soak --transport streamable-http --sessions 20 \
+        --duration 3600 --latency 0.05
+
+Spawns the server against the local Tidio API stand-in, opens concurrent MCP
+client sessions and replays a mix of tool calls. Unlike benchmarks.suite every
+call goes through JSON-RPC, the transport and pydantic, as in production. Every
+interval it reports protocol level latency and the memory of the server
+processes, so leaks show up as steady RSS growth.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from benchmarks.fake_tidio import (
+    add_config_arguments,
+    config_from_arguments,
+    config_to_arguments,
+)
+from benchmarks.suite import (
+    SCENARIOS,
+    configure_server_environment,
+    free_port,
+    percentile,
+    start_fake_tidio,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Relative weights of the replayed tool calls, roughly what an agent triaging
+# tickets does.
+TOOL_MIX = {
+    "get_tickets": 20,
+    "get_ticket_details": 25,
+    "search_tickets": 15,
+    "get_contacts": 8,
+    "get_contact_details": 10,
+    "get_departments": 4,
+    "get_operators": 4,
+    "update_ticket": 6,
+    "reply_to_a_ticket": 4,
+    "add_internal_note_to_a_ticket": 4,
+}
+
+
+@dataclass
+class Window:
+    """
+    Calls completed since the last report.
+    """
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+@dataclass
+class Totals:
+    calls: int = 0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    samples: list[dict] = field(default_factory=list)
+
+
+def _rss_mb(pids: list[int]) -> float | None:
+    """
+    Returns:
+        float | None: Total resident memory of the processes, or None where
+            /proc is not available.
+    """
+    total = 0
+    for pid in pids:
+        try:
+            status = Path(f"/proc/{pid}/status").read_text()
+        except OSError:
+            continue
+
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1])
+
+    return round(total / 1024, 1) if pids and Path("/proc").exists() else None
+
+
+def _server_pids(exclude: int) -> list[int]:
+    """
+    Processes of the servers started by this process: its descendants, except
+    the Tidio API stand-in.
+    """
+    children: dict[int, list[int]] = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+
+    pids = []
+    pending = [pid for pid in children.get(os.getpid(), []) if pid != exclude]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+
+    return pids
+
+
+@asynccontextmanager
+async def _session(transport: str, url: str):
+    if transport == "stdio":
+        parameters = StdioServerParameters(
+            command=sys.executable,
+            args=["server.py"],
+            env=dict(os.environ),
+            cwd=str(ROOT),
+        )
+        with open(os.devnull, "w") as errlog:
+            async with (
+                stdio_client(parameters, errlog=errlog) as (read, write),
+                ClientSession(read, write) as session,
+            ):
+                await session.initialize()
+                yield session
+    else:
+        async with (
+            streamablehttp_client(url) as (read, write, _),
+            ClientSession(read, write) as session,
+        ):
+            await session.initialize()
+            yield session
+
+
+async def _wait_for_search_index(session: ClientSession) -> None:
+    """
+    Search until the initial sync of the index is complete. Searches answer from
+    a partial index meanwhile, and the sync happens once per server, so it is
+    left out of the measurements.
+    """
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        result = await session.call_tool("search_tickets", {"query": "refund"})
+        if (
+            not result.isError
+            and json.loads(result.content[0].text)["data"]["meta"]["complete"]
+        ):
+            return
+
+        await asyncio.sleep(0.1)
+
+    raise RuntimeError("The search index of the server was not synced")
+
+
+async def _run_session(
+    transport: str,
+    url: str,
+    args: argparse.Namespace,
+    seed: int,
+    started: asyncio.Barrier,
+    window: Window,
+    totals: Totals,
+) -> None:
+    rng = random.Random(seed)
+    tools = list(TOOL_MIX)
+    weights = list(TOOL_MIX.values())
+
+    async with _session(transport, url) as session:
+        await _wait_for_search_index(session)
+        await started.wait()
+
+        deadline = time.monotonic() + args.duration
+        while time.monotonic() < deadline:
+            tool = rng.choices(tools, weights)[0]
+            arguments = SCENARIOS[tool].arguments(rng.randrange(10_000), {})
+
+            started_at = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, arguments)
+                failed = result.isError
+            except Exception:
+                failed = True
+            latency = time.perf_counter() - started_at
+
+            window.latencies.append(latency)
+            totals.latencies.append(latency)
+            totals.calls += 1
+            if failed:
+                window.errors += 1
+                totals.errors += 1
+
+            if args.pause:
+                await asyncio.sleep(rng.uniform(0, 2 * args.pause))
+
+
+async def _report(
+    args: argparse.Namespace,
+    fake_tidio_pid: int,
+    started: asyncio.Barrier,
+    window: Window,
+    totals: Totals,
+) -> None:
+    print(f"Warming up {args.sessions} sessions...", flush=True)
+    await started.wait()
+
+    started_at = time.monotonic()
+    deadline = started_at + args.duration
+    print(
+        f"{'elapsed s':>9} {'calls':>8} {'errors':>6} {'calls/s':>8} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'RSS MiB':>8}",
+        flush=True,
+    )
+    while time.monotonic() < deadline:
+        window_started_at = time.monotonic()
+        await asyncio.sleep(min(args.interval, deadline - window_started_at))
+
+        latencies, errors = window.latencies, window.errors
+        window.latencies, window.errors = [], 0
+        now = time.monotonic()
+
+        sample = {
+            "elapsed": round(now - started_at, 1),
+            "calls": len(latencies),
+            "errors": errors,
+            "throughput": round(len(latencies) / (now - window_started_at), 1),
+            "p50_ms": _ms(percentile(latencies, 0.5)) if latencies else None,
+            "p99_ms": _ms(percentile(latencies, 0.99)) if latencies else None,
+            "rss_mb": _rss_mb(_server_pids(exclude=fake_tidio_pid)),
+        }
+        totals.samples.append(sample)
+
+        print(
+            f"{sample['elapsed']:>9.0f} {sample['calls']:>8} {sample['errors']:>6} "
+            f"{sample['throughput']:>8.1f} {_cell(sample['p50_ms'])} "
+            f"{_cell(sample['p99_ms'])} {_cell(sample['rss_mb'])}",
+            flush=True,
+        )
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _cell(value: float | None) -> str:
+    return f"{'n/a':>8}" if value is None else f"{value:>8.1f}"
+
+
+def rss_growth_per_hour(samples: list[dict]) -> float | None:
+    """
+    Least squares slope of the server memory over time, in MiB per hour. The
+    first sample is skipped, as caches and the search index warm up first.
+    """
+    points = [
+        (sample["elapsed"], sample["rss_mb"])
+        for sample in samples[1:]
+        if sample["rss_mb"] is not None
+    ]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+    return round(slope * 3600, 1)
+
+
+def start_http_server(port: int, workers: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "server.py",
+            "--transport",
+            "streamable-http",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+            return process
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+
+    process.kill()
+    raise RuntimeError("The MCP server did not start")
+
+
+async def run(args: argparse.Namespace, url: str, fake_tidio_pid: int) -> Totals:
+    """
+    Open the sessions, wait until all of them are warmed up and replay tool
+    calls for the duration.
+    """
+    started = asyncio.Barrier(args.sessions + 1)
+    window = Window()
+    totals = Totals()
+
+    async with asyncio.TaskGroup() as tasks:
+        tasks.create_task(_report(args, fake_tidio_pid, started, window, totals))
+        for session in range(args.sessions):
+            tasks.create_task(
+                _run_session(
+                    args.transport,
+                    url,
+                    args,
+                    args.seed + session,
+                    started,
+                    window,
+                    totals,
+                )
+            )
+
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--transport", choices=["stdio", "streamable-http"], default="stdio"
+    )
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=8,
+        help="Concurrent MCP sessions. Every stdio session starts its own server.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Server workers of streamable-http"
+    )
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run")
+    parser.add_argument(
+        "--interval", type=float, default=10, help="Seconds between reports"
+    )
+    parser.add_argument(
+        "--pause", type=float, default=0, help="Mean seconds between calls of a session"
+    )
+    parser.add_argument("--output", help="Save the report as JSON to this file")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    fake_port = free_port()
+    configure_server_environment(f"http://127.0.0.1:{fake_port}")
+    # Keep the background sync on, its memory belongs to a soak test. Its rate
+    # limit is lifted by configure_server_environment, like the others, and
+    # inherited by the server processes.
+    os.environ["TIDIO_SYNC_BACKGROUND"] = "true"
+    fake_tidio = start_fake_tidio(
+        config_to_arguments(config_from_arguments(args)), fake_port
+    )
+
+    server = None
+    try:
+        url = ""
+        if args.transport == "streamable-http":
+            port = free_port()
+            server = start_http_server(port, args.workers)
+            url = f"http://127.0.0.1:{port}/mcp"
+
+        totals = asyncio.run(run(args, url, fake_tidio.pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        fake_tidio.terminate()
+        fake_tidio.wait()
+
+    summary = {
+        "transport": args.transport,
+        "sessions": args.sessions,
+        "duration": args.duration,
+        "calls": totals.calls,
+        "errors": totals.errors,
+        "p50_ms": _ms(percentile(totals.latencies, 0.5)) if totals.latencies else None,
+        "p99_ms": _ms(percentile(totals.latencies, 0.99)) if totals.latencies else None,
+        "rss_start_mb": totals.samples[0]["rss_mb"] if totals.samples else None,
+        "rss_end_mb": totals.samples[-1]["rss_mb"] if totals.samples else None,
+        "rss_growth_mb_per_hour": rss_growth_per_hour(totals.samples),
+    }
+
+    print()
+    for key, value in summary.items():
+        print(f"{key:<24} {value}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({**summary, "samples": totals.samples}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Measure the cold start of the stdio server: the time from spawning the process
+to the initialize response, as seen by an MCP client opening a chat window.
+
+Run from the repository root:
+
+    uv run python -m benchmarks.startup --runs 20
+
+With --importtime, also list the modules that are slowest to import, from
+python -X importtime. The floor is the time to import the MCP SDK alone; the
+rest is what the server adds on top of it.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "1.0"},
+    },
+}
+
+
+def time_to_initialize() -> float:
+    """
+    Returns:
+        float: Seconds from spawning server.py to reading its initialize response.
+    """
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "server.py"],
+        cwd=ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE).encode() + b"\n")
+        process.stdin.flush()
+        response = json.loads(process.stdout.readline())
+        elapsed = time.perf_counter() - started_at
+    finally:
+        process.kill()
+        process.wait()
+
+    if "result" not in response:
+        raise RuntimeError(f"Unexpected initialize response: {response}")
+
+    return elapsed
+
+
+def time_to_import(statement: str) -> float:
+    started_at = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+
+    return time.perf_counter() - started_at
+
+
+def slowest_imports(limit: int) -> list[tuple[int, int, str]]:
+    """
+    Returns:
+        list: (self µs, cumulative µs, module) of the modules imported by the
+            server but not by the MCP SDK, slowest first.
+    """
+
+    def importtime(statement: str) -> dict[str, tuple[int, int]]:
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        modules = {}
+        for line in output.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+
+            self_us, cumulative_us, module = line.removeprefix("import time:").split(
+                "|"
+            )
+            modules[module.strip()] = (int(self_us), int(cumulative_us))
+
+        return modules
+
+    floor = importtime("import mcp.server.fastmcp")
+    added = [
+        (self_us, cumulative_us, module)
+        for module, (self_us, cumulative_us) in importtime("import server").items()
+        if module not in floor
+    ]
+
+    return sorted(added, key=lambda row: row[1], reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Server launches")
+    parser.add_argument(
+        "--importtime",
+        action="store_true",
+        help="List the slowest imports the server adds to the MCP SDK",
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="Exit with an error if the median time to initialize is higher",
+    )
+    args = parser.parse_args()
+
+    # No API calls are made, but the server must not pick up a local .env that
+    # enables tracing or a remote cache.
+    os.environ.update({"TIDIO_TRACING": "false", "TIDIO_CACHE_BACKEND": "memory"})
+
+    # The first launch compiles bytecode and warms the file cache.
+    time_to_initialize()
+    initialize = [time_to_initialize() for _ in range(args.runs)]
+    floor = [time_to_import("import mcp.server.fastmcp") for _ in range(args.runs)]
+    python = [time_to_import("pass") for _ in range(args.runs)]
+
+    print(f"{'':<34} {'min ms':>8} {'median ms':>10}")
+    for label, values in [
+        ("Time to initialize response", initialize),
+        ("MCP SDK import and exit (floor)", floor),
+        ("Python interpreter", python),
+    ]:
+        print(
+            f"{label:<34} {min(values) * 1000:>8.0f} "
+            f"{statistics.median(values) * 1000:>10.0f}"
+        )
+
+    if args.importtime:
+        print()
+        print(f"{'self ms':>8} {'cumul. ms':>10}  module added by the server")
+        for self_us, cumulative_us, module in slowest_imports(limit=25):
+            print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>10.1f}  {module}")
+
+    median_ms = statistics.median(initialize) * 1000
+    if args.max_ms is not None and median_ms > args.max_ms:
+        sys.exit(
+            f"Median time to initialize of {median_ms:.0f} ms exceeds {args.max_ms:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+Benchmark every tool of the server against a local Tidio API stand-in.
+
+Run from the repository root:
+
+    uv run python -m benchmarks.suite --concurrency 1,8,32 --latency 0.02
+
+Each tool is called through FastMCP, so argument validation and result
+serialization are included. Memory is reported per scenario: the resident
+memory after it, its peak during it, and how far the peak rose above the
+memory before it. Save results with --output and compare a later run with
+--baseline to measure a change instead of guessing.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_tidio import (
+    add_config_arguments,
+    config_from_arguments,
+    config_to_arguments,
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    Attributes:
+        arguments (Callable): Arguments of the n-th call, given the context
+            returned by setup.
+        setup (Callable, optional): Prepares the context once per run, after
+            the response cache was cleared.
+    """
+
+    arguments: Callable[[int, dict], dict]
+    setup: Callable[[], Awaitable[dict]] | None = None
+
+
+def _contact_id(index: int) -> str:
+    return f"{3:08x}-0000-4000-8000-{index:012x}"
+
+
+def _operator_id(index: int) -> str:
+    return f"{2:08x}-0000-4000-8000-{index:012x}"
+
+
+async def _messages_handle() -> dict:
+    import server
+
+    result = await server.get_ticket_details(ticket_id=2, last_messages=2)
+
+    return result["data"]["messages_page"]
+
+
+async def _continuation_handle() -> dict:
+    import server
+
+    result = await server.get_ticket_details(ticket_id=1)
+    for message in result["data"]["messages"]:
+        if "message_content_continuation" in message:
+            return message["message_content_continuation"]
+
+    raise RuntimeError("Ticket 1 of the stand-in has no truncated message")
+
+
+async def _synced_index() -> dict:
+    import server
+
+    # The first searches answer from a partial index while the sync goes on.
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        result = await server.search_tickets(query="refund")
+        if result["data"]["meta"]["complete"]:
+            return {}
+
+    raise RuntimeError("The search index was not synced")
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "get_departments": Scenario(lambda n, ctx: {}),
+    "get_operators": Scenario(lambda n, ctx: {"max_items": 20}),
+    "get_contacts": Scenario(lambda n, ctx: {"cursor": str(n % 10 * 100)}),
+    "get_contact_details": Scenario(
+        lambda n, ctx: {"contact_id": _contact_id(n % 500)}
+    ),
+    "get_contacts_details": Scenario(
+        lambda n, ctx: {"contact_ids": [_contact_id((n + i) % 500) for i in range(10)]}
+    ),
+    "delete_contact": Scenario(lambda n, ctx: {"contact_id": _contact_id(n % 500)}),
+    "create_contacts_batch": Scenario(
+        lambda n, ctx: {
+            "contacts": [{"email": f"new{n}-{i}@example.com"} for i in range(250)]
+        }
+    ),
+    "update_contacts_batch": Scenario(
+        lambda n, ctx: {
+            "contacts": [
+                {"id": _contact_id(i), "first_name": f"Name{n}"} for i in range(250)
+            ]
+        }
+    ),
+    "get_tickets": Scenario(lambda n, ctx: {"status": "open", "max_items": 100}),
+    "get_ticket_details": Scenario(lambda n, ctx: {"ticket_id": n % 200 + 1}),
+    "get_ticket_messages": Scenario(
+        lambda n, ctx: {"handle": ctx["handle"], "before": ctx["before"], "limit": 5},
+        setup=_messages_handle,
+    ),
+    "get_tickets_details": Scenario(
+        lambda n, ctx: {"ticket_ids": [(n + i) % 200 + 1 for i in range(10)]}
+    ),
+    "search_tickets": Scenario(
+        lambda n, ctx: {"query": ["refund", "login password", "shipping"][n % 3]},
+        setup=_synced_index,
+    ),
+    "read_truncated_text": Scenario(
+        lambda n, ctx: {"handle": ctx["handle"], "offset": ctx["offset"]},
+        setup=_continuation_handle,
+    ),
+    "delete_ticket": Scenario(lambda n, ctx: {"ticket_id": n % 200 + 1}),
+    "create_ticket": Scenario(
+        lambda n, ctx: {
+            "contact_email": f"new{n}@example.com",
+            "subject": "Refund",
+            "message_content": "I was charged twice.",
+        }
+    ),
+    "update_ticket": Scenario(
+        lambda n, ctx: {"ticket_id": n % 200 + 1, "status": "solved"}
+    ),
+    "unassign_ticket": Scenario(lambda n, ctx: {"ticket_id": n % 200 + 1}),
+    "bulk_update_tickets": Scenario(
+        lambda n, ctx: {"ticket_ids": list(range(1, 21)), "priority": "urgent"}
+    ),
+    "bulk_delete_tickets": Scenario(lambda n, ctx: {"ticket_ids": list(range(1, 21))}),
+    "reply_to_a_ticket": Scenario(
+        lambda n, ctx: {
+            "ticket_id": n % 200 + 1,
+            "content": "We refunded the payment.",
+            "operator_id": _operator_id(1),
+        }
+    ),
+    "add_internal_note_to_a_ticket": Scenario(
+        lambda n, ctx: {
+            "ticket_id": n % 200 + 1,
+            "content": "Refund approved.",
+            "operator_id": _operator_id(1),
+        }
+    ),
+    "get_server_metrics": Scenario(lambda n, ctx: {}),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_tidio(arguments: list[str], port: int) -> subprocess.Popen:
+    """
+    Start the stand-in in its own process, so it does not compete with the
+    server for the event loop, and wait until it accepts requests.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_tidio", "--port", str(port)] + arguments
+    )
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/departments", timeout=1)
+            return process
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError("The Tidio API stand-in did not start")
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def _memory_mb(field: str) -> float | None:
+    """
+    Returns:
+        float | None: A memory field of /proc/self/status in MiB, e.g. VmRSS for
+            the current and VmHWM for the peak resident memory, or None where
+            /proc is not available.
+    """
+    try:
+        status = Path("/proc/self/status").read_text()
+    except OSError:
+        return None
+
+    for line in status.splitlines():
+        if line.startswith(f"{field}:"):
+            return int(line.split()[1]) / 1024
+
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reset VmHWM to the current resident memory, so that it measures the peak of
+    one scenario instead of the whole run.
+    """
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        return False
+
+    return True
+
+
+async def run_scenario(tool: str, scenario: Scenario, concurrency: int, calls: int):
+    from mcp.server.fastmcp.exceptions import ToolError
+
+    import server
+
+    await server.tidio_api_client.cache.clear()
+    context = await scenario.setup() if scenario.setup else {}
+    rss_before = _memory_mb("VmRSS")
+    peak_reset = _reset_peak_rss()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def call(n: int) -> None:
+        nonlocal errors
+
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await server.mcp.call_tool(tool, scenario.arguments(n, context))
+            except ToolError:
+                errors += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(call(n) for n in range(calls)))
+    elapsed = time.perf_counter() - started_at
+    rss_after = _memory_mb("VmRSS")
+    # Without a reset VmHWM is the peak of the whole run, so only the resident
+    # memory after the scenario is comparable.
+    peak = _memory_mb("VmHWM") if peak_reset else rss_after
+
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "throughput": round(calls / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "rss_mb": _round(rss_after),
+        "peak_rss_mb": _round(peak),
+        "rss_growth_mb": _round(
+            peak - rss_before if peak is not None and rss_before is not None else None
+        ),
+    }
+
+
+async def run_suite(tools: list[str], levels: list[int], calls: int) -> list[dict]:
+    results = []
+    for tool in tools:
+        for concurrency in levels:
+            result = await run_scenario(tool, SCENARIOS[tool], concurrency, calls)
+            results.append(result)
+            print(_format_row(result), flush=True)
+
+    return results
+
+
+def _format_row(result: dict, baseline: dict = None) -> str:
+    row = (
+        f"{result['tool']:<30} {result['concurrency']:>4} {result['errors']:>6} "
+        f"{result['throughput']:>9.1f} {result['p50_ms']:>9.2f} "
+        f"{result['p99_ms']:>9.2f} {_cell(result.get('rss_mb'))} "
+        f"{_cell(result.get('peak_rss_mb'))} {_cell(result.get('rss_growth_mb'))}"
+    )
+    if baseline is not None:
+        row += (
+            f" {_change(result['throughput'], baseline['throughput']):>9} "
+            f"{_change(result['p50_ms'], baseline['p50_ms']):>9} "
+            f"{_change(result['p99_ms'], baseline['p99_ms']):>9}"
+        )
+
+    return row
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 1) if value is not None else None
+
+
+def _cell(value: float | None) -> str:
+    return f"{'n/a':>8}" if value is None else f"{value:>8.1f}"
+
+
+def _change(value: float, baseline: float) -> str:
+    if not baseline:
+        return "n/a"
+
+    return f"{(value - baseline) / baseline:+.0%}"
+
+
+def compare(results: list[dict], baseline: list[dict]) -> None:
+    """
+    Print results next to their change from a baseline run.
+    """
+    by_key = {(row["tool"], row["concurrency"]): row for row in baseline}
+
+    print()
+    print(
+        f"{'tool':<30} {'conc':>4} {'errors':>6} {'calls/s':>9} {'p50 ms':>9} "
+        f"{'p99 ms':>9} {'RSS MiB':>8} {'peak MiB':>8} {'+RSS MiB':>8} "
+        f"{'Δcalls/s':>9} {'Δp50':>9} {'Δp99':>9}"
+    )
+    for result in results:
+        baseline_row = by_key.get((result["tool"], result["concurrency"]))
+        print(_format_row(result, baseline_row))
+
+
+def configure_server_environment(base_url: str) -> None:
+    """
+    Point the server at the stand-in. Must run before the server is imported.
+    Client side rate limits are lifted, so the server itself is measured.
+    """
+    os.environ.update(
+        {
+            "TIDIO_API_BASE_URL": base_url,
+            "TIDIO_CLIENT_ID": "benchmark",
+            "TIDIO_CLIENT_SECRET": "benchmark",
+            "TIDIO_SYNC_BACKGROUND": "false",
+            "TIDIO_READ_RATE_LIMIT": "1000000",
+            "TIDIO_READ_RATE_BURST": "1000000",
+            "TIDIO_WRITE_RATE_LIMIT": "1000000",
+            "TIDIO_WRITE_RATE_BURST": "1000000",
+            "TIDIO_SYNC_RATE_LIMIT": "1000000",
+            "TIDIO_SYNC_RATE_BURST": "1000000",
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        default="1,8,32",
+        help="Comma separated concurrency levels",
+    )
+    parser.add_argument("--calls", type=int, default=200, help="Calls per run")
+    parser.add_argument(
+        "--tools", help="Comma separated tools to run, all tools by default"
+    )
+    parser.add_argument("--output", help="Save results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare with results saved by --output")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    port = free_port()
+    configure_server_environment(f"http://127.0.0.1:{port}")
+    fake_tidio = start_fake_tidio(
+        config_to_arguments(config_from_arguments(args)), port
+    )
+
+    try:
+        import server
+
+        # Request logs of every call would drown the results.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        registered = {tool.name for tool in server.mcp._tool_manager.list_tools()}
+        missing = registered - SCENARIOS.keys()
+        if missing:
+            parser.error(
+                f"No benchmark scenario for tools: {', '.join(sorted(missing))}"
+            )
+
+        tools = args.tools.split(",") if args.tools else sorted(registered)
+        levels = [int(level) for level in args.concurrency.split(",")]
+
+        print(
+            f"{'tool':<30} {'conc':>4} {'errors':>6} {'calls/s':>9} {'p50 ms':>9} "
+            f"{'p99 ms':>9} {'RSS MiB':>8} {'peak MiB':>8} {'+RSS MiB':>8}"
+        )
+        results = asyncio.run(run_suite(tools, levels, args.calls))
+    finally:
+        fake_tidio.terminate()
+        fake_tidio.wait()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
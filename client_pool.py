@@ -0,0 +1,83 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+
+from tidio_client import TidioApiClient
+
+
+class TidioClientPool:
+    """
+    Bounded LRU pool of TidioApiClient instances, one per set of credentials.
+
+    Every client keeps its own connection pool, rate limiters and cache, so
+    tenants sharing one server process do not affect each other. Evicted clients
+    are closed after close_delay seconds, as tool calls that resolved them
+    before the eviction may still be sending requests.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str, str], TidioApiClient],
+        max_size: int = 64,
+        close_delay: float = 60.0,
+    ):
+        """
+        Args:
+            factory (Callable): Creates a client from client ID and client secret.
+            max_size (int): Maximum number of clients. The least recently used
+                client is closed when the limit is exceeded.
+            close_delay (float): Seconds an evicted client stays open.
+        """
+        if max_size < 1:
+            raise ValueError("Pool max size must be greater than 0")
+
+        self.max_size = max_size
+        self.close_delay = close_delay
+        self._factory = factory
+        self._clients: OrderedDict[tuple[str, str], TidioApiClient] = OrderedDict()
+        self._closing: dict[asyncio.Task, TidioApiClient] = {}
+
+    def get(self, client_id: str, client_secret: str) -> TidioApiClient:
+        key = (client_id, client_secret)
+        client = self._clients.get(key)
+
+        if client is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        client = self._factory(client_id, client_secret)
+        self._clients[key] = client
+
+        while len(self._clients) > self.max_size:
+            _, evicted = self._clients.popitem(last=False)
+            self._close(evicted)
+
+        return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def aclose(self) -> None:
+        # Evicted clients are closed right away instead of after the delay.
+        for task in self._closing:
+            task.cancel()
+
+        clients = [*self._clients.values(), *self._closing.values()]
+        self._clients.clear()
+        self._closing.clear()
+
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    def _close(self, client: TidioApiClient) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_later(client))
+        except RuntimeError:
+            # No running loop, the client has never sent a request.
+            return
+
+        self._closing[task] = client
+        task.add_done_callback(lambda task: self._closing.pop(task, None))
+
+    async def _close_later(self, client: TidioApiClient) -> None:
+        await asyncio.sleep(self.close_delay)
+        await client.aclose()
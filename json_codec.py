@@ -0,0 +1,96 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the installed extras
+    msgspec = None
+
+
+class JsonCodec:
+    """
+    Encodes and decodes JSON with the stdlib. Subclasses wrap faster libraries.
+    All codecs encode compact JSON, without whitespace.
+    """
+
+    name = "json"
+
+    def loads(self, data: bytes | str):
+        return json.loads(data)
+
+    def dumps(self, value) -> bytes:
+        # ensure_ascii=False would be slower, it skips the C encoder fast path.
+        return json.dumps(value, separators=(",", ":")).encode()
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError(
+                "orjson JSON codec requires the orjson package. "
+                "Install it with: pip install 'tidio-mcp[fast-json]'"
+            )
+
+    def loads(self, data: bytes | str):
+        return orjson.loads(data)
+
+    def dumps(self, value) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError(
+                "msgspec JSON codec requires the msgspec package. "
+                "Install it with: pip install msgspec"
+            )
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, data: bytes | str):
+        return self._decoder.decode(data)
+
+    def dumps(self, value) -> bytes:
+        return self._encoder.encode(value)
+
+
+CODECS: dict[str, type[JsonCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": JsonCodec,
+}
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """
+    Args:
+        name (str): One of: auto, orjson, msgspec, json. auto picks the first
+            installed library in that order.
+
+    Raises:
+        ValueError: If name is not a known codec.
+        ImportError: If the library of the named codec is not installed.
+    """
+    if name == "auto":
+        if orjson is not None:
+            return OrjsonCodec()
+        if msgspec is not None:
+            return MsgspecCodec()
+        return JsonCodec()
+
+    if name not in CODECS:
+        raise ValueError(
+            f"Unknown JSON codec: {name}. Expected one of: auto, {', '.join(CODECS)}"
+        )
+
+    return CODECS[name]()
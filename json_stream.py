@@ -0,0 +1,134 @@
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """
+    Decodes JSON values from text chunks, keeping only the unread rest of the
+    received text.
+    """
+
+    def __init__(self, chunks: AsyncIterable[str]):
+        self._chunks = aiter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._ended = False
+
+    async def peek(self) -> str:
+        """
+        Skip whitespace and return the next character without consuming it.
+        """
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in _WHITESPACE
+            ):
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not await self._read():
+                raise ValueError("Unexpected end of JSON")
+
+    async def expect(self, *chars: str) -> str:
+        """
+        Consume the next character, which must be one of chars.
+        """
+        char = await self.peek()
+        if char not in chars:
+            raise ValueError(
+                f"Expected {' or '.join(chars)} at position {self._position}, "
+                f"got {char!r}"
+            )
+
+        self._position += 1
+
+        return char
+
+    async def value(self):
+        """
+        Consume the next complete JSON value.
+        """
+        await self.peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+                # A number at the end of the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._ended:
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._ended:
+                    raise
+
+            await self._read()
+
+    async def _read(self) -> bool:
+        """
+        Returns:
+            bool: False when the stream has ended.
+        """
+        try:
+            chunk = await anext(self._chunks)
+        except StopAsyncIteration:
+            self._ended = True
+            return False
+
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+
+        return True
+
+
+async def iter_items(
+    chunks: AsyncIterable[str], items_key: str, rest: dict
+) -> AsyncIterator:
+    """
+    Incrementally decode a JSON object received in chunks, yielding the items of
+    its items_key array one at a time. Memory use is bounded by the largest item,
+    not by the size of the document.
+
+    Args:
+        chunks (AsyncIterable): Text of the document, e.g. httpx aiter_text().
+        items_key (str): Key of the array to yield, e.g. "contacts".
+        rest (dict): Receives all other fields of the object, e.g. meta. They are
+            complete once the iteration has finished.
+
+    Yields:
+        Items of the array, in order.
+
+    Raises:
+        ValueError: When the document is not valid JSON or not an object.
+    """
+    reader = _Reader(chunks)
+
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        return
+
+    while True:
+        key = await reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Expected an object key")
+
+        await reader.expect(":")
+
+        if key == items_key and await reader.peek() == "[":
+            await reader.expect("[")
+            if await reader.peek() == "]":
+                await reader.expect("]")
+            else:
+                while True:
+                    yield await reader.value()
+                    if await reader.expect(",", "]") == "]":
+                        break
+        else:
+            rest[key] = await reader.value()
+
+        if await reader.expect(",", "}") == "}":
+            return
@@ -0,0 +1,363 @@
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_ID_SEGMENT = re.compile(r"\d")
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed bucket bounds, as in Prometheus.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = tuple(sorted(buckets))
+        # The last count is the +Inf bucket.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+
+        Returns:
+            float | None: The estimate, or None without observations. Values in
+                the +Inf bucket are reported as the highest bound.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+
+                return lower + (upper - lower) * (rank - seen) / count
+
+            seen += count
+
+        return self.buckets[-1]
+
+    def summary(self, scale: float = 1.0) -> dict:
+        """
+        Args:
+            scale (float): Factor applied to all values, e.g. 1000 for ms.
+        """
+
+        def scaled(value: float | None) -> float | None:
+            return None if value is None else round(value * scale, 3)
+
+        return {
+            "count": self.count,
+            "mean": scaled(self.sum / self.count if self.count else None),
+            "p50": scaled(self.quantile(0.5)),
+            "p90": scaled(self.quantile(0.9)),
+            "p99": scaled(self.quantile(0.99)),
+        }
+
+
+@dataclass
+class RequestRecord:
+    """
+    Outcome of one API request, filled in by the caller while it is tracked.
+    """
+
+    status: str = "error"
+    retries: int = 0
+    size: int | None = None
+
+
+@dataclass
+class _ToolStats:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    result_bytes: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+    in_flight: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _EndpointStats:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    response_bytes: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+    in_flight: int = 0
+    retries: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    cache_lookups: Counter = field(default_factory=Counter)
+
+
+class ServerMetrics:
+    """
+    In-process metrics of tool calls and Tidio API requests.
+
+    Every worker process keeps its own metrics. Upstream endpoints are grouped
+    by path template, e.g. /tickets/{id}, to keep the number of series bounded.
+    """
+
+    def __init__(self, clock: Callable[[], float] = None):
+        """
+        Args:
+            clock (Callable, optional): Monotonic time source, useful in tests.
+        """
+        self._clock = clock or time.perf_counter
+        self._tools: dict[str, _ToolStats] = {}
+        self._endpoints: dict[tuple[str, str], _EndpointStats] = {}
+
+    @contextmanager
+    def track_tool(self, tool: str) -> Iterator[None]:
+        """
+        Time a tool call and count it as failed if it raises.
+        """
+        stats = self._tools.setdefault(tool, _ToolStats())
+        stats.in_flight += 1
+        started_at = self._clock()
+
+        try:
+            yield
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.latency.observe(self._clock() - started_at)
+
+    def record_tool_result(self, tool: str, size: int) -> None:
+        self._tools.setdefault(tool, _ToolStats()).result_bytes.observe(size)
+
+    @contextmanager
+    def track_request(self, method: str, endpoint: str) -> Iterator[RequestRecord]:
+        """
+        Time an API request, including its retries. The caller fills in the
+        yielded record.
+        """
+        stats = self._endpoint(method, endpoint)
+        record = RequestRecord()
+        stats.in_flight += 1
+        started_at = self._clock()
+
+        try:
+            yield record
+        finally:
+            stats.in_flight -= 1
+            stats.latency.observe(self._clock() - started_at)
+            stats.statuses[record.status] += 1
+            stats.retries += record.retries
+            if record.size is not None:
+                stats.response_bytes.observe(record.size)
+
+    def record_cache_lookup(self, endpoint: str, result: str) -> None:
+        """
+        Args:
+            endpoint (str): Endpoint of the cached GET request.
+            result (str): One of: hit, stale, miss.
+        """
+        self._endpoint("GET", endpoint).cache_lookups[result] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            Dict: Per tool and per endpoint statistics, with latencies in
+                milliseconds.
+        """
+        tools = {
+            tool: {
+                "calls": stats.latency.count,
+                "errors": stats.errors,
+                "in_flight": stats.in_flight,
+                "latency_ms": stats.latency.summary(scale=1000),
+                "result_bytes": stats.result_bytes.summary(),
+            }
+            for tool, stats in sorted(self._tools.items())
+        }
+
+        endpoints = {}
+        for (method, template), stats in sorted(self._endpoints.items()):
+            lookups = sum(stats.cache_lookups.values())
+            # Stale entries are served from the cache as well.
+            cache_hits = stats.cache_lookups["hit"] + stats.cache_lookups["stale"]
+            endpoints[f"{method} {template}"] = {
+                "requests": stats.latency.count,
+                "in_flight": stats.in_flight,
+                "retries": stats.retries,
+                "statuses": dict(stats.statuses),
+                "latency_ms": stats.latency.summary(scale=1000),
+                "response_bytes": stats.response_bytes.summary(),
+                "cache_hit_ratio": (
+                    round(cache_hits / lookups, 3) if lookups else None
+                ),
+                "cache_lookups": dict(stats.cache_lookups),
+            }
+
+        return {"tools": tools, "endpoints": endpoints}
+
+    def render_prometheus(self) -> str:
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        tools = sorted(self._tools.items())
+        endpoints = sorted(self._endpoints.items())
+
+        family("tidio_mcp_tool_duration_seconds", "histogram", "Tool call latency.")
+        for tool, stats in tools:
+            _histogram_lines(
+                lines, "tidio_mcp_tool_duration_seconds", {"tool": tool}, stats.latency
+            )
+
+        family("tidio_mcp_tool_result_bytes", "histogram", "Tool result size.")
+        for tool, stats in tools:
+            _histogram_lines(
+                lines, "tidio_mcp_tool_result_bytes", {"tool": tool}, stats.result_bytes
+            )
+
+        family("tidio_mcp_tool_in_flight", "gauge", "Tool calls in progress.")
+        for tool, stats in tools:
+            lines.append(
+                _sample("tidio_mcp_tool_in_flight", {"tool": tool}, stats.in_flight)
+            )
+
+        family("tidio_mcp_tool_errors_total", "counter", "Failed tool calls.")
+        for tool, stats in tools:
+            lines.append(
+                _sample("tidio_mcp_tool_errors_total", {"tool": tool}, stats.errors)
+            )
+
+        family(
+            "tidio_api_request_duration_seconds",
+            "histogram",
+            "Tidio API request latency, including retries.",
+        )
+        for (method, template), stats in endpoints:
+            _histogram_lines(
+                lines,
+                "tidio_api_request_duration_seconds",
+                {"method": method, "endpoint": template},
+                stats.latency,
+            )
+
+        family("tidio_api_response_bytes", "histogram", "Tidio API response size.")
+        for (method, template), stats in endpoints:
+            _histogram_lines(
+                lines,
+                "tidio_api_response_bytes",
+                {"method": method, "endpoint": template},
+                stats.response_bytes,
+            )
+
+        family(
+            "tidio_api_requests_in_flight", "gauge", "Tidio API requests in progress."
+        )
+        for (method, template), stats in endpoints:
+            lines.append(
+                _sample(
+                    "tidio_api_requests_in_flight",
+                    {"method": method, "endpoint": template},
+                    stats.in_flight,
+                )
+            )
+
+        family("tidio_api_requests_total", "counter", "Tidio API requests by status.")
+        for (method, template), stats in endpoints:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(
+                    _sample(
+                        "tidio_api_requests_total",
+                        {"method": method, "endpoint": template, "status": status},
+                        count,
+                    )
+                )
+
+        family("tidio_api_retries_total", "counter", "Retried Tidio API requests.")
+        for (method, template), stats in endpoints:
+            lines.append(
+                _sample(
+                    "tidio_api_retries_total",
+                    {"method": method, "endpoint": template},
+                    stats.retries,
+                )
+            )
+
+        family(
+            "tidio_api_cache_lookups_total",
+            "counter",
+            "Response cache lookups by result: hit, stale or miss.",
+        )
+        for (_, template), stats in endpoints:
+            for result, count in sorted(stats.cache_lookups.items()):
+                lines.append(
+                    _sample(
+                        "tidio_api_cache_lookups_total",
+                        {"endpoint": template, "result": result},
+                        count,
+                    )
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def _endpoint(self, method: str, endpoint: str) -> _EndpointStats:
+        return self._endpoints.setdefault(
+            (method, endpoint_template(endpoint)), _EndpointStats()
+        )
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Replace IDs in an endpoint path with {id} and drop the query string, e.g.
+    /tickets/123/reply?x=1 becomes /tickets/{id}/reply.
+    """
+    segments = urlsplit(endpoint).path.strip("/").split("/")
+
+    return "/" + "/".join(
+        "{id}" if _ID_SEGMENT.search(segment) else segment for segment in segments
+    )
+
+
+def _histogram_lines(
+    lines: list[str], name: str, labels: dict, histogram: Histogram
+) -> None:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts, strict=False):
+        cumulative += count
+        lines.append(
+            _sample(f"{name}_bucket", {**labels, "le": f"{bound:g}"}, cumulative)
+        )
+
+    lines.append(_sample(f"{name}_bucket", {**labels, "le": "+Inf"}, histogram.count))
+    lines.append(_sample(f"{name}_sum", labels, histogram.sum))
+    lines.append(_sample(f"{name}_count", labels, histogram.count))
+
+
+def _sample(name: str, labels: dict, value: float) -> str:
+    label_text = ",".join(
+        f'{key}="{_escape_label(str(label))}"' for key, label in labels.items()
+    )
+
+    return f"{name}{{{label_text}}} {value!r}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,54 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter for asyncio tasks.
+
+    Tokens refill continuously at the given rate, up to the burst size. Callers
+    reserve a token immediately and sleep until it becomes available, so waiting
+    tasks are served in order without holding a lock.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Maximum number of tokens, i.e. requests that can be made
+                at once after an idle period.
+            clock (Callable, optional): Monotonic time source, useful in tests.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be greater than 0")
+
+        if burst < 1:
+            raise ValueError("Burst must be greater than 0")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock or time.monotonic
+        self._tokens = float(burst)
+        self._updated_at = self._clock()
+
+    async def acquire(self) -> None:
+        """
+        Take one token, waiting until it is available.
+        """
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        self._tokens -= 1
+
+        if self._tokens >= 0:
+            return
+
+        try:
+            await asyncio.sleep(-self._tokens / self.rate)
+        except asyncio.CancelledError:
+            # Give the reserved token back, nobody is going to use it.
+            self._tokens += 1
+            raise
@@ -0,0 +1,482 @@
+import copy
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+# Imported by the first RedisResponseCache, as it takes longer to import than
+# the rest of the server and most deployments use another backend.
+redis = None
+
+
+@dataclass
+class CacheEntry:
+    value: dict
+    expires_at: float
+    stale_until: float
+    stale: bool = False
+
+
+class CacheBackend:
+    """
+    Base class of response caches. Keeps hit/miss counters of the current process.
+
+    Entries past their TTL are still served during the stale window, so callers
+    can return them immediately and refresh in the background. Methods are
+    coroutines, so network backends do not block the event loop.
+    """
+
+    def __init__(self, clock: Callable[[], float]):
+        self._clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """
+        Returns:
+            CacheEntry | None: A copy of the entry, or None when it is missing or
+                past its stale window.
+        """
+        raise NotImplementedError
+
+    async def set(
+        self, key: str, value: dict, ttl: float, stale_ttl: float = 0
+    ) -> None:
+        """
+        Args:
+            key (str): Cache key.
+            value (dict): Response to store. A copy is kept, so later changes made
+                by the caller do not leak into the cache.
+            ttl (float): Seconds the entry is considered fresh.
+            stale_ttl (float): Additional seconds a stale entry may still be served.
+        """
+        raise NotImplementedError
+
+    async def update(self, key: str, changes: dict) -> bool:
+        """
+        Merge changes into a cached response, keeping its expiry.
+
+        Returns:
+            bool: False when the key is not cached.
+        """
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def keys(self, prefix: str = "") -> list[str]:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    async def size(self) -> int:
+        raise NotImplementedError
+
+    async def stats(self) -> dict:
+        return {
+            "size": await self.size(),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _lookup(self, entry: CacheEntry | None, now: float) -> CacheEntry | None:
+        """
+        Count the lookup and mark the entry as stale if needed.
+        """
+        if entry is None or now >= entry.stale_until:
+            self.misses += 1
+            return None
+
+        entry.stale = now >= entry.expires_at
+        if entry.stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+
+        return entry
+
+
+class ResponseCache(CacheBackend):
+    """
+    In-process LRU cache for API responses with per-entry TTL.
+    """
+
+    def __init__(self, max_size: int = 256, clock: Callable[[], float] = None):
+        """
+        Args:
+            max_size (int): Maximum number of entries. Least recently used entries
+                are evicted first.
+            clock (Callable, optional): Monotonic time source, useful in tests.
+        """
+        if max_size < 1:
+            raise ValueError("Cache max size must be greater than 0")
+
+        super().__init__(clock or time.monotonic)
+        self.max_size = max_size
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    async def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        now = self._clock()
+
+        if entry is not None and now >= entry.stale_until:
+            del self._entries[key]
+
+        entry = self._lookup(entry, now)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+
+        return CacheEntry(
+            value=copy.deepcopy(entry.value),
+            expires_at=entry.expires_at,
+            stale_until=entry.stale_until,
+            stale=entry.stale,
+        )
+
+    async def set(
+        self, key: str, value: dict, ttl: float, stale_ttl: float = 0
+    ) -> None:
+        now = self._clock()
+        self._entries[key] = CacheEntry(
+            value=copy.deepcopy(value),
+            expires_at=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def update(self, key: str, changes: dict) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+
+        entry.value.update(copy.deepcopy(changes))
+
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def keys(self, prefix: str = "") -> list[str]:
+        return [key for key in self._entries if key.startswith(prefix)]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+    async def stats(self) -> dict:
+        return {**await super().stats(), "max_size": self.max_size}
+
+
+class SQLiteResponseCache(CacheBackend):
+    """
+    LRU response cache stored in a local SQLite file, shared by all processes
+    opening the same file, e.g. server workers on one host.
+
+    Access times are refreshed at most every touch_interval seconds, so most
+    hits are read-only and do not wait for the single writer of the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = 1024,
+        namespace: str = "",
+        clock: Callable[[], float] = None,
+        touch_interval: float = 30.0,
+    ):
+        """
+        Args:
+            path (str): Path of the SQLite database file.
+            max_size (int): Maximum number of entries. Least recently used entries
+                are evicted first. The limit applies to the whole file.
+            namespace (str): Prefix of all cache keys, e.g. to separate tenants.
+            clock (Callable, optional): Wall clock time source, shared by processes.
+            touch_interval (float): Seconds a hit does not refresh the access
+                time of an entry after it was last refreshed.
+        """
+        if max_size < 1:
+            raise ValueError("Cache max size must be greater than 0")
+
+        super().__init__(clock or time.time)
+        self.max_size = max_size
+        self.touch_interval = touch_interval
+        self._namespace = f"{namespace}:" if namespace else ""
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=5
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS response_cache_accessed_at "
+            "ON response_cache (accessed_at)"
+        )
+
+    async def get(self, key: str) -> CacheEntry | None:
+        now = self._clock()
+        row = self._connection.execute(
+            "SELECT value, expires_at, stale_until, accessed_at FROM response_cache "
+            "WHERE key = ?",
+            (self._namespace + key,),
+        ).fetchone()
+
+        entry = None
+        if row is not None:
+            entry = CacheEntry(
+                value=json.loads(row[0]), expires_at=row[1], stale_until=row[2]
+            )
+
+        if entry is not None and now >= entry.stale_until:
+            await self.delete(key)
+
+        entry = self._lookup(entry, now)
+        if entry is not None and now - row[3] >= self.touch_interval:
+            self._connection.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?",
+                (now, self._namespace + key),
+            )
+
+        return entry
+
+    async def set(
+        self, key: str, value: dict, ttl: float, stale_ttl: float = 0
+    ) -> None:
+        now = self._clock()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?)",
+            (
+                self._namespace + key,
+                json.dumps(value),
+                now + ttl,
+                now + ttl + stale_ttl,
+                now,
+            ),
+        )
+
+        evicted = self._connection.execute(
+            """
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM response_cache ORDER BY accessed_at ASC
+                LIMIT max(0, (SELECT COUNT(*) FROM response_cache) - ?)
+            )
+            """,
+            (self.max_size,),
+        ).rowcount
+        self.evictions += max(0, evicted)
+
+    async def update(self, key: str, changes: dict) -> bool:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._connection.execute(
+                "SELECT value FROM response_cache WHERE key = ?",
+                (self._namespace + key,),
+            ).fetchone()
+            if row is not None:
+                value = {**json.loads(row[0]), **changes}
+                self._connection.execute(
+                    "UPDATE response_cache SET value = ? WHERE key = ?",
+                    (json.dumps(value), self._namespace + key),
+                )
+        finally:
+            self._connection.execute("COMMIT")
+
+        return row is not None
+
+    async def delete(self, key: str) -> None:
+        self._connection.execute(
+            "DELETE FROM response_cache WHERE key = ?", (self._namespace + key,)
+        )
+
+    async def keys(self, prefix: str = "") -> list[str]:
+        prefix = self._namespace + prefix
+        rows = self._connection.execute(
+            "SELECT key FROM response_cache WHERE substr(key, 1, ?) = ?",
+            (len(prefix), prefix),
+        ).fetchall()
+
+        return [row[0][len(self._namespace) :] for row in rows]
+
+    async def clear(self) -> None:
+        for key in await self.keys():
+            await self.delete(key)
+
+    async def size(self) -> int:
+        return len(await self.keys())
+
+    async def stats(self) -> dict:
+        return {**await super().stats(), "max_size": self.max_size}
+
+
+class RedisResponseCache(CacheBackend):
+    """
+    Response cache stored in Redis (or a Redis-compatible store), shared by all
+    processes and hosts using the same namespace.
+
+    Entries expire in Redis after their stale window. Eviction of least recently
+    used entries is left to the Redis maxmemory policy. Redis errors are treated
+    as cache misses, so an unavailable store only costs extra API requests.
+
+    Keys of every resource, e.g. /tickets, are also kept in a sorted set scored
+    by their expiry, so invalidating a resource does not scan the keyspace.
+    """
+
+    def __init__(
+        self,
+        url: str = None,
+        namespace: str = "tidio-mcp",
+        clock: Callable[[], float] = None,
+        client: "redis.asyncio.Redis" = None,
+    ):
+        """
+        Args:
+            url (str, optional): Redis URL, e.g. redis://localhost:6379/0.
+            namespace (str): Prefix of all cache keys.
+            clock (Callable, optional): Wall clock time source, shared by processes.
+            client (redis.asyncio.Redis, optional): Ready Redis client, used
+                instead of url.
+        """
+        _import_redis()
+
+        super().__init__(clock or time.time)
+        self._redis = client or redis.asyncio.Redis.from_url(
+            url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+        self._namespace = f"{namespace}:"
+
+    async def get(self, key: str) -> CacheEntry | None:
+        try:
+            raw = await self._redis.get(self._namespace + key)
+        except redis.RedisError:
+            raw = None
+
+        entry = CacheEntry(**json.loads(raw)) if raw is not None else None
+
+        return self._lookup(entry, self._clock())
+
+    async def set(
+        self, key: str, value: dict, ttl: float, stale_ttl: float = 0
+    ) -> None:
+        now = self._clock()
+        entry = {
+            "value": value,
+            "expires_at": now + ttl,
+            "stale_until": now + ttl + stale_ttl,
+        }
+        expire_ms = max(1, int((ttl + stale_ttl) * 1000))
+        index = self._index(key)
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                pipeline.set(self._namespace + key, json.dumps(entry), px=expire_ms)
+                pipeline.zadd(index, {key: entry["stale_until"]})
+                pipeline.zremrangebyscore(index, "-inf", now)
+                await pipeline.execute()
+        except redis.RedisError:
+            pass
+
+    async def update(self, key: str, changes: dict) -> bool:
+        try:
+            raw = await self._redis.get(self._namespace + key)
+            if raw is None:
+                return False
+
+            entry = json.loads(raw)
+            entry["value"].update(changes)
+            await self._redis.set(
+                self._namespace + key, json.dumps(entry), keepttl=True
+            )
+        except redis.RedisError:
+            # The entry could not be patched, make sure it is not served anymore.
+            await self.delete(key)
+            return False
+
+        return True
+
+    async def delete(self, key: str) -> None:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                pipeline.delete(self._namespace + key)
+                pipeline.zrem(self._index(key), key)
+                await pipeline.execute()
+        except redis.RedisError:
+            pass
+
+    async def keys(self, prefix: str = "") -> list[str]:
+        """
+        Keys starting with prefix. A prefix of a resource is looked up in its key
+        set, only an empty prefix scans the keyspace.
+        """
+        try:
+            if prefix.startswith("/"):
+                index = self._index(prefix)
+                await self._redis.zremrangebyscore(index, "-inf", self._clock())
+                keys = await self._redis.zrange(index, 0, -1)
+            else:
+                pattern = _escape_glob(self._namespace + prefix) + "*"
+                keys = [
+                    key[len(self._namespace) :]
+                    async for key in self._redis.scan_iter(match=pattern, count=500)
+                ]
+        except redis.RedisError:
+            return []
+
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+
+        # Other namespaces and the key sets may share the scanned prefix.
+        return [key for key in keys if key.startswith("/") and key.startswith(prefix)]
+
+    async def clear(self) -> None:
+        for key in await self.keys():
+            await self.delete(key)
+
+    async def size(self) -> int:
+        return len(await self.keys())
+
+    def _index(self, key: str) -> str:
+        resource = "/" + key.split("?", 1)[0].strip("/").split("/", 1)[0]
+
+        return f"{self._namespace}#keys:{resource}"
+
+
+def _import_redis() -> None:
+    global redis
+
+    if redis is not None:
+        return
+
+    try:
+        import redis.asyncio
+    except ImportError:
+        raise ImportError(
+            "Redis cache backend requires the redis package. "
+            "Install it with: pip install 'tidio-mcp[redis]'"
+        ) from None
+
+
+def _escape_glob(pattern: str) -> str:
+    return "".join(f"\\{char}" if char in "*?[]\\" else char for char in pattern)
@@ -0,0 +1,188 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from html.parser import HTMLParser
+
+from json_codec import JsonCodec
+
+# Text is only taken for HTML when it closes a known element or has a line
+# break, so that "Name <email>", "List<String>" or "a<b and c>d" stay intact.
+_HTML_MARKUP = re.compile(
+    r"</(?:a|b|i|u|s|p|em|strong|span|div|li|ul|ol|table|tr|td|th|h[1-6]"
+    r"|blockquote|pre|code|font|body|html)\s*>|<br\s*/?>",
+    re.IGNORECASE,
+)
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_BLOCK_TAGS = {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+@dataclass(frozen=True)
+class ShapingOptions:
+    """
+    Options of ResponseShaper. All of them are off by default.
+
+    Attributes:
+        strip_html (bool): Replace HTML in the html_fields with its text.
+        html_fields (frozenset[str]): Fields holding HTML bodies, e.g. the
+            message_content of ticket messages.
+        max_text_length (int | None): Truncate longer strings. The full string
+            is kept for later reading through a continuation handle.
+        drop_empty (bool): Remove null and empty fields.
+        tabular (bool): Encode lists of objects as columns and rows, so field
+            names are not repeated for every item.
+    """
+
+    strip_html: bool = False
+    html_fields: frozenset[str] = frozenset({"message_content"})
+    max_text_length: int | None = None
+    drop_empty: bool = False
+    tabular: bool = False
+
+
+class ResponseShaper:
+    """
+    Shrinks tool results before they are sent to the model.
+    """
+
+    def __init__(
+        self,
+        options: ShapingOptions,
+        store_text: Callable[[str], str | None] = None,
+        codec: JsonCodec = None,
+    ):
+        """
+        Args:
+            options (ShapingOptions): What to shrink.
+            store_text (Callable, optional): Keeps the full text of a truncated
+                string and returns its continuation handle, or None to keep the
+                string whole. Strings are not truncated without it.
+            codec (JsonCodec, optional): Measures the bytes saved. Defaults to
+                the stdlib codec.
+        """
+        self.options = options
+        self._store_text = store_text
+        self._codec = codec or JsonCodec()
+
+    def shape(self, data: dict) -> tuple[dict, int]:
+        """
+        Returns:
+            Tuple: The shaped data and the number of bytes saved in its JSON
+                encoding. The data is returned as is when nothing was shaped.
+        """
+        self._changed = False
+        shaped = self._shape(data)
+
+        if not self._changed:
+            return data, 0
+
+        saved = len(self._codec.dumps(data)) - len(self._codec.dumps(shaped))
+
+        return shaped, saved
+
+    def _shape(self, value):
+        if isinstance(value, dict):
+            return self._shape_dict(value)
+
+        if isinstance(value, list):
+            return self._shape_list(value)
+
+        return value
+
+    def _shape_dict(self, value: dict) -> dict:
+        shaped = {}
+        for key, item in value.items():
+            item = self._shape(item)
+
+            if self._should_strip_html(key, item):
+                self._changed = True
+                item = html_to_text(item)
+
+            if self.options.drop_empty and item in (None, "", [], {}):
+                self._changed = True
+                continue
+
+            if isinstance(item, str) and self._should_truncate(item):
+                handle = self._store_text(item)
+                if handle is not None:
+                    self._changed = True
+                    shaped[key] = item[: self.options.max_text_length]
+                    shaped[f"{key}_continuation"] = {
+                        "handle": handle,
+                        "offset": self.options.max_text_length,
+                        "total_length": len(item),
+                    }
+                    continue
+
+            shaped[key] = item
+
+        return shaped
+
+    def _shape_list(self, value: list) -> list | dict:
+        shaped = [self._shape(item) for item in value]
+
+        if (
+            not self.options.tabular
+            or len(shaped) < 2
+            or not all(isinstance(item, dict) for item in shaped)
+        ):
+            return shaped
+
+        self._changed = True
+        columns = list(dict.fromkeys(key for item in shaped for key in item))
+
+        return {
+            "columns": columns,
+            "rows": [[item.get(column) for column in columns] for item in shaped],
+        }
+
+    def _should_strip_html(self, key: str, value) -> bool:
+        return (
+            self.options.strip_html
+            and key in self.options.html_fields
+            and isinstance(value, str)
+            and _HTML_MARKUP.search(value) is not None
+        )
+
+    def _should_truncate(self, value: str) -> bool:
+        return (
+            self._store_text is not None
+            and self.options.max_text_length is not None
+            and len(value) > self.options.max_text_length
+        )
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(value: str) -> str:
+    """
+    Convert HTML to plain text, keeping line breaks of block elements.
+    """
+    extractor = _TextExtractor()
+    extractor.feed(value)
+    extractor.close()
+
+    text = "".join(extractor.parts)
+    lines = "\n".join(line.strip() for line in text.splitlines())
+
+    return _BLANK_LINES.sub("\n\n", lines).strip()
@@ -0,0 +1,468 @@
+import json
+import sqlite3
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+
+class SearchIndex:
+    """
+    Local SQLite FTS5 index of tickets, their messages and contacts of one Tidio
+    account, so tickets can be searched without paging them through the API.
+
+    The database is opened on first use.
+    """
+
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = None):
+        """
+        Args:
+            path (str): Path of the SQLite database file. Defaults to an
+                in-memory database, rebuilt by every process.
+            clock (Callable, optional): Wall clock time source, useful in tests.
+        """
+        self.path = path
+        self._clock = clock or time.time
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS tickets (
+                    id INTEGER PRIMARY KEY,
+                    status TEXT,
+                    priority TEXT,
+                    contact_id TEXT,
+                    assigned_operator_id TEXT,
+                    assigned_department_id TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    data TEXT NOT NULL,
+                    version TEXT,
+                    messages_indexed INTEGER NOT NULL DEFAULT 0,
+                    sync_pass INTEGER NOT NULL DEFAULT 0,
+                    created_at_utc TEXT,
+                    details_fetched_at REAL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+                    subject, contact_email, messages,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+                CREATE TABLE IF NOT EXISTS contacts (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    sync_pass INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+                    email, first_name, last_name, phone,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """
+            )
+            self._migrate()
+
+        return self._db
+
+    def _migrate(self) -> None:
+        """
+        Add the columns missing from index files created before they existed, in
+        the order of the tickets table.
+        """
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(tickets)")]
+
+        with self._db:
+            if "created_at_utc" not in columns:
+                self._db.execute("ALTER TABLE tickets ADD COLUMN created_at_utc TEXT")
+                rows = self._db.execute("SELECT id, created_at FROM tickets").fetchall()
+                self._db.executemany(
+                    "UPDATE tickets SET created_at_utc = ? WHERE id = ?",
+                    [
+                        (_utc_or_none(created_at), ticket_id)
+                        for ticket_id, created_at in rows
+                    ],
+                )
+
+            if "details_fetched_at" not in columns:
+                self._db.execute(
+                    "ALTER TABLE tickets ADD COLUMN details_fetched_at REAL"
+                )
+
+    def upsert_ticket(
+        self, ticket: dict, sync_pass: int = 0, details_max_age: float = None
+    ) -> bool:
+        """
+        Index a ticket from the tickets list. Indexed messages are kept.
+
+        Args:
+            ticket (dict): Ticket from the tickets list.
+            sync_pass (int): Number of the sync pass that listed the ticket.
+            details_max_age (float, optional): Seconds after which the details of
+                a ticket listed without updated_at are outdated. New messages do
+                not change the rest of the listed ticket, so its version does not
+                show them.
+
+        Returns:
+            bool: True when the ticket is new or its updated_at changed, or its
+                messages are not indexed yet or outdated, i.e. its details should
+                be fetched.
+        """
+        version = _version(ticket)
+        row = self._connection.execute(
+            "SELECT version, messages_indexed, details_fetched_at FROM tickets "
+            "WHERE id = ?",
+            (ticket["id"],),
+        ).fetchone()
+
+        if row is not None and row[0] == version:
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE tickets SET sync_pass = ? WHERE id = ?",
+                    (sync_pass, ticket["id"]),
+                )
+
+            if not row[1]:
+                return True
+
+            return (
+                details_max_age is not None
+                and not ticket.get("updated_at")
+                and (row[2] is None or self._clock() - row[2] >= details_max_age)
+            )
+
+        self._write_ticket(ticket, version=version, messages=None, sync_pass=sync_pass)
+
+        return True
+
+    def index_ticket_details(self, ticket: dict) -> None:
+        """
+        Index a ticket together with its messages, from the ticket details.
+        """
+        messages = ticket.get("messages") or []
+        dates = sorted(
+            message["created_at"] for message in messages if message.get("created_at")
+        )
+        summary = {key: value for key, value in ticket.items() if key != "messages"}
+        if dates:
+            summary.setdefault("created_at", dates[0])
+            summary.setdefault("updated_at", dates[-1])
+
+        self._write_ticket(
+            summary,
+            version=None,
+            messages="\n".join(
+                message.get("message_content") or "" for message in messages
+            ),
+            sync_pass=None,
+        )
+
+    def delete_ticket(self, ticket_id: int) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+            self._connection.execute(
+                "DELETE FROM tickets_fts WHERE rowid = ?", (ticket_id,)
+            )
+
+    def ticket_ids(self) -> set[int]:
+        rows = self._connection.execute("SELECT id FROM tickets").fetchall()
+
+        return {row[0] for row in rows}
+
+    def upsert_contact(self, contact: dict, sync_pass: int = 0) -> bool:
+        """
+        Args:
+            contact (dict): Contact from the contacts list.
+            sync_pass (int): Number of the sync pass that listed the contact.
+
+        Returns:
+            bool: True when the contact is new or its updated_at changed.
+        """
+        version = _version(contact)
+        row = self._connection.execute(
+            "SELECT version FROM contacts WHERE id = ?", (contact["id"],)
+        ).fetchone()
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO contacts (id, data, version, sync_pass) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                "data = excluded.data, version = excluded.version, "
+                "sync_pass = excluded.sync_pass",
+                (contact["id"], json.dumps(contact), version, sync_pass),
+            )
+            if row is not None and row[0] == version:
+                return False
+
+            rowid = self._connection.execute(
+                "SELECT rowid FROM contacts WHERE id = ?", (contact["id"],)
+            ).fetchone()[0]
+            self._connection.execute(
+                "DELETE FROM contacts_fts WHERE rowid = ?", (rowid,)
+            )
+            self._connection.execute(
+                "INSERT INTO contacts_fts (rowid, email, first_name, last_name, phone) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    rowid,
+                    contact.get("email") or "",
+                    contact.get("first_name") or "",
+                    contact.get("last_name") or "",
+                    contact.get("phone") or "",
+                ),
+            )
+
+        return True
+
+    def delete_contact(self, contact_id: str) -> None:
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT rowid FROM contacts WHERE id = ?", (contact_id,)
+            ).fetchone()
+            if row is None:
+                return
+
+            self._connection.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+            self._connection.execute(
+                "DELETE FROM contacts_fts WHERE rowid = ?", (row[0],)
+            )
+
+    def contact_ids(self) -> set[str]:
+        rows = self._connection.execute("SELECT id FROM contacts").fetchall()
+
+        return {row[0] for row in rows}
+
+    def prune(self, sync_pass: int) -> None:
+        """
+        Remove tickets and contacts not listed since the given sync pass, i.e.
+        deleted in Tidio.
+        """
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM tickets_fts WHERE rowid IN "
+                "(SELECT id FROM tickets WHERE sync_pass < ?)",
+                (sync_pass,),
+            )
+            self._connection.execute(
+                "DELETE FROM tickets WHERE sync_pass < ?", (sync_pass,)
+            )
+            self._connection.execute(
+                "DELETE FROM contacts_fts WHERE rowid IN "
+                "(SELECT rowid FROM contacts WHERE sync_pass < ?)",
+                (sync_pass,),
+            )
+            self._connection.execute(
+                "DELETE FROM contacts WHERE sync_pass < ?", (sync_pass,)
+            )
+
+    def search_tickets(
+        self,
+        query: str = None,
+        status: str = None,
+        priority: str = None,
+        assignee: str = None,
+        created_after: str = None,
+        created_before: str = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """
+        Find tickets, most recently updated first. All given filters must match.
+
+        Args:
+            query (str, optional): Keywords that must all appear in the ticket
+                subject, messages, or the email or name of its contact.
+            status (str, optional): Ticket status.
+            priority (str, optional): Ticket priority.
+            assignee (str, optional): ID of the assigned operator or department.
+            created_after (str, optional): ISO 8601 date or datetime, inclusive.
+            created_before (str, optional): ISO 8601 date or datetime, exclusive.
+                Dates and datetimes without an offset are in UTC.
+            limit (int): Maximum number of tickets to return.
+
+        Returns:
+            List: Indexed tickets, without messages. Tickets with a missing or
+                invalid created_at never match the date filters.
+
+        Raises:
+            ValueError: If created_after or created_before is not ISO 8601.
+        """
+        conditions = []
+        params = []
+
+        match = _match_expression(query)
+        if match:
+            conditions.append(
+                "(id IN (SELECT rowid FROM tickets_fts WHERE tickets_fts MATCH ?) "
+                "OR contact_id IN (SELECT contacts.id FROM contacts "
+                "JOIN contacts_fts ON contacts_fts.rowid = contacts.rowid "
+                "WHERE contacts_fts MATCH ?))"
+            )
+            params.extend([match, match])
+
+        for column, value in [("status", status), ("priority", priority)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        if assignee is not None:
+            conditions.append(
+                "(assigned_operator_id = ? OR assigned_department_id = ?)"
+            )
+            params.extend([assignee, assignee])
+
+        if created_after is not None:
+            conditions.append("created_at_utc >= ?")
+            params.append(_utc(created_after))
+
+        if created_before is not None:
+            conditions.append("created_at_utc < ?")
+            params.append(_utc(created_before))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection.execute(
+            f"SELECT data FROM tickets {where} "
+            "ORDER BY updated_at DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def get_state(self, key: str) -> str | None:
+        row = self._connection.execute(
+            "SELECT value FROM sync_state WHERE key = ?", (key,)
+        ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, value)
+            )
+
+    @property
+    def synced_at(self) -> float | None:
+        """
+        Time of the last complete sync, or None if the index was never synced.
+        """
+        value = self.get_state("synced_at")
+
+        return float(value) if value is not None else None
+
+    def mark_synced(self) -> None:
+        self.set_state("synced_at", str(self._clock()))
+
+    def is_stale(self, max_age: float) -> bool:
+        synced_at = self.synced_at
+
+        return synced_at is None or self._clock() - synced_at >= max_age
+
+    def _write_ticket(
+        self,
+        ticket: dict,
+        version: str | None,
+        messages: str | None,
+        sync_pass: int | None,
+    ) -> None:
+        """
+        Merge a ticket into its indexed version. A None version or sync_pass keeps
+        the indexed value. A None messages keeps the indexed messages, but marks
+        them as outdated.
+        """
+        row = self._connection.execute(
+            "SELECT tickets.data, tickets.version, tickets.sync_pass, "
+            "tickets_fts.messages FROM tickets "
+            "JOIN tickets_fts ON tickets_fts.rowid = tickets.id WHERE tickets.id = ?",
+            (ticket["id"],),
+        ).fetchone()
+        if row is not None:
+            ticket = {**json.loads(row[0]), **ticket}
+            version = version if version is not None else row[1]
+            sync_pass = sync_pass if sync_pass is not None else row[2]
+
+        content = messages
+        if content is None:
+            content = row[3] if row is not None else ""
+
+        with self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO tickets
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    ticket["id"],
+                    ticket.get("status"),
+                    ticket.get("priority"),
+                    ticket.get("contact_id"),
+                    ticket.get("assigned_operator_id"),
+                    ticket.get("assigned_department_id"),
+                    ticket.get("created_at"),
+                    ticket.get("updated_at") or ticket.get("created_at"),
+                    json.dumps(ticket),
+                    version,
+                    int(messages is not None),
+                    sync_pass or 0,
+                    _utc_or_none(ticket.get("created_at")),
+                    self._clock() if messages is not None else None,
+                ),
+            )
+            self._connection.execute(
+                "DELETE FROM tickets_fts WHERE rowid = ?", (ticket["id"],)
+            )
+            self._connection.execute(
+                "INSERT INTO tickets_fts (rowid, subject, contact_email, messages) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    ticket["id"],
+                    ticket.get("subject") or "",
+                    ticket.get("contact_email") or "",
+                    content,
+                ),
+            )
+
+
+def _version(entity: dict) -> str:
+    """
+    Version of a listed entity: its updated_at, or the whole payload when the
+    list does not include it.
+    """
+    return entity.get("updated_at") or json.dumps(entity, sort_keys=True)
+
+
+def _utc(value: str) -> str:
+    """
+    Normalize an ISO 8601 date or datetime to a UTC datetime of fixed length, so
+    that values with different offsets compare correctly as strings.
+
+    Raises:
+        ValueError: If value is not an ISO 8601 date or datetime.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+
+    return parsed.astimezone(UTC).isoformat(timespec="microseconds")
+
+
+def _utc_or_none(value: str | None) -> str | None:
+    try:
+        return _utc(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _match_expression(query: str | None) -> str:
+    """
+    Turn free text into an FTS5 query matching all of its words, so user input
+    never causes FTS5 syntax errors.
+    """
+    words = (query or "").split()
+
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
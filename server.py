@@ -1,43 +1,748 @@
+import argparse
+import asyncio
+import hashlib
 import os
+import secrets
+import tempfile
+import weakref
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from functools import partial
 from urllib.parse import urlencode
 
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-
-from tidio_client import TidioApiClient
+from mcp.types import TextContent
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+import tracing
+from client_pool import TidioClientPool
+from json_codec import get_codec
+from metrics import ServerMetrics
+from rate_limiter import TokenBucket
+from response_cache import (
+    CacheBackend,
+    RedisResponseCache,
+    ResponseCache,
+    SQLiteResponseCache,
+)
+from response_shaping import ResponseShaper, ShapingOptions
+from search_index import SearchIndex
+from sync_engine import SyncEngine
+from tidio_client import RetryPolicy, TidioApiClient, TidioApiError
 
 load_dotenv()
 
-mcp = FastMCP("Tidio")
+CONTACTS_BATCH_SIZE = 100
+BATCH_CONCURRENCY = int(os.getenv("TIDIO_BATCH_CONCURRENCY", "4"))
+FETCH_CONCURRENCY = int(os.getenv("TIDIO_FETCH_CONCURRENCY", "8"))
+FILTER_MAX_PAGES = int(os.getenv("TIDIO_FILTER_MAX_PAGES", "20"))
+TENANT_CLIENT_ID_HEADER = "x-tidio-client-id"
+TENANT_CLIENT_SECRET_HEADER = "x-tidio-client-secret"
+SEARCH_MAX_STALENESS = float(os.getenv("TIDIO_SEARCH_MAX_STALENESS", "300"))
+SEARCH_SYNC_WAIT = float(os.getenv("TIDIO_SEARCH_SYNC_WAIT", "10"))
+SYNC_IN_BACKGROUND = os.getenv("TIDIO_SYNC_BACKGROUND", "true").lower() == "true"
+RESPONSE_SHAPING = ShapingOptions(
+    strip_html=os.getenv("TIDIO_RESPONSE_STRIP_HTML", "false").lower() == "true",
+    max_text_length=int(os.getenv("TIDIO_RESPONSE_MAX_TEXT_LENGTH", "4000")) or None,
+    drop_empty=os.getenv("TIDIO_RESPONSE_DROP_EMPTY", "false").lower() == "true",
+    tabular=os.getenv("TIDIO_RESPONSE_TABULAR", "false").lower() == "true",
+)
+CONTINUATION_TTL = float(os.getenv("TIDIO_CONTINUATION_TTL", "900"))
+CONTINUATIONS_PER_RESULT = int(os.getenv("TIDIO_CONTINUATIONS_PER_RESULT", "20"))
+MESSAGES_BUFFER_CHUNK_SIZE = 50
+JSON_CODEC = get_codec(os.getenv("TIDIO_JSON_CODEC", "auto"))
+
+server_metrics = ServerMetrics()
+
+
+class _InstrumentedFastMCP(FastMCP):
+    """
+    FastMCP recording the latency, errors and result size of every tool call,
+    including argument validation and result serialization.
+    """
+
+    async def call_tool(self, name: str, arguments: dict):
+        if self._tool_manager.get_tool(name) is None:
+            # Unknown names are not recorded, they would add a series each.
+            return await super().call_tool(name, arguments)
+
+        request = _http_request()
+        with (
+            tracing.tool_span(name, request.headers if request else None),
+            server_metrics.track_tool(name),
+        ):
+            result = await super().call_tool(name, arguments)
+
+        content = result[0] if isinstance(result, tuple) else result
+        server_metrics.record_tool_result(
+            name,
+            sum(
+                len(block.text.encode())
+                for block in content
+                if isinstance(block, TextContent)
+            ),
+        )
+
+        return result
+
+
+mcp = _InstrumentedFastMCP("Tidio")
+
+if os.getenv("TIDIO_TRACING", "false").lower() == "true":
+    tracing.configure_tracing()
+
 
-tidio_api_client = TidioApiClient(
-    client_id=os.getenv("TIDIO_CLIENT_ID", ""),
-    client_secret=os.getenv("TIDIO_CLIENT_SECRET", ""),
+def _create_response_cache(namespace: str = "") -> CacheBackend:
+    """
+    Args:
+        namespace (str): Prefix of cache keys in shared backends, so tenants do
+            not read each other's responses. The memory backend is never shared.
+
+    Raises:
+        ValueError: If TIDIO_CACHE_BACKEND is not one of: memory, sqlite, redis.
+    """
+    backend = os.getenv("TIDIO_CACHE_BACKEND", "memory")
+    max_size = int(os.getenv("TIDIO_CACHE_MAX_SIZE", "256"))
+
+    if backend == "memory":
+        return ResponseCache(max_size=max_size)
+
+    if backend == "sqlite":
+        return SQLiteResponseCache(
+            _sqlite_cache_path(), max_size=max_size, namespace=namespace
+        )
+
+    if backend == "redis":
+        return RedisResponseCache(
+            os.getenv("TIDIO_CACHE_REDIS_URL", "redis://localhost:6379/0"),
+            namespace=f"tidio-mcp:{namespace}" if namespace else "tidio-mcp",
+        )
+
+    raise ValueError("Cache backend must be one of: memory, sqlite, redis")
+
+
+def _create_continuation_store(namespace: str = "") -> CacheBackend:
+    """
+    Store of truncated texts and buffered message threads, on the backend of
+    TIDIO_CACHE_BACKEND but apart from the response cache, so that large results
+    do not evict cached responses and their handles last CONTINUATION_TTL.
+    """
+    backend = os.getenv("TIDIO_CACHE_BACKEND", "memory")
+    max_size = int(os.getenv("TIDIO_CONTINUATION_MAX_SIZE", "4096"))
+
+    if backend == "sqlite":
+        root, extension = os.path.splitext(_sqlite_cache_path())
+        return SQLiteResponseCache(
+            f"{root}-continuations{extension}", max_size=max_size, namespace=namespace
+        )
+
+    if backend == "redis":
+        return RedisResponseCache(
+            os.getenv("TIDIO_CACHE_REDIS_URL", "redis://localhost:6379/0"),
+            namespace=f"tidio-mcp-continuations:{namespace}"
+            if namespace
+            else "tidio-mcp-continuations",
+        )
+
+    return ResponseCache(max_size=max_size)
+
+
+def _sqlite_cache_path() -> str:
+    default_path = os.path.join(tempfile.gettempdir(), "tidio-mcp-cache.sqlite3")
+
+    return os.getenv("TIDIO_CACHE_SQLITE_PATH", default_path)
+
+
+def _tenant_namespace(client_id: str, client_secret: str) -> str:
+    # The secret is part of the tenant identity, but must not end up in cache keys.
+    digest = hashlib.sha256(f"{client_id}:{client_secret}".encode()).hexdigest()
+
+    return digest[:16]
+
+
+def _search_index_path(namespace: str) -> str:
+    directory = os.getenv("TIDIO_SEARCH_INDEX_DIR")
+    if not directory:
+        return ":memory:"
+
+    return os.path.join(directory, f"tidio-mcp-search-{namespace}.sqlite3")
+
+
+sync_engines: weakref.WeakKeyDictionary[TidioApiClient, SyncEngine] = (
+    weakref.WeakKeyDictionary()
+)
+continuation_stores: weakref.WeakKeyDictionary[TidioApiClient, CacheBackend] = (
+    weakref.WeakKeyDictionary()
 )
 
 
-def _tool_call_succeed(data: dict = None) -> dict:
-    return {
+def _rate_limiter(kind: str, rate: str, burst: str) -> TokenBucket:
+    """
+    Token bucket of one worker process. Workers do not share buckets, so the
+    configured account limits are split evenly between TIDIO_MCP_WORKERS.
+    """
+    workers = max(1, int(os.getenv("TIDIO_MCP_WORKERS", "1")))
+
+    return TokenBucket(
+        rate=float(os.getenv(f"TIDIO_{kind}_RATE_LIMIT", rate)) / workers,
+        burst=max(1, int(os.getenv(f"TIDIO_{kind}_RATE_BURST", burst)) // workers),
+    )
+
+
+def _create_tidio_api_client(client_id: str, client_secret: str) -> TidioApiClient:
+    """
+    Create a client for one Tidio account, with its own connection pool, rate
+    limiters, cache namespace, continuation store and search index sync.
+    """
+    namespace = _tenant_namespace(client_id, client_secret)
+    client = TidioApiClient(
+        client_id=client_id,
+        client_secret=client_secret,
+        max_connections=int(os.getenv("TIDIO_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(
+            os.getenv("TIDIO_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+        ),
+        http2=os.getenv("TIDIO_HTTP2", "true").lower() == "true",
+        cache_ttls={
+            "/departments": float(os.getenv("TIDIO_CACHE_REFERENCE_TTL", "300")),
+            "/operators": float(os.getenv("TIDIO_CACHE_REFERENCE_TTL", "300")),
+            "/tickets/{ticket_id}": float(os.getenv("TIDIO_CACHE_DETAILS_TTL", "60")),
+            "/contacts/{contact_id}": float(os.getenv("TIDIO_CACHE_DETAILS_TTL", "60")),
+        },
+        cache_stale_ttls={
+            "/departments": float(os.getenv("TIDIO_CACHE_STALE_TTL", "3600")),
+            "/operators": float(os.getenv("TIDIO_CACHE_STALE_TTL", "3600")),
+        },
+        cache=_create_response_cache(namespace),
+        retry_policy=RetryPolicy(
+            max_attempts=int(os.getenv("TIDIO_RETRY_MAX_ATTEMPTS", "3")),
+            deadline=float(os.getenv("TIDIO_RETRY_DEADLINE", "30")),
+        ),
+        read_rate_limiter=_rate_limiter("READ", rate="10", burst="20"),
+        write_rate_limiter=_rate_limiter("WRITE", rate="5", burst="10"),
+        codec=JSON_CODEC,
+        metrics=server_metrics,
+        base_url=os.getenv("TIDIO_API_BASE_URL", TidioApiClient.BASE_URL),
+    )
+    index_path = _search_index_path(namespace)
+    sync_engines[client] = SyncEngine(
+        client,
+        SearchIndex(index_path),
+        interval=float(os.getenv("TIDIO_SYNC_INTERVAL", "60")),
+        concurrency=int(os.getenv("TIDIO_SYNC_CONCURRENCY", "4")),
+        lock_path=None if index_path == ":memory:" else f"{index_path}.lock",
+        rate_limiter=_rate_limiter("SYNC", rate="5", burst="5"),
+        details_max_age=float(os.getenv("TIDIO_SYNC_DETAILS_MAX_AGE", "900")),
+    )
+    continuation_stores[client] = _create_continuation_store(namespace)
+
+    return client
+
+
+def _default_tidio_api_client() -> TidioApiClient:
+    """
+    Client of the credentials from the environment. Created on the first tool
+    call rather than at import, as its connection pool, TLS context and search
+    index would delay the initialize response of every new stdio process.
+    """
+    global tidio_api_client
+
+    client = globals().get("tidio_api_client")
+    if client is None:
+        client = tidio_api_client = _create_tidio_api_client(
+            os.getenv("TIDIO_CLIENT_ID", ""), os.getenv("TIDIO_CLIENT_SECRET", "")
+        )
+
+    return client
+
+
+def __getattr__(name: str):
+    # Keeps server.tidio_api_client working before the first tool call.
+    if name == "tidio_api_client":
+        return _default_tidio_api_client()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+tidio_client_pool = TidioClientPool(
+    _create_tidio_api_client, max_size=int(os.getenv("TIDIO_TENANT_POOL_SIZE", "64"))
+)
+
+
+def _http_request() -> Request | None:
+    """
+    Returns:
+        Request | None: HTTP request of the current MCP request, or None when
+            not served over HTTP or not called from within an MCP request.
+    """
+    try:
+        return mcp.get_context().request_context.request
+    except ValueError:
+        return None
+
+
+def _current_tidio_api_client() -> TidioApiClient:
+    """
+    Resolve the client of the current request.
+
+    With TIDIO_MULTI_TENANT enabled, HTTP requests are served with the
+    credentials of their X-Tidio-Client-Id and X-Tidio-Client-Secret headers.
+    Calls outside of an HTTP request, e.g. over stdio, use the credentials from
+    the environment.
+
+    Raises:
+        ValueError: If an HTTP request in multi-tenant mode lacks either header.
+    """
+    if os.getenv("TIDIO_MULTI_TENANT", "false").lower() != "true":
+        return _default_tidio_api_client()
+
+    request = _http_request()
+    if request is None:
+        return _default_tidio_api_client()
+
+    client_id = request.headers.get(TENANT_CLIENT_ID_HEADER)
+    client_secret = request.headers.get(TENANT_CLIENT_SECRET_HEADER)
+    if not client_id or not client_secret:
+        raise ValueError(
+            "Multi-tenant mode requires the X-Tidio-Client-Id and "
+            "X-Tidio-Client-Secret headers"
+        )
+
+    return tidio_client_pool.get(client_id, client_secret)
+
+
+def _continuation_store() -> CacheBackend:
+    return continuation_stores[_current_tidio_api_client()]
+
+
+async def _store_continuations(texts: dict[str, str]) -> None:
+    """
+    Keep the full texts of truncated strings by their continuation handles. Kept
+    in the continuation store, so any worker sharing its backend can read them.
+    """
+    cache = _continuation_store()
+    for handle, text in texts.items():
+        await cache.set(
+            f"/_continuations/{handle}", {"text": text}, ttl=CONTINUATION_TTL
+        )
+
+
+async def _buffer_messages(messages: list[dict]) -> str:
+    """
+    Keep a message thread in the continuation store, in chunks, so pages of it
+    can be read without fetching the ticket again.
+
+    Returns:
+        str: Handle of the buffered thread.
+    """
+    cache = _continuation_store()
+    handle = secrets.token_urlsafe(12)
+
+    await cache.set(
+        f"/_messages/{handle}", {"total": len(messages)}, ttl=CONTINUATION_TTL
+    )
+    for start in range(0, len(messages), MESSAGES_BUFFER_CHUNK_SIZE):
+        await cache.set(
+            f"/_messages/{handle}/{start // MESSAGES_BUFFER_CHUNK_SIZE}",
+            {"messages": messages[start : start + MESSAGES_BUFFER_CHUNK_SIZE]},
+            ttl=CONTINUATION_TTL,
+        )
+
+    return handle
+
+
+async def _buffered_messages(handle: str, start: int, end: int) -> list[dict] | None:
+    """
+    Returns:
+        List | None: Messages from start to end (exclusive) of a buffered thread,
+            or None if any part of it has expired.
+    """
+    cache = _continuation_store()
+    first_chunk = start // MESSAGES_BUFFER_CHUNK_SIZE
+    last_chunk = (end - 1) // MESSAGES_BUFFER_CHUNK_SIZE
+
+    messages = []
+    for chunk in range(first_chunk, last_chunk + 1):
+        entry = await cache.get(f"/_messages/{handle}/{chunk}")
+        if entry is None:
+            return None
+
+        messages.extend(entry.value["messages"])
+
+    offset = first_chunk * MESSAGES_BUFFER_CHUNK_SIZE
+
+    return messages[start - offset : end - offset]
+
+
+async def _tool_call_succeed(data: dict = None) -> dict:
+    continuations = {}
+
+    def store_text(text: str) -> str | None:
+        # Further long texts of a large result are returned whole.
+        if len(continuations) >= CONTINUATIONS_PER_RESULT:
+            return None
+
+        handle = secrets.token_urlsafe(12)
+        continuations[handle] = text
+
+        return handle
+
+    shaper = ResponseShaper(RESPONSE_SHAPING, store_text=store_text, codec=JSON_CODEC)
+    data, bytes_saved = shaper.shape(data or {})
+    await _store_continuations(continuations)
+
+    result = {
         "status": "ok",
-        "data": data or {},
+        "data": data,
+    }
+    if bytes_saved:
+        result["bytes_saved"] = bytes_saved
+
+    return result
+
+
+async def _run_concurrently(
+    calls: list[Callable[[], Awaitable[dict]]], max_concurrency: int = None
+) -> list[dict | TidioApiError]:
+    """
+    Run API calls concurrently, at most max_concurrency at a time.
+
+    Returns:
+        List: Results in the order of calls. Failed calls are returned as TidioApiError.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or BATCH_CONCURRENCY)
+
+    async def run(call: Callable[[], Awaitable[dict]]) -> dict | TidioApiError:
+        async with semaphore:
+            try:
+                return await call()
+            except TidioApiError as e:
+                return e
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _batch_result(chunks: list[list], results: list[dict | TidioApiError]) -> dict:
+    errors = []
+    responses = []
+    start_index = 0
+
+    for chunk, result in zip(chunks, results, strict=True):
+        if isinstance(result, TidioApiError):
+            errors.append(
+                {
+                    "start_index": start_index,
+                    "end_index": start_index + len(chunk) - 1,
+                    "error": str(result),
+                }
+            )
+        else:
+            responses.append(result)
+
+        start_index += len(chunk)
+
+    failed = sum(error["end_index"] - error["start_index"] + 1 for error in errors)
+
+    return {
+        "total": start_index,
+        "succeeded": start_index - failed,
+        "failed": failed,
+        "errors": errors,
+        "responses": responses,
+    }
+
+
+def _ticket_update_data(status: str, priority: str, assigned: dict) -> dict:
+    """
+    Raises:
+        ValueError: If any of the provided arguments have invalid values.
+    """
+    update_data = {}
+    if status is not None:
+        if status not in ["open", "pending", "solved"]:
+            raise ValueError("Status must be one of: open, pending, solved")
+        update_data["status"] = status
+
+    if priority is not None:
+        if priority not in ["low", "normal", "urgent"]:
+            raise ValueError("Priority must be one of: low, normal, urgent")
+        update_data["priority"] = priority
+
+    if assigned is not None:
+        if not isinstance(assigned, dict):
+            raise ValueError("Assigned must be a dictionary object")
+
+        if "type" not in assigned or "id" not in assigned:
+            raise ValueError("Assigned must contain both 'type' and 'id' fields")
+
+        if assigned["type"] not in ["operator", "department"]:
+            raise ValueError("Assigned type must be either 'operator' or 'department'")
+
+        if not isinstance(assigned["id"], str):
+            raise ValueError("Assigned id must be a string")
+
+        update_data["assigned"] = assigned
+
+    return update_data
+
+
+async def _patch_ticket(ticket_id: int, update_data: dict) -> dict:
+    # Status and priority map directly onto the ticket details, so the cached
+    # ticket is patched. Assignment changes evict it instead.
+    cached_changes = None if "assigned" in update_data else update_data
+
+    return await _current_tidio_api_client().patch(
+        f"/tickets/{ticket_id}", json_data=update_data, cached_changes=cached_changes
+    )
+
+
+async def _get_many(endpoint: str, ids: list, items_key: str) -> dict:
+    ids = list(dict.fromkeys(ids))
+    results = await _run_concurrently(
+        [
+            partial(_current_tidio_api_client().get, f"{endpoint}/{entity_id}")
+            for entity_id in ids
+        ],
+        max_concurrency=FETCH_CONCURRENCY,
+    )
+
+    items = {}
+    errors = {}
+    for entity_id, result in zip(ids, results, strict=True):
+        if isinstance(result, TidioApiError):
+            errors[str(entity_id)] = str(result)
+        else:
+            items[str(entity_id)] = result
+
+    return {items_key: items, "errors": errors}
+
+
+def _bulk_result(ids: list, results: list[dict | TidioApiError]) -> dict:
+    succeeded = []
+    failed = {}
+
+    for entity_id, result in zip(ids, results, strict=True):
+        if isinstance(result, TidioApiError):
+            failed[str(entity_id)] = str(result)
+        else:
+            succeeded.append(entity_id)
+
+    return {"succeeded": succeeded, "failed": failed}
+
+
+async def _get_list(
+    endpoint: str,
+    items_key: str,
+    query_params: dict,
+    max_pages: int = None,
+    max_items: int = None,
+    item_filter: Callable[[dict], bool] = None,
+) -> dict:
+    """
+    Fetch a cursor-paginated list. Without limits a single page is returned as is,
+    otherwise pages are walked and merged until a limit or the last page is reached.
+    Items rejected by item_filter are dropped and do not count towards max_items.
+    With an item_filter at most FILTER_MAX_PAGES pages are walked unless
+    max_pages is given, as max_items may never be reached.
+
+    Raises:
+        ValueError: If max_pages or max_items is lower than 1.
+    """
+    if max_pages is None and max_items is None:
+        if query_params:
+            endpoint += f"?{urlencode(query_params)}"
+
+        response = await _current_tidio_api_client().get(endpoint)
+        if item_filter is not None:
+            response = {
+                **response,
+                items_key: list(filter(item_filter, response.get(items_key) or [])),
+            }
+
+        return response
+
+    if max_pages is not None and max_pages < 1:
+        raise ValueError("Max pages must be greater than 0")
+
+    if max_items is not None and max_items < 1:
+        raise ValueError("Max items must be greater than 0")
+
+    if item_filter is not None and max_pages is None:
+        max_pages = FILTER_MAX_PAGES
+
+    items = []
+    meta = {}
+    pages_fetched = 0
+
+    async for page in _current_tidio_api_client().paginate(endpoint, query_params):
+        items.extend(
+            item
+            for item in page.get(items_key) or []
+            if item_filter is None or item_filter(item)
+        )
+        meta = page.get("meta") or {}
+        pages_fetched += 1
+
+        if max_pages is not None and pages_fetched >= max_pages:
+            break
+
+        if max_items is not None and len(items) >= max_items:
+            break
+
+    return {
+        items_key: items,
+        "meta": {**meta, "pages_fetched": pages_fetched},
     }
 
 
+def _parse_datetime(value: str) -> datetime:
+    """
+    Raises:
+        ValueError: If value is not an ISO 8601 date or datetime.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+
+    return parsed
+
+
+def _validate_ticket_filters(
+    status: str, priority: str, created_after: str, created_before: str
+) -> None:
+    """
+    Raises:
+        ValueError: If any of the provided arguments have invalid values.
+    """
+    if status is not None and status not in ["open", "pending", "solved"]:
+        raise ValueError("Status must be one of: open, pending, solved")
+
+    if priority is not None and priority not in ["low", "normal", "urgent"]:
+        raise ValueError("Priority must be one of: low, normal, urgent")
+
+    for date in [created_after, created_before]:
+        if date is not None:
+            try:
+                _parse_datetime(date)
+            except ValueError:
+                raise ValueError(
+                    "Created after and created before must be ISO 8601 dates"
+                ) from None
+
+
+def _ticket_filter(
+    status: str = None,
+    priority: str = None,
+    assignee: str = None,
+    department: str = None,
+    created_after: str = None,
+    created_before: str = None,
+) -> Callable[[dict], bool] | None:
+    """
+    Returns:
+        Callable | None: Predicate matching tickets with all given values, or None
+            when no filter is given.
+    """
+    expected = {
+        "status": status,
+        "priority": priority,
+        "assigned_operator_id": assignee,
+        "assigned_department_id": department,
+    }
+    expected = {key: value for key, value in expected.items() if value is not None}
+    after = _parse_datetime(created_after) if created_after is not None else None
+    before = _parse_datetime(created_before) if created_before is not None else None
+
+    if not expected and after is None and before is None:
+        return None
+
+    def matches(ticket: dict) -> bool:
+        if any(ticket.get(key) != value for key, value in expected.items()):
+            return False
+
+        if after is None and before is None:
+            return True
+
+        try:
+            created_at = _parse_datetime(ticket["created_at"])
+        except (KeyError, TypeError, ValueError):
+            # Missing or unparseable dates never match a date range.
+            return False
+
+        return (after is None or created_at >= after) and (
+            before is None or created_at < before
+        )
+
+    return matches
+
+
+def _shape_list(
+    response: dict, items_key: str, fields: list[str] = None, sort_by: str = None
+) -> dict:
+    """
+    Sort the items of a list response by a field, "-" prefixed for descending
+    order, with missing values last. Then keep only the given fields of every
+    item, and always its id.
+
+    Raises:
+        ValueError: If the values of the sort field are not all numbers or all
+            strings.
+    """
+    items = response.get(items_key) or []
+
+    if sort_by:
+        key = sort_by.removeprefix("-")
+        present = [item for item in items if item.get(key) is not None]
+        missing = [item for item in items if item.get(key) is None]
+        values = [item[key] for item in present]
+        if not (
+            all(isinstance(value, str) for value in values)
+            or all(isinstance(value, int | float) for value in values)
+        ):
+            raise ValueError(
+                f"Sort by field '{key}' must hold only numbers or only strings"
+            )
+        present.sort(key=lambda item: item[key], reverse=sort_by.startswith("-"))
+        items = present + missing
+
+    if fields:
+        keep = {"id", *fields}
+        items = [
+            {field: value for field, value in item.items() if field in keep}
+            for item in items
+        ]
+
+    return {**response, items_key: items}
+
+
 @mcp.tool(title="Get Departments")
-def get_departments() -> dict:
+async def get_departments() -> dict:
     """
     Get all departments from Tidio. Departments are a agent groups, and can be assigned to tickets.
 
     Returns:
         Dict: A dictionary containing departments information.
     """
-    response = tidio_api_client.get("/departments")
+    response = await _current_tidio_api_client().get("/departments")
 
-    return _tool_call_succeed(data=response)
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Get Operators")
-def get_operators(cursor: str = None) -> dict:
+async def get_operators(
+    cursor: str = None,
+    max_pages: int = None,
+    max_items: int = None,
+    fields: list[str] = None,
+    sort_by: str = None,
+) -> dict:
     """
     Get all operators from Tidio. Operators are agents that manage tickets and contact with customers. Operator can be assigned to tickets.
 
@@ -48,22 +753,44 @@ def get_operators(cursor: str = None) -> dict:
     Args:
         cursor (str, optional): Pagination cursor from previous response. Use the value from meta.cursor
             to fetch the next page of results.
+        max_pages (int, optional): Fetch up to this many pages in one call and merge them into a single result.
+        max_items (int, optional): Keep fetching pages until at least this many items are collected.
+            Whole pages are returned, so the result may contain slightly more items.
+            When max_pages or max_items is set, meta.cursor points to the next unread page (null when
+            everything was fetched) and meta.pages_fetched holds the number of fetched pages.
+        fields (list[str], optional): Return only these fields of every operator, e.g. ["name", "email"].
+            The id is always returned. Use it to keep responses small.
+        sort_by (str, optional): Field to sort the returned operators by, e.g. "name". Prefix with "-"
+            for descending order. Only the operators of this response are sorted.
 
     Returns:
         Dict: A dictionary containing operator information and pagination metadata.
+
+    Raises:
+        ValueError: If max_pages or max_items is lower than 1.
     """
-    endpoint = "/operators"
+    query_params = {}
 
     if cursor is not None:
-        endpoint += f"?{urlencode({'cursor': cursor})}"
+        query_params["cursor"] = cursor
 
-    response = tidio_api_client.get(endpoint)
+    response = await _get_list(
+        "/operators", "operators", query_params, max_pages, max_items
+    )
+    response = _shape_list(response, "operators", fields, sort_by)
 
-    return _tool_call_succeed(data=response)
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Get Contacts")
-def get_contacts(cursor: str = None, email: str = None) -> dict:
+async def get_contacts(
+    cursor: str = None,
+    email: str = None,
+    max_pages: int = None,
+    max_items: int = None,
+    fields: list[str] = None,
+    sort_by: str = None,
+) -> dict:
     """
     Get all contacts from Tidio. Contacts are customers that have contacted company via chat or email.
 
@@ -76,11 +803,22 @@ def get_contacts(cursor: str = None, email: str = None) -> dict:
             to fetch the next page of results.
         email (str, optional): Filter contacts by email address. Must be a full, valid email address
             (wildcards not supported).
+        max_pages (int, optional): Fetch up to this many pages in one call and merge them into a single result.
+        max_items (int, optional): Keep fetching pages until at least this many items are collected.
+            Whole pages are returned, so the result may contain slightly more items.
+            When max_pages or max_items is set, meta.cursor points to the next unread page (null when
+            everything was fetched) and meta.pages_fetched holds the number of fetched pages.
+        fields (list[str], optional): Return only these fields of every contact, e.g. ["email", "first_name"].
+            The id is always returned. Use it to keep responses small.
+        sort_by (str, optional): Field to sort the returned contacts by, e.g. "email". Prefix with "-"
+            for descending order. Only the contacts of this response are sorted.
 
     Returns:
         Dict: A dictionary containing contacts information and pagination metadata.
+
+    Raises:
+        ValueError: If max_pages or max_items is lower than 1.
     """
-    endpoint = "/contacts"
     query_params = {}
 
     if cursor is not None:
@@ -89,16 +827,16 @@ def get_contacts(cursor: str = None, email: str = None) -> dict:
     if email is not None:
         query_params["email"] = email
 
-    if query_params:
-        endpoint += f"?{urlencode(query_params)}"
-
-    response = tidio_api_client.get(endpoint)
+    response = await _get_list(
+        "/contacts", "contacts", query_params, max_pages, max_items
+    )
+    response = _shape_list(response, "contacts", fields, sort_by)
 
-    return _tool_call_succeed(data=response)
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Get Contact details")
-def get_contact_details(contact_id: str) -> dict:
+async def get_contact_details(contact_id: str) -> dict:
     """
     Get details of a specific contact (customer) from Tidio.
 
@@ -108,13 +846,36 @@ def get_contact_details(contact_id: str) -> dict:
     Returns:
         Dict: A dictionary containing the contact details.
     """
-    response = tidio_api_client.get(f"/contacts/{contact_id}")
+    response = await _current_tidio_api_client().get(f"/contacts/{contact_id}")
+
+    return await _tool_call_succeed(data=response)
 
-    return _tool_call_succeed(data=response)
+
+@mcp.tool(title="Get multiple Contacts details")
+async def get_contacts_details(contact_ids: list[str]) -> dict:
+    """
+    Get details of many contacts (customers) from Tidio at once. Use this instead of fetching contacts one by one.
+
+    Args:
+        contact_ids (list[str]): Required. The UUIDs of the contacts to retrieve.
+
+    Returns:
+        Dict: A dictionary with a map of contact IDs to contact details and a map of contact IDs
+            that could not be fetched to errors.
+
+    Raises:
+        ValueError: If contact IDs list is empty.
+    """
+    if not contact_ids:
+        raise ValueError("Contact IDs cannot be empty")
+
+    response = await _get_many("/contacts", contact_ids, "contacts")
+
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Delete Contact")
-def delete_contact(contact_id: str) -> dict:
+async def delete_contact(contact_id: str) -> dict:
     """
     Delete a specific contact (customer) from Tidio.
 
@@ -124,13 +885,109 @@ def delete_contact(contact_id: str) -> dict:
     Returns:
         Dict: A dictionary with success status.
     """
-    tidio_api_client.delete(f"/contacts/{contact_id}")
+    await _current_tidio_api_client().delete(f"/contacts/{contact_id}")
+
+    return await _tool_call_succeed()
+
+
+@mcp.tool(title="Create multiple Contacts")
+async def create_contacts_batch(contacts: list[dict]) -> dict:
+    """
+    Create many contacts (customers) in Tidio at once. Use this for bulk imports instead of creating contacts one by one.
+
+    Contacts are sent in batches of 100, several batches at a time.
+
+    Args:
+        contacts (list[dict]): Required. Contacts to create, e.g.
+            [{"email": "john@example.com", "first_name": "John", "last_name": "Doe"}].
+
+    Returns:
+        Dict: A dictionary with the number of total, succeeded and failed contacts, a list of errors
+            and the API responses of successful batches. Each error covers the contacts between
+            start_index and end_index (inclusive) of the input list. Contacts not covered by any
+            error were created.
+
+    Raises:
+        ValueError: If contacts list is empty.
+    """
+    if not contacts:
+        raise ValueError("Contacts cannot be empty")
+
+    chunks = _chunks(contacts, CONTACTS_BATCH_SIZE)
+    results = await _run_concurrently(
+        [
+            partial(
+                _current_tidio_api_client().post,
+                "/contacts/batch",
+                json_data={"contacts": chunk},
+            )
+            for chunk in chunks
+        ]
+    )
 
-    return _tool_call_succeed()
+    return await _tool_call_succeed(data=_batch_result(chunks, results))
+
+
+@mcp.tool(title="Update multiple Contacts")
+async def update_contacts_batch(contacts: list[dict]) -> dict:
+    """
+    Update many contacts (customers) in Tidio at once. Use this for bulk updates instead of updating contacts one by one.
+
+    Contacts are sent in batches of 100, several batches at a time.
+
+    Args:
+        contacts (list[dict]): Required. Contacts to update. Each contact must contain the 'id' (UUID)
+            of the contact and the fields to change, e.g. [{"id": "uuid-here", "first_name": "John"}].
+
+    Returns:
+        Dict: A dictionary with the number of total, succeeded and failed contacts, a list of errors
+            and the API responses of successful batches. Each error covers the contacts between
+            start_index and end_index (inclusive) of the input list. Contacts not covered by any
+            error were updated.
+
+    Raises:
+        ValueError: If contacts list is empty or any contact has no valid 'id'.
+    """
+    if not contacts:
+        raise ValueError("Contacts cannot be empty")
+
+    for contact in contacts:
+        if not isinstance(contact, dict) or not isinstance(contact.get("id"), str):
+            raise ValueError("Each contact must be a dictionary with a string 'id'")
+
+    async def update_chunk(chunk: list[dict]) -> dict:
+        try:
+            return await _current_tidio_api_client().patch(
+                "/contacts/batch", json_data={"contacts": chunk}
+            )
+        finally:
+            for contact in chunk:
+                await _current_tidio_api_client().invalidate(
+                    f"/contacts/{contact['id']}"
+                )
+
+    chunks = _chunks(contacts, CONTACTS_BATCH_SIZE)
+    results = await _run_concurrently(
+        [partial(update_chunk, chunk) for chunk in chunks]
+    )
+
+    return await _tool_call_succeed(data=_batch_result(chunks, results))
 
 
 @mcp.tool(title="Get Tickets")
-def get_tickets(cursor: str = None) -> dict:
+async def get_tickets(
+    cursor: str = None,
+    max_pages: int = None,
+    max_items: int = None,
+    status: str = None,
+    priority: str = None,
+    assignee: str = None,
+    department: str = None,
+    created_after: str = None,
+    created_before: str = None,
+    fields: list[str] = None,
+    sort_by: str = None,
+) -> dict:
     """
     Get all tickets from Tidio. Use this to get tickets overview.
 
@@ -141,38 +998,267 @@ def get_tickets(cursor: str = None) -> dict:
     Args:
         cursor (str, optional): Pagination cursor from previous response. Use the value from meta.cursor
             to fetch the next page of results.
+        max_pages (int, optional): Fetch up to this many pages in one call and merge them into a single result.
+        max_items (int, optional): Keep fetching pages until at least this many items are collected.
+            Whole pages are returned, so the result may contain slightly more items.
+            When max_pages or max_items is set, meta.cursor points to the next unread page (null when
+            everything was fetched) and meta.pages_fetched holds the number of fetched pages.
+        status (str, optional): Return only tickets with this status. Must be one of: 'open', 'pending', 'solved'.
+        priority (str, optional): Return only tickets with this priority. Must be one of: 'low', 'normal', 'urgent'.
+        assignee (str, optional): Return only tickets assigned to the operator with this UUID.
+        department (str, optional): Return only tickets assigned to the department with this UUID.
+        created_after (str, optional): ISO 8601 date or datetime. Return only tickets created at or after it.
+        created_before (str, optional): ISO 8601 date or datetime. Return only tickets created before it.
+            Filters are applied to the fetched pages, so combine them with max_items to collect enough
+            matching tickets, as a single page may contain none. Filtered calls fetch at most 20 pages
+            unless max_pages is set, continue from meta.cursor to read further.
+            The date filters need created_at on the listed tickets, tickets without it never match.
+            Use search_tickets to filter by creation date when the list does not include it.
+        fields (list[str], optional): Return only these fields of every ticket, e.g. ["subject", "status"].
+            The id is always returned. Use it to keep responses small.
+        sort_by (str, optional): Field to sort the returned tickets by, e.g. "-priority". Prefix with "-"
+            for descending order. Only the tickets of this response are sorted.
 
     Returns:
         Dict: A dictionary containing ticket information and pagination metadata.
+
+    Raises:
+        ValueError: If any of the provided arguments have invalid values.
     """
-    endpoint = "/tickets"
+    _validate_ticket_filters(status, priority, created_after, created_before)
+
+    query_params = {}
 
     if cursor is not None:
-        endpoint += f"?{urlencode({'cursor': cursor})}"
+        query_params["cursor"] = cursor
 
-    response = tidio_api_client.get(endpoint)
+    response = await _get_list(
+        "/tickets",
+        "tickets",
+        query_params,
+        max_pages,
+        max_items,
+        item_filter=_ticket_filter(
+            status, priority, assignee, department, created_after, created_before
+        ),
+    )
+    response = _shape_list(response, "tickets", fields, sort_by)
 
-    return _tool_call_succeed(data=response)
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Get Ticket details")
-def get_ticket_details(ticket_id: int) -> dict:
+async def get_ticket_details(ticket_id: int, last_messages: int = None) -> dict:
     """
     Get details of a specific ticket from Tidio. Use this to get full ticket information including messages.
 
     Args:
         ticket_id (int): Required. The ID of the ticket to retrieve.
+        last_messages (int, optional): Return only this many of the most recent messages. Use it for long tickets.
+            When older messages exist, messages_page holds a handle and the index to pass to
+            get_ticket_messages to read them.
 
     Returns:
         Dict: A dictionary containing the ticket details.
+
+    Raises:
+        ValueError: If last_messages is lower than 1.
+    """
+    if last_messages is not None and last_messages < 1:
+        raise ValueError("Last messages must be greater than 0")
+
+    response = await _current_tidio_api_client().get(f"/tickets/{ticket_id}")
+
+    if last_messages is not None:
+        messages = response.get("messages") or []
+        before = max(0, len(messages) - last_messages)
+        response = {
+            **response,
+            "messages": messages[before:],
+            "messages_page": {
+                "handle": await _buffer_messages(messages) if before else None,
+                "before": before or None,
+                "total": len(messages),
+            },
+        }
+
+    return await _tool_call_succeed(data=response)
+
+
+@mcp.tool(title="Get Ticket messages")
+async def get_ticket_messages(handle: str, before: int, limit: int = 20) -> dict:
+    """
+    Page backwards through the messages of a long ticket, after get_ticket_details was called with last_messages.
+
+    Args:
+        handle (str): Required. The handle from messages_page of get_ticket_details.
+        before (int): Required. Return messages before this index, e.g. messages_page.before
+            or the before value of the previous call.
+        limit (int, optional): Maximum number of messages to return. Defaults to 20.
+
+    Returns:
+        Dict: A dictionary containing the messages in chronological order and the index to continue from
+            (null when the first message was reached).
+
+    Raises:
+        ValueError: If the handle is unknown or expired, or before or limit have invalid values.
+    """
+    if limit < 1:
+        raise ValueError("Limit must be greater than 0")
+
+    entry = await _continuation_store().get(f"/_messages/{handle}")
+    if entry is None:
+        raise ValueError("Handle is unknown or expired")
+
+    total = entry.value["total"]
+    if before < 1 or before > total:
+        raise ValueError(f"Before must be between 1 and {total}")
+
+    start = max(0, before - limit)
+    messages = await _buffered_messages(handle, start, before)
+    if messages is None:
+        raise ValueError("Handle is unknown or expired")
+
+    return await _tool_call_succeed(
+        data={"messages": messages, "before": start or None, "total": total}
+    )
+
+
+@mcp.tool(title="Get multiple Tickets details")
+async def get_tickets_details(ticket_ids: list[int]) -> dict:
     """
-    response = tidio_api_client.get(f"/tickets/{ticket_id}")
+    Get details of many tickets from Tidio at once, including messages. Use this instead of fetching tickets one by one.
+
+    Args:
+        ticket_ids (list[int]): Required. The IDs of the tickets to retrieve.
 
-    return _tool_call_succeed(data=response)
+    Returns:
+        Dict: A dictionary with a map of ticket IDs to ticket details and a map of ticket IDs
+            that could not be fetched to errors.
+
+    Raises:
+        ValueError: If ticket IDs list is empty.
+    """
+    if not ticket_ids:
+        raise ValueError("Ticket IDs cannot be empty")
+
+    response = await _get_many("/tickets", ticket_ids, "tickets")
+
+    return await _tool_call_succeed(data=response)
+
+
+@mcp.tool(title="Search Tickets")
+async def search_tickets(
+    query: str = None,
+    status: str = None,
+    priority: str = None,
+    assignee: str = None,
+    created_after: str = None,
+    created_before: str = None,
+    limit: int = 50,
+) -> dict:
+    """
+    Search tickets by keywords and filters in a local index, instead of paging through all tickets. The index is synced with Tidio in the background, so changes from the last few minutes may be missing. While the first sync of a large account is running, results only cover the tickets synced so far and meta.complete is false.
+
+    Args:
+        query (str, optional): Keywords that must all appear in the ticket subject, its messages, or the contact email or name. Example: "refund invoice".
+        status (str, optional): Ticket status. Must be one of: 'open', 'pending', 'solved'.
+        priority (str, optional): Ticket priority. Must be one of: 'low', 'normal', 'urgent'.
+        assignee (str, optional): UUID of the assigned operator or department.
+        created_after (str, optional): ISO 8601 date or datetime. Only tickets created at or after it are returned.
+        created_before (str, optional): ISO 8601 date or datetime. Only tickets created before it are returned.
+        limit (int, optional): Maximum number of tickets to return, most recently updated first. Defaults to 50.
+
+    Returns:
+        Dict: A dictionary containing the matching tickets (without messages), the time of the last complete sync and whether the index is up to date.
+
+    Raises:
+        ValueError: If any of the provided arguments have invalid values.
+    """
+    _validate_ticket_filters(status, priority, created_after, created_before)
+
+    if limit < 1:
+        raise ValueError("Limit must be greater than 0")
+
+    engine = sync_engines[_current_tidio_api_client()]
+    if SYNC_IN_BACKGROUND:
+        engine.start()
+
+    complete = await engine.ensure_fresh(SEARCH_MAX_STALENESS, timeout=SEARCH_SYNC_WAIT)
+    synced_at = engine.index.synced_at
+
+    tickets = engine.index.search_tickets(
+        query=query,
+        status=status,
+        priority=priority,
+        assignee=assignee,
+        created_after=created_after,
+        created_before=created_before,
+        limit=limit,
+    )
+
+    return await _tool_call_succeed(
+        data={
+            "tickets": tickets,
+            "meta": {
+                "count": len(tickets),
+                "synced_at": (
+                    datetime.fromtimestamp(synced_at, UTC).isoformat()
+                    if synced_at is not None
+                    else None
+                ),
+                "complete": complete,
+            },
+        }
+    )
+
+
+@mcp.tool(title="Read Truncated Text")
+async def read_truncated_text(handle: str, offset: int, length: int = None) -> dict:
+    """
+    Read more of a long text that was truncated in an earlier result. A truncated field is followed by a "<field>_continuation" object with the handle and the offset to continue from. Handles expire after a while.
+
+    Args:
+        handle (str): Required. The handle from the "<field>_continuation" object.
+        offset (int): Required. Character offset to read from, e.g. the offset from the "<field>_continuation" object
+            or next_offset from the previous call.
+        length (int, optional): Maximum number of characters to read.
+
+    Returns:
+        Dict: A dictionary containing the text, the offset to continue from (null at the end) and the total length.
+
+    Raises:
+        ValueError: If the handle is unknown or expired, or offset or length have invalid values.
+    """
+    if offset < 0:
+        raise ValueError("Offset cannot be negative")
+
+    if length is None:
+        length = RESPONSE_SHAPING.max_text_length or 4000
+
+    if length < 1:
+        raise ValueError("Length must be greater than 0")
+
+    entry = await _continuation_store().get(f"/_continuations/{handle}")
+    if entry is None:
+        raise ValueError("Handle is unknown or expired")
+
+    text = entry.value["text"]
+    end = offset + length
+
+    # Not shaped again, the text would be truncated to the same length.
+    return {
+        "status": "ok",
+        "data": {
+            "text": text[offset:end],
+            "next_offset": end if end < len(text) else None,
+            "total_length": len(text),
+        },
+    }
 
 
 @mcp.tool(title="Delete Ticket")
-def delete_ticket(ticket_id: int) -> dict:
+async def delete_ticket(ticket_id: int) -> dict:
     """
     Delete a specific ticket from Tidio.
 
@@ -182,13 +1268,13 @@ def delete_ticket(ticket_id: int) -> dict:
     Returns:
         Dict: A dictionary with success status.
     """
-    tidio_api_client.delete(f"/tickets/{ticket_id}")
+    await _current_tidio_api_client().delete(f"/tickets/{ticket_id}")
 
-    return _tool_call_succeed()
+    return await _tool_call_succeed()
 
 
 @mcp.tool(title="Create Ticket")
-def create_ticket(
+async def create_ticket(
     contact_email: str,
     subject: str,
     message_content: str,
@@ -215,13 +1301,15 @@ def create_ticket(
     if assigned_department_id is not None:
         ticket_data["assigned_department_id"] = assigned_department_id
 
-    response = tidio_api_client.post("/tickets/as-contact", json_data=ticket_data)
+    response = await _current_tidio_api_client().post(
+        "/tickets/as-contact", json_data=ticket_data
+    )
 
-    return _tool_call_succeed(data=response)
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Update Ticket")
-def update_ticket(
+async def update_ticket(
     ticket_id: int,
     status: str = None,
     priority: str = None,
@@ -248,44 +1336,20 @@ def update_ticket(
     Raises:
         ValueError: If any of the provided arguments have invalid values.
     """
-    update_data = {}
-    if status is not None:
-        if status not in ["open", "pending", "solved"]:
-            raise ValueError("Status must be one of: open, pending, solved")
-        update_data["status"] = status
-
-    if priority is not None:
-        if priority not in ["low", "normal", "urgent"]:
-            raise ValueError("Priority must be one of: low, normal, urgent")
-        update_data["priority"] = priority
-
-    if assigned is not None:
-        if not isinstance(assigned, dict):
-            raise ValueError("Assigned must be a dictionary object")
-
-        if "type" not in assigned or "id" not in assigned:
-            raise ValueError("Assigned must contain both 'type' and 'id' fields")
-
-        if assigned["type"] not in ["operator", "department"]:
-            raise ValueError("Assigned type must be either 'operator' or 'department'")
-
-        if not isinstance(assigned["id"], str):
-            raise ValueError("Assigned id must be a string")
-
-        update_data["assigned"] = assigned
+    update_data = _ticket_update_data(status, priority, assigned)
 
     if not update_data:
         raise ValueError(
             "At least one parameter (status, priority, or assigned) must be provided"
         )
 
-    tidio_api_client.patch(f"/tickets/{ticket_id}", json_data=update_data)
+    await _patch_ticket(ticket_id, update_data)
 
-    return _tool_call_succeed()
+    return await _tool_call_succeed()
 
 
 @mcp.tool(title="Unassign Ticket")
-def unassign_ticket(ticket_id: int) -> dict:
+async def unassign_ticket(ticket_id: int) -> dict:
     """
     Unassign operator from ticket in Tidio.
 
@@ -296,13 +1360,94 @@ def unassign_ticket(ticket_id: int) -> dict:
         Dict: A dictionary with success status.
     """
     update_data = {"assigned": None}
-    tidio_api_client.patch(f"/tickets/{ticket_id}", json_data=update_data)
+    await _current_tidio_api_client().patch(
+        f"/tickets/{ticket_id}", json_data=update_data
+    )
+
+    return await _tool_call_succeed()
+
+
+@mcp.tool(title="Bulk update Tickets")
+async def bulk_update_tickets(
+    ticket_ids: list[int],
+    status: str = None,
+    priority: str = None,
+    assigned: dict = None,
+    unassign: bool = False,
+) -> dict:
+    """
+    Apply the same update to many tickets in Tidio at once. Use this for triage instead of updating tickets one by one.
+
+    Args:
+        ticket_ids (list[int]): Required. The IDs of the tickets to update.
+        status (str, optional): The new status for the tickets.
+            Must be one of: 'open', 'pending', 'solved'.
+        priority (str, optional): The new priority for the tickets.
+            Must be one of: 'low', 'normal', 'urgent'.
+        assigned (dict, optional): Dictionary with 'type' and 'id' fields
+            to assign the tickets. Example: {"type": "operator", "id": "uuid-here"}
+            or {"type": "department", "id": "dept-uuid-here"}.
+        unassign (bool, optional): Unassign operator from the tickets. Cannot be combined with assigned.
 
-    return _tool_call_succeed()
+    Returns:
+        Dict: A dictionary with the list of succeeded ticket IDs and a map of failed ticket IDs to errors.
+
+    Raises:
+        ValueError: If any of the provided arguments have invalid values.
+    """
+    if not ticket_ids:
+        raise ValueError("Ticket IDs cannot be empty")
+
+    if unassign and assigned is not None:
+        raise ValueError("Assigned and unassign cannot be used together")
+
+    update_data = _ticket_update_data(status, priority, assigned)
+    if unassign:
+        update_data["assigned"] = None
+
+    if not update_data:
+        raise ValueError(
+            "At least one parameter (status, priority, assigned, or unassign) must be provided"
+        )
+
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    results = await _run_concurrently(
+        [partial(_patch_ticket, ticket_id, update_data) for ticket_id in ticket_ids]
+    )
+
+    return await _tool_call_succeed(data=_bulk_result(ticket_ids, results))
+
+
+@mcp.tool(title="Bulk delete Tickets")
+async def bulk_delete_tickets(ticket_ids: list[int]) -> dict:
+    """
+    Delete many tickets from Tidio at once, e.g. spam tickets.
+
+    Args:
+        ticket_ids (list[int]): Required. The IDs of the tickets to delete.
+
+    Returns:
+        Dict: A dictionary with the list of succeeded ticket IDs and a map of failed ticket IDs to errors.
+
+    Raises:
+        ValueError: If ticket IDs list is empty.
+    """
+    if not ticket_ids:
+        raise ValueError("Ticket IDs cannot be empty")
+
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    results = await _run_concurrently(
+        [
+            partial(_current_tidio_api_client().delete, f"/tickets/{ticket_id}")
+            for ticket_id in ticket_ids
+        ]
+    )
+
+    return await _tool_call_succeed(data=_bulk_result(ticket_ids, results))
 
 
 @mcp.tool(title="Reply to a Ticket")
-def reply_to_a_ticket(ticket_id: int, content: str, operator_id: str) -> dict:
+async def reply_to_a_ticket(ticket_id: int, content: str, operator_id: str) -> dict:
     """
     Send a public reply to a specific ticket in Tidio. This reply will be visible to the customer and sent to them.
 
@@ -327,15 +1472,15 @@ def reply_to_a_ticket(ticket_id: int, content: str, operator_id: str) -> dict:
         "author_type": "operator",
     }
 
-    response = tidio_api_client.post(
+    response = await _current_tidio_api_client().post(
         f"/tickets/{ticket_id}/reply", json_data=reply_data
     )
 
-    return _tool_call_succeed(data=response)
+    return await _tool_call_succeed(data=response)
 
 
 @mcp.tool(title="Add internal note to a Ticket")
-def add_internal_note_to_a_ticket(
+async def add_internal_note_to_a_ticket(
     ticket_id: int, content: str, operator_id: str
 ) -> dict:
     """
@@ -365,10 +1510,107 @@ def add_internal_note_to_a_ticket(
         "author_type": "operator",
     }
 
-    response = tidio_api_client.post(f"/tickets/{ticket_id}/reply", json_data=note_data)
+    response = await _current_tidio_api_client().post(
+        f"/tickets/{ticket_id}/reply", json_data=note_data
+    )
+
+    return await _tool_call_succeed(data=response)
+
 
-    return _tool_call_succeed(data=response)
+@mcp.tool(title="Get Server Metrics")
+async def get_server_metrics() -> dict:
+    """
+    Get statistics of this MCP server: latency, errors and result size of each tool,
+    and latency, statuses, retries, cache hit ratio and response size of each Tidio API endpoint.
+    Useful to find slow tools or API endpoints. Latencies are in milliseconds, sizes in bytes.
+
+    Returns:
+        Dict: A dictionary containing tools and endpoints statistics.
+    """
+    return await _tool_call_succeed(data=server_metrics.snapshot())
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """
+    Serve the server metrics in the Prometheus text format over HTTP transports.
+    """
+    return PlainTextResponse(
+        server_metrics.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def _parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tidio MCP Server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "sse", "streamable-http"],
+        default=os.getenv("TIDIO_MCP_TRANSPORT", "stdio"),
+        help="Transport to serve MCP over. HTTP transports serve many clients "
+        "from one process, sharing the Tidio API connection pool and cache.",
+    )
+    parser.add_argument(
+        "--host",
+        default=os.getenv("TIDIO_MCP_HOST", "127.0.0.1"),
+        help="Host to bind for HTTP transports.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("TIDIO_MCP_PORT", "8000")),
+        help="Port to bind for HTTP transports.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("TIDIO_MCP_WORKERS", "1")),
+        help="Number of worker processes for the streamable-http transport. "
+        "Use a sqlite or redis TIDIO_CACHE_BACKEND to share the cache between them.",
+    )
+
+    args = parser.parse_args(argv)
+    if args.transport not in ["stdio", "sse", "streamable-http"]:
+        parser.error(f"invalid transport: {args.transport}")
+
+    if args.workers < 1:
+        parser.error("workers must be greater than 0")
+
+    if args.workers > 1 and args.transport != "streamable-http":
+        parser.error("multiple workers require the streamable-http transport")
+
+    return args
+
+
+def http_app() -> Starlette:
+    """
+    Build the streamable HTTP app for multi-worker deployments, e.g.
+    TIDIO_MCP_WORKERS=4 uvicorn server:http_app --factory --workers 4
+
+    Sessions are stateless, as consecutive requests of one client may reach
+    different workers.
+    """
+    mcp.settings.stateless_http = True
+
+    return mcp.streamable_http_app()
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    args = _parse_args()
+
+    if args.workers > 1:
+        import uvicorn
+
+        # Inherited by the worker processes, which split the rate limits.
+        os.environ["TIDIO_MCP_WORKERS"] = str(args.workers)
+
+        uvicorn.run(
+            "server:http_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+    else:
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        mcp.run(transport=args.transport)
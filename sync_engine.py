@@ -0,0 +1,267 @@
+import asyncio
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from rate_limiter import TokenBucket
+from search_index import SearchIndex
+from tidio_client import TidioApiClient, TidioApiError
+
+
+class SyncEngine:
+    """
+    Incrementally syncs tickets and contacts of one Tidio account into a
+    SearchIndex.
+
+    Every pass walks the tickets and contacts lists with cursors and fetches
+    details only for tickets whose updated_at changed, or whose details are
+    older than details_max_age when the list has no updated_at. The cursor is
+    stored in the index after every page, so an interrupted pass resumes where
+    it stopped instead of starting over.
+
+    Processes sharing an index file pass the same lock_path, so only the one
+    holding the lock syncs in the background and the others read its results.
+    """
+
+    def __init__(
+        self,
+        client: TidioApiClient,
+        index: SearchIndex,
+        interval: float = 60.0,
+        concurrency: int = 4,
+        lock_path: str | None = None,
+        rate_limiter: TokenBucket = None,
+        details_max_age: float = 900.0,
+    ):
+        """
+        Args:
+            client (TidioApiClient): Client of the account. Only a weak reference
+                is kept, the background sync stops once the client is gone or closed.
+            index (SearchIndex): Index to sync into.
+            interval (float): Seconds between background sync passes.
+            concurrency (int): Maximum number of ticket details fetched at once.
+            lock_path (str, optional): File locked by the process running the
+                background sync of a shared index.
+            rate_limiter (TokenBucket, optional): Limits sync requests in addition
+                to the read rate limiter of the client, so that a lower sync rate
+                leaves the rest of the account limit to interactive calls.
+            details_max_age (float): Seconds after which the details, i.e. the
+                messages, of tickets listed without updated_at are fetched again.
+        """
+        if interval <= 0:
+            raise ValueError("Sync interval must be greater than 0")
+
+        if concurrency < 1:
+            raise ValueError("Sync concurrency must be greater than 0")
+
+        self.index = index
+        self.interval = interval
+        self.concurrency = concurrency
+        self.lock_path = lock_path
+        self.rate_limiter = rate_limiter
+        self.details_max_age = details_max_age
+        self._lock_file = None
+        self._client = weakref.ref(client)
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._refresh: asyncio.Task | None = None
+
+    async def sync(self) -> None:
+        """
+        Run one sync pass, or wait for the one already running.
+        """
+        async with self._lock:
+            await self._sync_pass()
+
+    async def ensure_fresh(
+        self, max_staleness: float, timeout: float | None = None
+    ) -> bool:
+        """
+        Sync if the last complete pass is older than max_staleness seconds,
+        waiting at most timeout seconds for it. After a timeout the sync goes on
+        in the background, and the index holds the tickets synced so far.
+
+        Returns:
+            bool: Whether the index is fresh, False if the timeout expired first.
+        """
+        if not self.index.is_stale(max_staleness):
+            return True
+
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().create_task(
+                self._sync_if_stale(max_staleness)
+            )
+            # Failures after a timeout are retried by the next call.
+            self._refresh.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self._refresh), timeout)
+        except TimeoutError:
+            return False
+
+        return True
+
+    def start(self) -> None:
+        """
+        Start syncing in the background every interval seconds, unless already
+        started. Must be called from a running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._refresh is not None:
+            self._refresh.cancel()
+            self._refresh = None
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def _sync_if_stale(self, max_staleness: float) -> None:
+        async with self._lock:
+            # A background pass may have finished while waiting for the lock.
+            if self.index.is_stale(max_staleness):
+                await self._sync_pass()
+
+    async def _sync_pass(self) -> None:
+        client = self._client()
+        if client is None:
+            return
+
+        sync_pass = int(self.index.get_state("sync_pass") or 1)
+        await self._sync_tickets(client, sync_pass)
+        await self._sync_contacts(client, sync_pass)
+
+        self.index.prune(sync_pass)
+        self.index.set_state("sync_pass", str(sync_pass + 1))
+        self.index.set_state("tickets_cursor", "")
+        self.index.set_state("contacts_cursor", "")
+        self.index.mark_synced()
+
+    async def _run(self) -> None:
+        while True:
+            if self._is_closed():
+                return
+
+            if self._is_leader() and self.index.is_stale(self.interval):
+                try:
+                    await self.sync()
+                except TidioApiError:
+                    # Resumed from the checkpoint in the next round.
+                    pass
+                except RuntimeError:
+                    # Raised by httpx when the client was closed during the sync,
+                    # e.g. evicted from the client pool.
+                    if self._is_closed():
+                        return
+                    raise
+
+            await asyncio.sleep(self.interval)
+
+    def _is_leader(self) -> bool:
+        """
+        Whether this process runs the background sync, taking over the lock
+        once the process holding it exits.
+        """
+        if self._lock_file is not None or self.lock_path is None or fcntl is None:
+            return True
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+
+        return True
+
+    def _is_closed(self) -> bool:
+        client = self._client()
+
+        return client is None or client.client.is_closed
+
+    async def _sync_tickets(self, client: TidioApiClient, sync_pass: int) -> None:
+        async for page in self._pages(client, "/tickets", "tickets_cursor"):
+            changed_ticket_ids = [
+                ticket["id"]
+                for ticket in page.get("tickets") or []
+                if self.index.upsert_ticket(ticket, sync_pass, self.details_max_age)
+            ]
+            await self._fetch_ticket_details(client, changed_ticket_ids)
+
+    async def _sync_contacts(self, client: TidioApiClient, sync_pass: int) -> None:
+        # Accounts may have far more contacts than tickets, so they are streamed
+        # one by one instead of decoding whole pages.
+        cursor = self.index.get_state("contacts_cursor")
+        if cursor == "done":
+            return
+
+        def checkpoint(page: dict) -> None:
+            self.index.set_state(
+                "contacts_cursor", (page.get("meta") or {}).get("cursor") or "done"
+            )
+
+        async for contact in client.stream_items(
+            "/contacts",
+            "contacts",
+            {"cursor": cursor} if cursor else None,
+            on_page=checkpoint,
+            rate_limiter=self.rate_limiter,
+        ):
+            self.index.upsert_contact(contact, sync_pass)
+
+    async def _pages(self, client: TidioApiClient, endpoint: str, checkpoint: str):
+        """
+        Walk a list endpoint from its checkpoint. The checkpoint advances once
+        the caller is done with a page.
+        """
+        cursor = self.index.get_state(checkpoint)
+        if cursor == "done":
+            return
+
+        query_params = {"cursor": cursor} if cursor else None
+        async for page in client.paginate(endpoint, query_params, self.rate_limiter):
+            yield page
+            self.index.set_state(
+                checkpoint, (page.get("meta") or {}).get("cursor") or "done"
+            )
+
+    async def _fetch_ticket_details(
+        self, client: TidioApiClient, ticket_ids: list[int]
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(ticket_id: int) -> dict | None:
+            # The ticket changed, so a cached response is outdated. Deleted from
+            # the cache directly, as client.invalidate marks a write and would
+            # keep concurrent reads from being cached and shared.
+            await client.cache.delete(f"/tickets/{ticket_id}")
+            async with semaphore:
+                try:
+                    return await client.get(f"/tickets/{ticket_id}", self.rate_limiter)
+                except TidioApiError:
+                    # Stays searchable without messages, retried in the next pass.
+                    return None
+
+        results = await asyncio.gather(*(fetch(ticket_id) for ticket_id in ticket_ids))
+        for result in results:
+            if result is not None:
+                self.index.index_ticket_details(result)
@@ -0,0 +1,18 @@
+import pytest
+
+
+class FakeClock:
+    """
+    Clock of tests, set by assigning now.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    return FakeClock()
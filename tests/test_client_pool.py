@@ -0,0 +1,82 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from client_pool import TidioClientPool
+
+
+def create_client(client_id: str, client_secret: str) -> MagicMock:
+    client = MagicMock()
+    client.client_id = client_id
+    client.aclose = AsyncMock()
+    return client
+
+
+class TestTidioClientPool:
+    def setup_method(self):
+        self.sut = TidioClientPool(create_client, max_size=2)
+
+    @pytest.mark.unit
+    def test_get_reuses_client_per_credentials(self):
+        # Act
+        first = self.sut.get("tenant-a", "secret")
+        second = self.sut.get("tenant-a", "secret")
+        other = self.sut.get("tenant-a", "other-secret")
+
+        # Assert
+        assert first is second
+        assert other is not first
+        assert len(self.sut) == 2
+
+    @pytest.mark.unit
+    async def test_get_closes_least_recently_used_client(self):
+        # Arrange
+        tenant_a = self.sut.get("tenant-a", "secret")
+        tenant_b = self.sut.get("tenant-b", "secret")
+        self.sut.get("tenant-a", "secret")
+
+        # Act
+        self.sut.get("tenant-c", "secret")
+        await self.sut.aclose()
+
+        # Assert
+        tenant_b.aclose.assert_awaited_once()
+        tenant_a.aclose.assert_awaited_once()
+        assert self.sut.get("tenant-a", "secret") is not tenant_a
+
+    @pytest.mark.unit
+    async def test_evicted_client_is_closed_after_delay(self):
+        # Arrange
+        self.sut.close_delay = 0.01
+        tenant_a = self.sut.get("tenant-a", "secret")
+        self.sut.get("tenant-b", "secret")
+
+        # Act
+        self.sut.get("tenant-c", "secret")
+        await asyncio.sleep(0)
+        closed_at_eviction = tenant_a.aclose.await_count
+        await asyncio.sleep(0.05)
+
+        # Assert
+        assert closed_at_eviction == 0
+        tenant_a.aclose.assert_awaited_once()
+
+    @pytest.mark.unit
+    def test_evicted_client_without_running_loop(self):
+        # Arrange
+        tenant_a = self.sut.get("tenant-a", "secret")
+        self.sut.get("tenant-b", "secret")
+
+        # Act
+        self.sut.get("tenant-c", "secret")
+
+        # Assert
+        tenant_a.aclose.assert_not_called()
+        assert len(self.sut) == 2
+
+    @pytest.mark.unit
+    def test_invalid_max_size(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Pool max size must be greater than 0"):
+            TidioClientPool(create_client, max_size=0)
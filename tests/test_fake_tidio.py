@@ -0,0 +1,70 @@
+import httpx
+import pytest
+
+from benchmarks.fake_tidio import FakeTidioConfig, create_app
+from tidio_client import RetryPolicy, TidioApiClient, TidioApiError
+
+
+def client(config: FakeTidioConfig) -> TidioApiClient:
+    sut = TidioApiClient(
+        "test_client_id",
+        "test_client_secret",
+        retry_policy=RetryPolicy(max_attempts=1),
+        base_url="http://fake-tidio",
+    )
+    sut.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app(config)),
+        base_url="http://fake-tidio",
+    )
+    return sut
+
+
+class TestFakeTidio:
+    @pytest.mark.unit
+    async def test_lists_are_paginated(self):
+        # Arrange
+        sut = client(FakeTidioConfig(contacts=250, page_size=100))
+
+        # Act
+        contacts = [
+            contact async for contact in sut.stream_items("/contacts", "contacts")
+        ]
+
+        # Assert
+        assert len(contacts) == 250
+        assert len({contact["id"] for contact in contacts}) == 250
+
+    @pytest.mark.unit
+    async def test_ticket_details_are_deterministic(self):
+        # Arrange
+        first = client(FakeTidioConfig(messages=3))
+        second = client(FakeTidioConfig(messages=3))
+
+        # Act
+        ticket = await first.get("/tickets/2")
+
+        # Assert
+        assert ticket == await second.get("/tickets/2")
+        assert len(ticket["messages"]) == 3
+        with pytest.raises(TidioApiError, match="404"):
+            await first.get("/tickets/9999")
+
+    @pytest.mark.unit
+    async def test_rate_limit_and_errors_are_simulated(self):
+        # Arrange
+        limited = client(FakeTidioConfig(rate_limit=1))
+        failing = client(FakeTidioConfig(error_rate=1.0))
+
+        # Act
+        # Three requests, so two of them share a one second window.
+        results = []
+        for _ in range(3):
+            try:
+                results.append(await limited.get("/departments"))
+            except TidioApiError as e:
+                results.append(e)
+
+        # Assert
+        assert any("429" in str(result) for result in results)
+        with pytest.raises(TidioApiError, match="503"):
+            await failing.get("/departments")
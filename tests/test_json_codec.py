@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+import json_codec
+from json_codec import JsonCodec, MsgspecCodec, OrjsonCodec, get_codec
+
+AVAILABLE_CODECS = [
+    name
+    for name, module in [
+        ("json", json),
+        ("orjson", json_codec.orjson),
+        ("msgspec", json_codec.msgspec),
+    ]
+    if module is not None
+]
+
+
+class TestJsonCodec:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("name", AVAILABLE_CODECS)
+    def test_round_trip(self, name):
+        # Arrange
+        sut = get_codec(name)
+        value = {
+            "id": 1,
+            "subject": "Zoë ☃ <b>refund</b>",
+            "messages": [{"id": 2, "score": 1.5, "read": True, "note": None}],
+        }
+
+        # Act
+        encoded = sut.dumps(value)
+
+        # Assert
+        assert isinstance(encoded, bytes)
+        assert sut.loads(encoded) == value
+        assert sut.loads(encoded.decode()) == value
+        assert json.loads(encoded) == value
+
+    @pytest.mark.unit
+    def test_stdlib_codec_encodes_compact_json(self):
+        # Act
+        encoded = JsonCodec().dumps({"a": [1, 2], "b": "ë"})
+
+        # Assert
+        assert encoded == b'{"a":[1,2],"b":"\\u00eb"}'
+
+    @pytest.mark.unit
+    def test_auto_falls_back_to_stdlib(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr("json_codec.orjson", None)
+        monkeypatch.setattr("json_codec.msgspec", None)
+
+        # Act
+        sut = get_codec()
+
+        # Assert
+        assert sut.name == "json"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "module, codec_class",
+        [("json_codec.orjson", OrjsonCodec), ("json_codec.msgspec", MsgspecCodec)],
+    )
+    def test_missing_library(self, monkeypatch, module, codec_class):
+        # Arrange
+        monkeypatch.setattr(module, None)
+
+        # Act & Assert
+        with pytest.raises(ImportError, match="requires the"):
+            codec_class()
+
+    @pytest.mark.unit
+    def test_unknown_codec(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Unknown JSON codec: yaml"):
+            get_codec("yaml")
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from json_stream import iter_items
+
+
+async def chunked(text: str, size: int):
+    for start in range(0, len(text), size):
+        yield text[start : start + size]
+
+
+async def decode(text: str, items_key: str = "items", size: int = 3):
+    rest = {}
+    items = [item async for item in iter_items(chunked(text, size), items_key, rest)]
+
+    return items, rest
+
+
+class TestIterItems:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("size", [1, 2, 7, 1000])
+    async def test_items_split_across_chunks(self, size):
+        # Arrange
+        document = {
+            "items": [
+                {"id": 1, "name": "Zoë ☃", "tags": ["a", "b"]},
+                {"id": 12345, "score": -1.5e3, "nested": {"ok": True, "x": None}},
+                'text with "quotes" and , ] } chars',
+                67890,
+            ],
+            "meta": {"cursor": "abc"},
+        }
+
+        # Act
+        items, rest = await decode(json.dumps(document), size=size)
+
+        # Assert
+        assert items == document["items"]
+        assert rest == {"meta": {"cursor": "abc"}}
+
+    @pytest.mark.unit
+    async def test_fields_before_items_and_whitespace(self):
+        # Arrange
+        text = '{ "meta" : {"cursor": null} ,\n "items" : [ 1 ,\n 2 ] , "total": 2 }'
+
+        # Act
+        items, rest = await decode(text)
+
+        # Assert
+        assert items == [1, 2]
+        assert rest == {"meta": {"cursor": None}, "total": 2}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "text, expected_rest",
+        [
+            ("{}", {}),
+            ('{"items": []}', {}),
+            ('{"items": null}', {"items": None}),
+            ('{"other": [1, 2]}', {"other": [1, 2]}),
+        ],
+    )
+    async def test_no_items(self, text, expected_rest):
+        # Act
+        items, rest = await decode(text)
+
+        # Assert
+        assert items == []
+        assert rest == expected_rest
+
+    @pytest.mark.unit
+    async def test_items_yielded_before_document_ends(self):
+        # Arrange
+        rest = {}
+        stream = iter_items(chunked('{"items": [1, 2, {"broken', 4), "items", rest)
+
+        # Act
+        first = await anext(stream)
+        second = await anext(stream)
+
+        # Assert
+        assert (first, second) == (1, 2)
+        with pytest.raises(ValueError):
+            await anext(stream)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "[1, 2]",
+            '{"items": [1 2]}',
+            '{"items": [1, 2',
+            '{"items" [1]}',
+            "{1: 2}",
+        ],
+    )
+    async def test_invalid_document(self, text):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            await decode(text)
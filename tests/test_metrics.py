@@ -0,0 +1,153 @@
+import pytest
+
+from metrics import Histogram, ServerMetrics, endpoint_template
+from tests.conftest import FakeClock
+
+
+class TestHistogram:
+    @pytest.mark.unit
+    def test_quantile_interpolates_within_bucket(self):
+        # Arrange
+        sut = Histogram((1, 2, 4))
+        for value in [0.5, 1.5, 1.5, 3]:
+            sut.observe(value)
+
+        # Act & Assert
+        assert sut.counts == [1, 2, 1, 0]
+        assert sut.quantile(0.5) == 1.5
+        assert sut.quantile(1.0) == 4
+        assert sut.sum == 6.5
+
+    @pytest.mark.unit
+    def test_quantile_of_overflow_bucket_is_highest_bound(self):
+        # Arrange
+        sut = Histogram((1, 2))
+        sut.observe(100)
+
+        # Act & Assert
+        assert sut.quantile(0.99) == 2
+
+    @pytest.mark.unit
+    def test_empty_summary(self):
+        # Act
+        summary = Histogram((1,)).summary()
+
+        # Assert
+        assert summary == {
+            "count": 0,
+            "mean": None,
+            "p50": None,
+            "p90": None,
+            "p99": None,
+        }
+
+
+class TestEndpointTemplate:
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "endpoint, expected",
+        [
+            ("/tickets", "/tickets"),
+            ("/tickets?cursor=abc", "/tickets"),
+            ("/tickets/123", "/tickets/{id}"),
+            ("/tickets/123/reply", "/tickets/{id}/reply"),
+            ("/contacts/7f3c0a9e-1b2d", "/contacts/{id}"),
+            ("/tickets/as-contact", "/tickets/as-contact"),
+        ],
+    )
+    def test_endpoint_template(self, endpoint, expected):
+        # Act & Assert
+        assert endpoint_template(endpoint) == expected
+
+
+class TestServerMetrics:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.sut = ServerMetrics(clock=self.clock)
+
+    @pytest.mark.unit
+    def test_track_tool(self):
+        # Act
+        with self.sut.track_tool("get_tickets"):
+            assert self.sut.snapshot()["tools"]["get_tickets"]["in_flight"] == 1
+            self.clock.now += 0.2
+        self.sut.record_tool_result("get_tickets", 2000)
+
+        with pytest.raises(RuntimeError), self.sut.track_tool("get_tickets"):
+            raise RuntimeError("failed")
+
+        # Assert
+        stats = self.sut.snapshot()["tools"]["get_tickets"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["latency_ms"]["mean"] == 100.0
+        assert stats["result_bytes"]["count"] == 1
+
+    @pytest.mark.unit
+    def test_track_request(self):
+        # Act
+        with self.sut.track_request("GET", "/tickets/1") as record:
+            self.clock.now += 0.05
+            record.status = "200"
+            record.retries = 2
+            record.size = 300
+        with self.sut.track_request("GET", "/tickets/2?x=1"):
+            pass
+
+        # Assert
+        stats = self.sut.snapshot()["endpoints"]["GET /tickets/{id}"]
+        assert stats["requests"] == 2
+        assert stats["retries"] == 2
+        assert stats["statuses"] == {"200": 1, "error": 1}
+        assert stats["response_bytes"]["count"] == 1
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.unit
+    def test_cache_hit_ratio_counts_stale_hits(self):
+        # Act
+        for result in ["hit", "stale", "miss", "miss"]:
+            self.sut.record_cache_lookup("/departments", result)
+
+        # Assert
+        stats = self.sut.snapshot()["endpoints"]["GET /departments"]
+        assert stats["cache_hit_ratio"] == 0.5
+        assert stats["cache_lookups"] == {"hit": 1, "stale": 1, "miss": 2}
+
+    @pytest.mark.unit
+    def test_render_prometheus(self):
+        # Arrange
+        with self.sut.track_tool('get "x"'):
+            self.clock.now += 0.02
+        with self.sut.track_request("GET", "/tickets/1") as record:
+            record.status = "200"
+        self.sut.record_cache_lookup("/tickets/1", "hit")
+
+        # Act
+        text = self.sut.render_prometheus()
+
+        # Assert
+        lines = text.splitlines()
+        assert "# TYPE tidio_mcp_tool_duration_seconds histogram" in lines
+        assert (
+            'tidio_mcp_tool_duration_seconds_bucket{tool="get \\"x\\"",le="0.01"} 0'
+            in lines
+        )
+        assert (
+            'tidio_mcp_tool_duration_seconds_bucket{tool="get \\"x\\"",le="0.025"} 1'
+            in lines
+        )
+        assert (
+            'tidio_mcp_tool_duration_seconds_bucket{tool="get \\"x\\"",le="+Inf"} 1'
+            in lines
+        )
+        assert 'tidio_mcp_tool_duration_seconds_count{tool="get \\"x\\""} 1' in lines
+        assert (
+            'tidio_api_requests_total{method="GET",endpoint="/tickets/{id}",'
+            'status="200"} 1' in lines
+        )
+        assert (
+            'tidio_api_cache_lookups_total{endpoint="/tickets/{id}",result="hit"} 1'
+            in lines
+        )
+        assert text.endswith("\n")
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from rate_limiter import TokenBucket
+from tests.conftest import FakeClock
+
+
+class TestTokenBucket:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.sut = TokenBucket(rate=2, burst=3, clock=self.clock)
+
+    @pytest.fixture
+    def sleep(self, monkeypatch):
+        sleep = AsyncMock()
+        monkeypatch.setattr("rate_limiter.asyncio.sleep", sleep)
+        return sleep
+
+    @pytest.mark.unit
+    async def test_acquire_within_burst_does_not_wait(self, sleep):
+        # Act
+        for _ in range(3):
+            await self.sut.acquire()
+
+        # Assert
+        sleep.assert_not_awaited()
+
+    @pytest.mark.unit
+    async def test_acquire_over_burst_waits_in_order(self, sleep):
+        # Arrange
+        for _ in range(3):
+            await self.sut.acquire()
+
+        # Act
+        await self.sut.acquire()
+        await self.sut.acquire()
+
+        # Assert
+        assert [call.args[0] for call in sleep.await_args_list] == [0.5, 1.0]
+
+    @pytest.mark.unit
+    async def test_acquire_refills_over_time(self, sleep):
+        # Arrange
+        for _ in range(3):
+            await self.sut.acquire()
+        self.clock.now = 1.0
+
+        # Act
+        await self.sut.acquire()
+        await self.sut.acquire()
+
+        # Assert
+        sleep.assert_not_awaited()
+
+    @pytest.mark.unit
+    async def test_refill_is_capped_at_burst(self, sleep):
+        # Arrange
+        self.clock.now = 100.0
+
+        # Act
+        for _ in range(4):
+            await self.sut.acquire()
+
+        # Assert
+        sleep.assert_awaited_once_with(0.5)
+
+    @pytest.mark.unit
+    async def test_cancelled_acquire_returns_token(self):
+        # Arrange
+        for _ in range(3):
+            await self.sut.acquire()
+        waiter = asyncio.create_task(self.sut.acquire())
+        await asyncio.sleep(0)
+
+        # Act
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # Assert
+        assert self.sut._tokens == 0
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "rate, burst, expected_error",
+        [
+            (0, 1, "Rate must be greater than 0"),
+            (1, 0, "Burst must be greater than 0"),
+        ],
+    )
+    def test_invalid_configuration(self, rate, burst, expected_error):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            TokenBucket(rate=rate, burst=burst)
@@ -0,0 +1,327 @@
+from unittest.mock import AsyncMock, Mock
+
+import fakeredis
+import pytest
+import redis
+
+from response_cache import RedisResponseCache, ResponseCache, SQLiteResponseCache
+from tests.conftest import FakeClock
+
+
+class TestResponseCache:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.sut = ResponseCache(max_size=2, clock=self.clock)
+
+    @pytest.mark.unit
+    async def test_get_missing_key(self):
+        # Act
+        result = await self.sut.get("/departments")
+
+        # Assert
+        assert result is None
+        assert (await self.sut.stats())["misses"] == 1
+
+    @pytest.mark.unit
+    async def test_get_fresh_entry(self):
+        # Arrange
+        await self.sut.set("/departments", {"departments": []}, ttl=10)
+
+        # Act
+        result = await self.sut.get("/departments")
+
+        # Assert
+        assert result.value == {"departments": []}
+        assert result.stale is False
+        assert (await self.sut.stats())["hits"] == 1
+
+    @pytest.mark.unit
+    async def test_get_stale_entry_within_stale_window(self):
+        # Arrange
+        await self.sut.set("/departments", {"departments": []}, ttl=10, stale_ttl=5)
+        self.clock.now = 12
+
+        # Act
+        result = await self.sut.get("/departments")
+
+        # Assert
+        assert result.value == {"departments": []}
+        assert result.stale is True
+        assert (await self.sut.stats())["stale_hits"] == 1
+
+    @pytest.mark.unit
+    async def test_get_expired_entry(self):
+        # Arrange
+        await self.sut.set("/departments", {"departments": []}, ttl=10, stale_ttl=5)
+        self.clock.now = 15
+
+        # Act
+        result = await self.sut.get("/departments")
+
+        # Assert
+        assert result is None
+        assert (await self.sut.stats())["size"] == 0
+
+    @pytest.mark.unit
+    async def test_set_evicts_least_recently_used(self):
+        # Arrange
+        await self.sut.set("/a", {"id": "a"}, ttl=10)
+        await self.sut.set("/b", {"id": "b"}, ttl=10)
+        await self.sut.get("/a")
+
+        # Act
+        await self.sut.set("/c", {"id": "c"}, ttl=10)
+
+        # Assert
+        assert await self.sut.get("/b") is None
+        assert (await self.sut.get("/a")).value == {"id": "a"}
+        assert (await self.sut.get("/c")).value == {"id": "c"}
+        assert (await self.sut.stats())["evictions"] == 1
+
+    @pytest.mark.unit
+    async def test_cached_value_is_isolated_from_caller(self):
+        # Arrange
+        value = {"departments": []}
+        await self.sut.set("/departments", value, ttl=10)
+
+        # Act
+        value["departments"].append({"id": "1"})
+        (await self.sut.get("/departments")).value["departments"].append({"id": "2"})
+
+        # Assert
+        assert (await self.sut.get("/departments")).value == {"departments": []}
+
+    @pytest.mark.unit
+    async def test_update_merges_changes(self):
+        # Arrange
+        await self.sut.set("/tickets/1", {"id": 1, "status": "open"}, ttl=10)
+
+        # Act
+        result = await self.sut.update("/tickets/1", {"status": "solved"})
+
+        # Assert
+        assert result is True
+        assert (await self.sut.get("/tickets/1")).value == {"id": 1, "status": "solved"}
+
+    @pytest.mark.unit
+    async def test_update_missing_key(self):
+        # Act
+        result = await self.sut.update("/tickets/1", {"status": "solved"})
+
+        # Assert
+        assert result is False
+        assert await self.sut.keys() == []
+
+    @pytest.mark.unit
+    def test_invalid_max_size(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Cache max size must be greater than 0"):
+            ResponseCache(max_size=0)
+
+
+class TestSQLiteResponseCache:
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, tmp_path, fake_clock: FakeClock):
+        self.path = str(tmp_path / "cache.sqlite3")
+        self.clock = fake_clock
+        self.sut = SQLiteResponseCache(self.path, max_size=2, clock=self.clock)
+
+    @pytest.mark.unit
+    async def test_get_fresh_and_stale_entry(self):
+        # Arrange
+        await self.sut.set("/departments", {"departments": []}, ttl=10, stale_ttl=5)
+
+        # Act
+        fresh = await self.sut.get("/departments")
+        self.clock.now = 12
+        stale = await self.sut.get("/departments")
+        self.clock.now = 15
+        expired = await self.sut.get("/departments")
+
+        # Assert
+        assert (fresh.value, fresh.stale) == ({"departments": []}, False)
+        assert (stale.value, stale.stale) == ({"departments": []}, True)
+        assert expired is None
+        assert await self.sut.stats() == {
+            "size": 0,
+            "max_size": 2,
+            "hits": 1,
+            "stale_hits": 1,
+            "misses": 1,
+            "evictions": 0,
+        }
+
+    @pytest.mark.unit
+    async def test_set_evicts_least_recently_used(self):
+        # Arrange
+        await self.sut.set("/a", {"id": "a"}, ttl=100)
+        self.clock.now = 1
+        await self.sut.set("/b", {"id": "b"}, ttl=100)
+        self.clock.now = 40
+        await self.sut.get("/a")
+        self.clock.now = 41
+
+        # Act
+        await self.sut.set("/c", {"id": "c"}, ttl=100)
+
+        # Assert
+        assert sorted(await self.sut.keys()) == ["/a", "/c"]
+        assert (await self.sut.stats())["evictions"] == 1
+
+    @pytest.mark.unit
+    async def test_hits_within_touch_interval_do_not_write(self):
+        # Arrange
+        await self.sut.set("/departments", {"departments": []}, ttl=100)
+        statements = []
+        self.sut._connection.set_trace_callback(statements.append)
+
+        # Act
+        self.clock.now = 10
+        await self.sut.get("/departments")
+        self.clock.now = 30
+        await self.sut.get("/departments")
+        self.clock.now = 35
+        await self.sut.get("/departments")
+
+        # Assert
+        updates = [sql for sql in statements if sql.startswith("UPDATE")]
+        assert len(updates) == 1
+
+    @pytest.mark.unit
+    async def test_entries_are_shared_between_instances(self):
+        # Arrange
+        other = SQLiteResponseCache(self.path, clock=self.clock)
+        await self.sut.set("/tickets/1", {"id": 1, "status": "open"}, ttl=10)
+
+        # Act
+        await other.update("/tickets/1", {"status": "solved"})
+
+        # Assert
+        assert (await self.sut.get("/tickets/1")).value == {"id": 1, "status": "solved"}
+
+    @pytest.mark.unit
+    async def test_keys_with_prefix_and_delete(self):
+        # Arrange
+        await self.sut.set("/tickets/1", {}, ttl=10)
+        await self.sut.set("/contacts/1", {}, ttl=10)
+
+        # Act
+        keys = await self.sut.keys(prefix="/tickets")
+        await self.sut.delete("/tickets/1")
+
+        # Assert
+        assert keys == ["/tickets/1"]
+        assert await self.sut.keys() == ["/contacts/1"]
+
+    @pytest.mark.unit
+    async def test_update_missing_key(self):
+        # Act & Assert
+        assert await self.sut.update("/tickets/1", {"status": "solved"}) is False
+
+    @pytest.mark.unit
+    async def test_namespaces_are_isolated(self):
+        # Arrange
+        tenant = SQLiteResponseCache(self.path, namespace="tenant", clock=self.clock)
+        await self.sut.set("/tickets/1", {"id": 1}, ttl=10)
+        await tenant.set("/tickets/1", {"id": 1, "tenant": True}, ttl=10)
+
+        # Act
+        await tenant.clear()
+
+        # Assert
+        assert await tenant.get("/tickets/1") is None
+        assert await tenant.size() == 0
+        assert (await self.sut.get("/tickets/1")).value == {"id": 1}
+        assert await self.sut.keys() == ["/tickets/1"]
+
+
+class TestRedisResponseCache:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.redis = fakeredis.FakeAsyncRedis()
+        self.sut = RedisResponseCache(client=self.redis, clock=self.clock)
+
+    @pytest.mark.unit
+    async def test_get_fresh_and_stale_entry(self):
+        # Arrange
+        await self.sut.set("/departments", {"departments": []}, ttl=10, stale_ttl=5)
+
+        # Act
+        fresh = await self.sut.get("/departments")
+        self.clock.now = 12
+        stale = await self.sut.get("/departments")
+
+        # Assert
+        assert (fresh.value, fresh.stale) == ({"departments": []}, False)
+        assert (stale.value, stale.stale) == ({"departments": []}, True)
+        assert 0 < await self.redis.pttl("tidio-mcp:/departments") <= 15000
+
+    @pytest.mark.unit
+    async def test_update_keeps_expiry(self):
+        # Arrange
+        await self.sut.set("/tickets/1", {"id": 1, "status": "open"}, ttl=10)
+
+        # Act
+        result = await self.sut.update("/tickets/1", {"status": "solved"})
+
+        # Assert
+        assert result is True
+        assert (await self.sut.get("/tickets/1")).value == {"id": 1, "status": "solved"}
+        assert await self.redis.pttl("tidio-mcp:/tickets/1") > 0
+
+    @pytest.mark.unit
+    async def test_keys_are_namespaced_and_escaped(self):
+        # Arrange
+        await self.sut.set("/tickets?cursor=a*", {}, ttl=10)
+        await self.sut.set("/tickets/1", {}, ttl=10)
+        await self.redis.set("other:/tickets/2", "{}")
+
+        # Act
+        result = await self.sut.keys(prefix="/tickets?cursor=a*")
+
+        # Assert
+        assert result == ["/tickets?cursor=a*"]
+        assert sorted(await self.sut.keys()) == ["/tickets/1", "/tickets?cursor=a*"]
+
+    @pytest.mark.unit
+    async def test_resource_keys_do_not_scan_the_keyspace(self):
+        # Arrange
+        await self.sut.set("/tickets/1", {}, ttl=10)
+        await self.sut.set("/tickets/2", {}, ttl=20)
+        await self.sut.set("/contacts/1", {}, ttl=10)
+        await self.sut.delete("/tickets/2")
+        self.redis.scan_iter = Mock(side_effect=AssertionError("Keyspace scanned"))
+
+        # Act
+        result = await self.sut.keys(prefix="/tickets")
+
+        # Assert
+        assert result == ["/tickets/1"]
+
+    @pytest.mark.unit
+    async def test_expired_keys_are_pruned_from_the_resource_key_set(self):
+        # Arrange
+        await self.sut.set("/tickets/1", {}, ttl=10)
+        await self.sut.set("/tickets/2", {}, ttl=10, stale_ttl=20)
+        self.clock.now = 15
+
+        # Act
+        result = await self.sut.keys(prefix="/tickets")
+
+        # Assert
+        assert result == ["/tickets/2"]
+        assert await self.redis.zcard("tidio-mcp:#keys:/tickets") == 1
+
+    @pytest.mark.unit
+    async def test_redis_errors_are_treated_as_misses(self):
+        # Arrange
+        self.redis.get = AsyncMock(
+            side_effect=redis.ConnectionError("Connection refused")
+        )
+
+        # Act
+        result = await self.sut.get("/departments")
+
+        # Assert
+        assert result is None
+        assert (await self.sut.stats())["misses"] == 1
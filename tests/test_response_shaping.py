@@ -0,0 +1,145 @@
+import pytest
+
+from json_codec import JsonCodec
+from response_shaping import ResponseShaper, ShapingOptions, html_to_text
+
+
+class TestResponseShaper:
+    def setup_method(self):
+        self.stored = []
+
+    def store_text(self, text: str) -> str:
+        self.stored.append(text)
+        return f"handle-{len(self.stored)}"
+
+    @pytest.mark.unit
+    def test_shape_without_options_returns_data_as_is(self):
+        # Arrange
+        data = {"message_content": "<p>Hello</p>", "cursor": None}
+        sut = ResponseShaper(ShapingOptions(), store_text=self.store_text)
+
+        # Act
+        result, saved = sut.shape(data)
+
+        # Assert
+        assert result is data
+        assert saved == 0
+
+    @pytest.mark.unit
+    def test_shape_strips_html(self):
+        # Arrange
+        data = {"messages": [{"message_content": "<p>Hello&nbsp;<b>John</b></p>"}]}
+        sut = ResponseShaper(ShapingOptions(strip_html=True))
+
+        # Act
+        result, saved = sut.shape(data)
+
+        # Assert
+        assert result == {"messages": [{"message_content": "Hello\xa0John"}]}
+        assert saved == len(JsonCodec().dumps(data)) - len(JsonCodec().dumps(result))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"message_content": "John Doe <john@example.com>"},
+            {"message_content": "Returns List<String>"},
+            {"message_content": "a<b and c>d"},
+            {"subject": "<p>Hello</p>", "message_content": None},
+        ],
+    )
+    def test_shape_keeps_text_that_is_not_html_body(self, data):
+        # Arrange
+        sut = ResponseShaper(ShapingOptions(strip_html=True))
+
+        # Act
+        result, saved = sut.shape(data)
+
+        # Assert
+        assert result is data
+        assert saved == 0
+
+    @pytest.mark.unit
+    def test_shape_truncates_long_text_with_continuation(self):
+        # Arrange
+        data = {"message_content": "a" * 10, "subject": "abc"}
+        sut = ResponseShaper(
+            ShapingOptions(max_text_length=4), store_text=self.store_text
+        )
+
+        # Act
+        result, _ = sut.shape(data)
+
+        # Assert
+        assert result == {
+            "message_content": "aaaa",
+            "message_content_continuation": {
+                "handle": "handle-1",
+                "offset": 4,
+                "total_length": 10,
+            },
+            "subject": "abc",
+        }
+        assert self.stored == ["a" * 10]
+
+    @pytest.mark.unit
+    def test_shape_keeps_text_whole_without_handle(self):
+        # Arrange
+        data = {"message_content": "a" * 10}
+        sut = ResponseShaper(
+            ShapingOptions(max_text_length=4), store_text=lambda text: None
+        )
+
+        # Act
+        result, saved = sut.shape(data)
+
+        # Assert
+        assert result is data
+        assert saved == 0
+
+    @pytest.mark.unit
+    def test_shape_drops_empty_fields(self):
+        # Arrange
+        data = {"id": 1, "a": None, "b": "", "c": [], "d": {"e": None}, "f": 0}
+        sut = ResponseShaper(ShapingOptions(drop_empty=True))
+
+        # Act
+        result, saved = sut.shape(data)
+
+        # Assert
+        assert result == {"id": 1, "f": 0}
+        assert saved > 0
+
+    @pytest.mark.unit
+    def test_shape_encodes_lists_of_objects_as_table(self):
+        # Arrange
+        data = {
+            "tickets": [{"id": 1, "status": "open"}, {"id": 2, "priority": "low"}],
+            "ids": [1, 2],
+        }
+        sut = ResponseShaper(ShapingOptions(tabular=True))
+
+        # Act
+        result, _ = sut.shape(data)
+
+        # Assert
+        assert result == {
+            "tickets": {
+                "columns": ["id", "status", "priority"],
+                "rows": [[1, "open", None], [2, None, "low"]],
+            },
+            "ids": [1, 2],
+        }
+
+
+class TestHtmlToText:
+    @pytest.mark.unit
+    def test_html_to_text_keeps_block_line_breaks(self):
+        # Act
+        result = html_to_text(
+            "<div>Dear customer,</div><p>Line 1<br>Line 2</p>"
+            "<style>p {color: red}</style><ul><li>A &amp; B</li></ul>"
+        )
+
+        # Assert
+        assert result == "Dear customer,\n\nLine 1\nLine 2\n\nA & B"
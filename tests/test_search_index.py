@@ -0,0 +1,270 @@
+import sqlite3
+
+import pytest
+
+from search_index import SearchIndex
+from tests.conftest import FakeClock
+
+
+def ticket(ticket_id: int, **fields) -> dict:
+    return {
+        "id": ticket_id,
+        "subject": f"Ticket {ticket_id}",
+        "contact_id": "c1",
+        "contact_email": "customer@example.com",
+        "status": "open",
+        "priority": "normal",
+        "assigned_operator_id": None,
+        "assigned_department_id": "d1",
+        **fields,
+    }
+
+
+def message(content: str, created_at: str) -> dict:
+    return {"message_content": content, "created_at": created_at}
+
+
+class TestSearchIndex:
+    @pytest.fixture(autouse=True)
+    def setup_index(self, tmp_path, fake_clock: FakeClock):
+        self.path = str(tmp_path / "search.sqlite3")
+        self.clock = fake_clock
+        self.sut = SearchIndex(self.path, clock=self.clock)
+
+    @pytest.mark.unit
+    def test_upsert_ticket_reports_changes(self):
+        # Act
+        new = self.sut.upsert_ticket(ticket(1))
+        without_messages = self.sut.upsert_ticket(ticket(1))
+        self.sut.index_ticket_details({**ticket(1), "messages": []})
+        unchanged = self.sut.upsert_ticket(ticket(1))
+        changed = self.sut.upsert_ticket(ticket(1, status="solved"))
+
+        # Assert
+        assert (new, without_messages, unchanged, changed) == (True, True, False, True)
+
+    @pytest.mark.unit
+    def test_upsert_ticket_without_updated_at_reports_outdated_details(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1))
+        self.clock.now = 100.0
+        self.sut.index_ticket_details({**ticket(1), "messages": []})
+
+        # Act
+        self.clock.now = 150.0
+        fresh = self.sut.upsert_ticket(ticket(1), details_max_age=60)
+        self.clock.now = 160.0
+        outdated = self.sut.upsert_ticket(ticket(1), details_max_age=60)
+        without_max_age = self.sut.upsert_ticket(ticket(1))
+
+        # Assert
+        assert (fresh, outdated, without_max_age) == (False, True, False)
+
+    @pytest.mark.unit
+    def test_search_by_message_keywords(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1))
+        self.sut.upsert_ticket(ticket(2))
+        self.sut.index_ticket_details(
+            {
+                **ticket(1),
+                "messages": [
+                    message("I would like a refund", "2025-09-01T10:00:00+00:00"),
+                    message("Refund issued", "2025-09-02T10:00:00+00:00"),
+                ],
+            }
+        )
+
+        # Act
+        result = self.sut.search_tickets(query="REFUND issued")
+
+        # Assert
+        assert result == [
+            {
+                **ticket(1),
+                "created_at": "2025-09-01T10:00:00+00:00",
+                "updated_at": "2025-09-02T10:00:00+00:00",
+            }
+        ]
+
+    @pytest.mark.unit
+    def test_changed_ticket_keeps_messages_searchable(self):
+        # Arrange
+        self.sut.index_ticket_details(
+            {**ticket(1), "messages": [message("refund", "2025-09-01")]}
+        )
+
+        # Act
+        self.sut.upsert_ticket(ticket(1, status="solved"))
+
+        # Assert
+        assert [t["status"] for t in self.sut.search_tickets(query="refund")] == [
+            "solved"
+        ]
+
+    @pytest.mark.unit
+    def test_search_by_contact(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1))
+        self.sut.upsert_ticket(ticket(2, contact_id="c2", contact_email="b@x.com"))
+        self.sut.upsert_contact({"id": "c2", "first_name": "Zoë", "last_name": "Doe"})
+
+        # Act
+        result = self.sut.search_tickets(query="zoe")
+
+        # Assert
+        assert [t["id"] for t in result] == [2]
+
+    @pytest.mark.unit
+    def test_search_with_filters(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1, created_at="2025-09-01T10:00:00+00:00"))
+        self.sut.upsert_ticket(
+            ticket(2, status="pending", created_at="2025-09-05T10:00:00+00:00")
+        )
+        self.sut.upsert_ticket(
+            ticket(3, assigned_operator_id="o1", created_at="2025-09-07T10:00:00+00:00")
+        )
+        self.sut.upsert_ticket(ticket(4, priority="urgent"))
+
+        # Act
+        by_status = self.sut.search_tickets(status="pending")
+        by_priority = self.sut.search_tickets(priority="urgent")
+        by_operator = self.sut.search_tickets(assignee="o1")
+        by_department = self.sut.search_tickets(assignee="d1", limit=2)
+        by_date = self.sut.search_tickets(
+            created_after="2025-09-01", created_before="2025-09-07"
+        )
+
+        # Assert
+        assert [t["id"] for t in by_status] == [2]
+        assert [t["id"] for t in by_priority] == [4]
+        assert [t["id"] for t in by_operator] == [3]
+        assert [t["id"] for t in by_department] == [3, 2]
+        assert [t["id"] for t in by_date] == [2, 1]
+
+    @pytest.mark.unit
+    def test_date_filters_compare_in_utc(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1, created_at="2025-09-01T01:00:00+02:00"))
+        self.sut.upsert_ticket(ticket(2, created_at="2025-09-01T00:30:00Z"))
+        self.sut.upsert_ticket(ticket(3, created_at="2025-09-01T10:00:00.250000"))
+        self.sut.upsert_ticket(ticket(4, created_at="yesterday"))
+        self.sut.upsert_ticket(ticket(5))
+
+        # Act
+        after = self.sut.search_tickets(created_after="2025-09-01")
+        before = self.sut.search_tickets(created_before="2025-09-01T02:30:00+02:00")
+
+        # Assert
+        assert sorted(t["id"] for t in after) == [2, 3]
+        assert [t["id"] for t in before] == [1]
+
+    @pytest.mark.unit
+    def test_invalid_date_filter(self):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            self.sut.search_tickets(created_after="last week")
+
+    @pytest.mark.unit
+    def test_index_without_utc_dates_is_migrated(self, tmp_path):
+        # Arrange
+        path = str(tmp_path / "old.sqlite3")
+        with sqlite3.connect(path) as db:
+            db.execute(
+                "CREATE TABLE tickets (id INTEGER PRIMARY KEY, status TEXT, "
+                "priority TEXT, contact_id TEXT, assigned_operator_id TEXT, "
+                "assigned_department_id TEXT, created_at TEXT, updated_at TEXT, "
+                "data TEXT NOT NULL, version TEXT, "
+                "messages_indexed INTEGER NOT NULL DEFAULT 0, "
+                "sync_pass INTEGER NOT NULL DEFAULT 0)"
+            )
+            db.execute(
+                "INSERT INTO tickets (id, created_at, data) VALUES (?, ?, ?)",
+                (1, "2025-09-01T01:00:00+02:00", '{"id": 1}'),
+            )
+        db.close()
+
+        # Act
+        result = SearchIndex(path).search_tickets(created_before="2025-09-01")
+
+        # Assert
+        assert [t["id"] for t in result] == [1]
+
+    @pytest.mark.unit
+    def test_query_syntax_is_escaped(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1, subject='Error "NEAR" (AND) *'))
+
+        # Act
+        result = self.sut.search_tickets(query='"near" (AND *')
+
+        # Assert
+        assert [t["id"] for t in result] == [1]
+
+    @pytest.mark.unit
+    def test_delete_ticket_and_contact(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1))
+        self.sut.upsert_contact({"id": "c1", "email": "a@x.com"})
+
+        # Act
+        self.sut.delete_ticket(1)
+        self.sut.delete_contact("c1")
+
+        # Assert
+        assert self.sut.ticket_ids() == set()
+        assert self.sut.contact_ids() == set()
+        assert self.sut.search_tickets(query="ticket") == []
+
+    @pytest.mark.unit
+    def test_upsert_ticket_compares_updated_at(self):
+        # Arrange
+        self.sut.index_ticket_details(
+            {**ticket(1, updated_at="2025-09-01"), "messages": []}
+        )
+        self.sut.upsert_ticket(ticket(1, updated_at="2025-09-01"))
+        self.sut.index_ticket_details(
+            {**ticket(1, updated_at="2025-09-01"), "messages": []}
+        )
+
+        # Act
+        unchanged = self.sut.upsert_ticket(ticket(1, updated_at="2025-09-01"))
+        changed = self.sut.upsert_ticket(ticket(1, updated_at="2025-09-02"))
+
+        # Assert
+        assert (unchanged, changed) == (False, True)
+
+    @pytest.mark.unit
+    def test_prune_removes_entities_of_older_passes(self):
+        # Arrange
+        self.sut.upsert_ticket(ticket(1), sync_pass=1)
+        self.sut.upsert_ticket(ticket(2), sync_pass=1)
+        self.sut.upsert_contact({"id": "c1"}, sync_pass=1)
+        self.sut.upsert_contact({"id": "c2"}, sync_pass=1)
+        self.sut.upsert_ticket(ticket(2), sync_pass=2)
+        self.sut.upsert_contact({"id": "c2"}, sync_pass=2)
+
+        # Act
+        self.sut.prune(sync_pass=2)
+
+        # Assert
+        assert self.sut.ticket_ids() == {2}
+        assert self.sut.contact_ids() == {"c2"}
+        assert [t["id"] for t in self.sut.search_tickets(query="ticket")] == [2]
+
+    @pytest.mark.unit
+    def test_sync_state_is_persisted(self):
+        # Arrange
+        self.clock.now = 100.0
+        self.sut.mark_synced()
+        other = SearchIndex(self.path, clock=self.clock)
+
+        # Act
+        self.clock.now = 150.0
+
+        # Assert
+        assert other.synced_at == 100.0
+        assert other.is_stale(max_age=60) is False
+        assert other.is_stale(max_age=50) is True
+        assert SearchIndex(clock=self.clock).is_stale(max_age=60) is True
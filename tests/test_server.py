@@ -1,29 +1,74 @@
+import asyncio
 import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
 
+import httpx
 import pytest
-import responses
-
+import respx
+from mcp.server.fastmcp.exceptions import ToolError
+
+import server
+from client_pool import TidioClientPool
+from metrics import ServerMetrics
+from response_cache import ResponseCache, SQLiteResponseCache
+from response_shaping import ShapingOptions
+from search_index import SearchIndex
 from server import (
+    _create_continuation_store,
+    _create_response_cache,
+    _create_tidio_api_client,
+    _parse_args,
     add_internal_note_to_a_ticket,
+    bulk_delete_tickets,
+    bulk_update_tickets,
+    continuation_stores,
+    create_contacts_batch,
     create_ticket,
     delete_contact,
     delete_ticket,
     get_contact_details,
     get_contacts,
+    get_contacts_details,
     get_departments,
     get_operators,
+    get_server_metrics,
     get_ticket_details,
+    get_ticket_messages,
     get_tickets,
+    get_tickets_details,
+    http_app,
+    mcp,
+    read_truncated_text,
     reply_to_a_ticket,
+    search_tickets,
+    sync_engines,
+    tidio_api_client,
     unassign_ticket,
+    update_contacts_batch,
     update_ticket,
 )
+from sync_engine import SyncEngine
+
+
+@pytest.fixture(autouse=True)
+async def isolated_tidio_api_client(monkeypatch):
+    await tidio_api_client.cache.clear()
+    await continuation_stores[tidio_api_client].clear()
+    monkeypatch.setattr(tidio_api_client, "read_rate_limiter", None)
+    monkeypatch.setattr(tidio_api_client, "write_rate_limiter", None)
+    monkeypatch.setitem(
+        sync_engines, tidio_api_client, SyncEngine(tidio_api_client, SearchIndex())
+    )
+    monkeypatch.setattr("server.SYNC_IN_BACKGROUND", False)
 
 
 class TestGetDepartments:
     @pytest.mark.unit
-    @responses.activate
-    def test_get_departments_success(self):
+    @respx.mock
+    async def test_get_departments_success(self):
         # Arrange
         departments_data = {
             "departments": [
@@ -31,42 +76,53 @@ class TestGetDepartments:
                 {"id": "7f14e5f9-1df0-439d-9b39-bd7e1e82fac5", "name": "Sales"},
             ]
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/departments",
-            json=departments_data,
-            status=200,
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json=departments_data)
         )
 
         # Act
-        result = get_departments()
+        result = await get_departments()
 
         # Assert
         assert result == {"status": "ok", "data": departments_data}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_departments_empty_response(self):
+    @respx.mock
+    async def test_get_departments_empty_response(self):
         # Arrange
         departments_data = {"departments": []}
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/departments",
-            json=departments_data,
-            status=200,
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json=departments_data)
+        )
+
+        # Act
+        result = await get_departments()
+
+        # Assert
+        assert result == {"status": "ok", "data": departments_data}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_departments_served_from_cache(self):
+        # Arrange
+        departments_data = {"departments": []}
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json=departments_data)
         )
 
         # Act
-        result = get_departments()
+        await get_departments()
+        result = await get_departments()
 
         # Assert
         assert result == {"status": "ok", "data": departments_data}
+        assert len(respx.calls) == 1
 
 
 class TestGetOperators:
     @pytest.mark.unit
-    @responses.activate
-    def test_get_operators_success(self):
+    @respx.mock
+    async def test_get_operators_success(self):
         # Arrange
         operators_data = {
             "operators": [
@@ -94,22 +150,19 @@ class TestGetOperators:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/operators",
-            json=operators_data,
-            status=200,
+        respx.get("https://api.tidio.com/operators").mock(
+            return_value=httpx.Response(200, json=operators_data)
         )
 
         # Act
-        result = get_operators()
+        result = await get_operators()
 
         # Assert
         assert result == {"status": "ok", "data": operators_data}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_operators_empty_response(self):
+    @respx.mock
+    async def test_get_operators_empty_response(self):
         # Arrange
         operators_data = {
             "operators": [],
@@ -118,22 +171,19 @@ class TestGetOperators:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/operators",
-            json=operators_data,
-            status=200,
+        respx.get("https://api.tidio.com/operators").mock(
+            return_value=httpx.Response(200, json=operators_data)
         )
 
         # Act
-        result = get_operators()
+        result = await get_operators()
 
         # Assert
         assert result == {"status": "ok", "data": operators_data}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_operators_with_cursor(self):
+    @respx.mock
+    async def test_get_operators_with_cursor(self):
         # Arrange
         cursor = "aWRfX2U2YTgyYTc0LTExNzAtNGY1Ny1hMDMxLWIzNmYzZjZiYzA5Mw=="
         operators_data = {
@@ -153,15 +203,12 @@ class TestGetOperators:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            f"https://api.tidio.com/operators?cursor={cursor}",
-            json=operators_data,
-            status=200,
+        respx.get(f"https://api.tidio.com/operators?cursor={cursor}").mock(
+            return_value=httpx.Response(200, json=operators_data)
         )
 
         # Act
-        result = get_operators(cursor=cursor)
+        result = await get_operators(cursor=cursor)
 
         # Assert
         assert result == {"status": "ok", "data": operators_data}
@@ -169,8 +216,8 @@ class TestGetOperators:
 
 class TestGetContacts:
     @pytest.mark.unit
-    @responses.activate
-    def test_get_contacts_success(self):
+    @respx.mock
+    async def test_get_contacts_success(self):
         # Arrange
         contacts_data = {
             "contacts": [
@@ -212,21 +259,18 @@ class TestGetContacts:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/contacts",
-            json=contacts_data,
-            status=200,
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=httpx.Response(200, json=contacts_data)
         )
 
         # Act
-        result = get_contacts()
+        result = await get_contacts()
 
         # Assert
         assert result == {"status": "ok", "data": contacts_data}
 
     @pytest.mark.unit
-    @responses.activate
+    @respx.mock
     @pytest.mark.parametrize(
         "cursor,email,expected_endpoint",
         [
@@ -247,7 +291,7 @@ class TestGetContacts:
             ),
         ],
     )
-    def test_get_contacts_by_filters(
+    async def test_get_contacts_by_filters(
         self, cursor: str | None, email: str | None, expected_endpoint: str
     ):
         # Arrange
@@ -275,22 +319,19 @@ class TestGetContacts:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            f"https://api.tidio.com{expected_endpoint}",
-            json=contacts_data,
-            status=200,
+        respx.get(f"https://api.tidio.com{expected_endpoint}").mock(
+            return_value=httpx.Response(200, json=contacts_data)
         )
 
         # Act
-        result = get_contacts(cursor=cursor, email=email)
+        result = await get_contacts(cursor=cursor, email=email)
 
         # Assert
         assert result == {"status": "ok", "data": contacts_data}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_contacts_empty_response(self):
+    @respx.mock
+    async def test_get_contacts_empty_response(self):
         # Arrange
         contacts_data = {
             "contacts": [],
@@ -299,24 +340,78 @@ class TestGetContacts:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/contacts",
-            json=contacts_data,
-            status=200,
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=httpx.Response(200, json=contacts_data)
         )
 
         # Act
-        result = get_contacts()
+        result = await get_contacts()
 
         # Assert
         assert result == {"status": "ok", "data": contacts_data}
 
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_contacts_max_pages_keeps_filters(self):
+        # Arrange
+        respx.get("https://api.tidio.com/contacts?email=john%40example.com").mock(
+            return_value=httpx.Response(
+                200,
+                json={"contacts": [{"id": "a"}], "meta": {"cursor": "c1", "limit": 1}},
+            )
+        )
+        respx.get(
+            "https://api.tidio.com/contacts?email=john%40example.com&cursor=c1"
+        ).mock(
+            return_value=httpx.Response(
+                200,
+                json={"contacts": [{"id": "b"}], "meta": {"cursor": None, "limit": 1}},
+            )
+        )
+
+        # Act
+        result = await get_contacts(email="john@example.com", max_pages=5)
+
+        # Assert
+        assert result == {
+            "status": "ok",
+            "data": {
+                "contacts": [{"id": "a"}, {"id": "b"}],
+                "meta": {"cursor": None, "limit": 1, "pages_fetched": 2},
+            },
+        }
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_contacts_projection_and_sorting(self):
+        # Arrange
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "contacts": [
+                        {"id": "a", "email": "zoe@example.com", "phone": "1"},
+                        {"id": "b", "email": "adam@example.com", "phone": "2"},
+                    ],
+                    "meta": {"cursor": None},
+                },
+            )
+        )
+
+        # Act
+        result = await get_contacts(fields=["email"], sort_by="email")
+
+        # Assert
+        assert result["data"]["contacts"] == [
+            {"id": "b", "email": "adam@example.com"},
+            {"id": "a", "email": "zoe@example.com"},
+        ]
+
 
 class TestGetContactDetails:
     @pytest.mark.unit
-    @responses.activate
-    def test_get_contact_details_success(self):
+    @respx.mock
+    async def test_get_contact_details_success(self):
         # Arrange
         contact_id = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
         contact_data = {
@@ -335,43 +430,169 @@ class TestGetContactDetails:
             "email_consent": "subscribed",
             "properties": [{"name": "company", "value": "Acme Corp"}],
         }
-        responses.add(
-            responses.GET,
-            f"https://api.tidio.com/contacts/{contact_id}",
-            json=contact_data,
-            status=200,
+        respx.get(f"https://api.tidio.com/contacts/{contact_id}").mock(
+            return_value=httpx.Response(200, json=contact_data)
         )
 
         # Act
-        result = get_contact_details(contact_id)
+        result = await get_contact_details(contact_id)
 
         # Assert
         assert result == {"status": "ok", "data": contact_data}
 
 
+class TestGetContactsDetails:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_contacts_details_returns_map(self):
+        # Arrange
+        respx.get("https://api.tidio.com/contacts/a").mock(
+            return_value=httpx.Response(200, json={"id": "a"})
+        )
+        respx.get("https://api.tidio.com/contacts/b").mock(
+            return_value=httpx.Response(404, json={"error": "Not found"})
+        )
+
+        # Act
+        result = await get_contacts_details(["a", "b"])
+
+        # Assert
+        assert result["data"]["contacts"] == {"a": {"id": "a"}}
+        assert list(result["data"]["errors"]) == ["b"]
+
+    @pytest.mark.unit
+    async def test_get_contacts_details_empty_list(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Contact IDs cannot be empty"):
+            await get_contacts_details([])
+
+
 class TestDeleteContact:
     @pytest.mark.unit
-    @responses.activate
-    def test_delete_contact_success(self):
+    @respx.mock
+    async def test_delete_contact_success(self):
         # Arrange
         contact_id = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
-        responses.add(
-            responses.DELETE,
-            f"https://api.tidio.com/contacts/{contact_id}",
-            status=204,
+        respx.delete(f"https://api.tidio.com/contacts/{contact_id}").mock(
+            return_value=httpx.Response(204)
         )
 
         # Act
-        result = delete_contact(contact_id)
+        result = await delete_contact(contact_id)
 
         # Assert
         assert result == {"status": "ok", "data": {}}
 
 
+class TestCreateContactsBatch:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_create_contacts_batch_sends_chunks(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr("server.CONTACTS_BATCH_SIZE", 2)
+        contacts = [{"email": f"customer{i}@example.com"} for i in range(3)]
+        route = respx.post("https://api.tidio.com/contacts/batch").mock(
+            return_value=httpx.Response(201, json={"status": "created"})
+        )
+
+        # Act
+        result = await create_contacts_batch(contacts)
+
+        # Assert
+        assert result == {
+            "status": "ok",
+            "data": {
+                "total": 3,
+                "succeeded": 3,
+                "failed": 0,
+                "errors": [],
+                "responses": [{"status": "created"}, {"status": "created"}],
+            },
+        }
+        assert sorted(
+            len(json.loads(call.request.content)["contacts"]) for call in route.calls
+        ) == [1, 2]
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_create_contacts_batch_reports_failed_chunks(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr("server.CONTACTS_BATCH_SIZE", 2)
+        contacts = [{"email": f"customer{i}@example.com"} for i in range(3)]
+
+        def respond(request):
+            if len(json.loads(request.content)["contacts"]) == 1:
+                return httpx.Response(422, json={"error": "Invalid email"})
+            return httpx.Response(201, json={})
+
+        respx.post("https://api.tidio.com/contacts/batch").mock(side_effect=respond)
+
+        # Act
+        result = await create_contacts_batch(contacts)
+
+        # Assert
+        data = result["data"]
+        assert (data["total"], data["succeeded"], data["failed"]) == (3, 2, 1)
+        assert len(data["errors"]) == 1
+        assert data["errors"][0]["start_index"] == 2
+        assert data["errors"][0]["end_index"] == 2
+        assert "Invalid email" in data["errors"][0]["error"]
+
+    @pytest.mark.unit
+    async def test_create_contacts_batch_empty_list(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Contacts cannot be empty"):
+            await create_contacts_batch([])
+
+
+class TestUpdateContactsBatch:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_update_contacts_batch_evicts_cached_contacts(self):
+        # Arrange
+        contact_id = "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
+        respx.get(f"https://api.tidio.com/contacts/{contact_id}").mock(
+            return_value=httpx.Response(200, json={"id": contact_id})
+        )
+        route = respx.patch("https://api.tidio.com/contacts/batch").mock(
+            return_value=httpx.Response(204)
+        )
+        await get_contact_details(contact_id)
+
+        # Act
+        result = await update_contacts_batch([{"id": contact_id, "first_name": "Jo"}])
+
+        # Assert
+        assert result["data"]["succeeded"] == 1
+        assert json.loads(route.calls[0].request.content) == {
+            "contacts": [{"id": contact_id, "first_name": "Jo"}]
+        }
+        assert await tidio_api_client.cache.keys() == []
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "contacts, expected_error",
+        [
+            ([], "Contacts cannot be empty"),
+            (
+                [{"first_name": "Jo"}],
+                "Each contact must be a dictionary with a string 'id'",
+            ),
+            ([{"id": 1}], "Each contact must be a dictionary with a string 'id'"),
+        ],
+    )
+    async def test_update_contacts_batch_validation_errors(
+        self, contacts, expected_error
+    ):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            await update_contacts_batch(contacts)
+
+
 class TestGetTickets:
     @pytest.mark.unit
-    @responses.activate
-    def test_get_tickets_success(self):
+    @respx.mock
+    async def test_get_tickets_success(self):
         # Arrange
         tickets_data = {
             "tickets": [
@@ -403,22 +624,19 @@ class TestGetTickets:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/tickets",
-            json=tickets_data,
-            status=200,
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(200, json=tickets_data)
         )
 
         # Act
-        result = get_tickets()
+        result = await get_tickets()
 
         # Assert
         assert result == {"status": "ok", "data": tickets_data}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_tickets_empty_response(self):
+    @respx.mock
+    async def test_get_tickets_empty_response(self):
         # Arrange
         tickets_data = {
             "tickets": [],
@@ -427,22 +645,19 @@ class TestGetTickets:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/tickets",
-            json=tickets_data,
-            status=200,
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(200, json=tickets_data)
         )
 
         # Act
-        result = get_tickets()
+        result = await get_tickets()
 
         # Assert
         assert result == {"status": "ok", "data": tickets_data}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_tickets_with_cursor(self):
+    @respx.mock
+    async def test_get_tickets_with_cursor(self):
         # Arrange
         cursor = "aWRfX2U2YTgyYTc0LTExNzAtNGY1Ny1hMDMxLWIzNmYzZjZiYzA5Mw=="
         tickets_data = {
@@ -464,24 +679,265 @@ class TestGetTickets:
                 "limit": 100,
             },
         }
-        responses.add(
-            responses.GET,
-            f"https://api.tidio.com/tickets?cursor={cursor}",
-            json=tickets_data,
-            status=200,
+        respx.get(f"https://api.tidio.com/tickets?cursor={cursor}").mock(
+            return_value=httpx.Response(200, json=tickets_data)
         )
 
         # Act
-        result = get_tickets(cursor=cursor)
+        result = await get_tickets(cursor=cursor)
 
         # Assert
         assert result == {"status": "ok", "data": tickets_data}
 
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_max_pages_returns_resume_cursor(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets?cursor=c1").mock(
+            return_value=httpx.Response(
+                200, json={"tickets": [{"id": 2}], "meta": {"cursor": "c2"}}
+            )
+        )
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(
+                200, json={"tickets": [{"id": 1}], "meta": {"cursor": "c1"}}
+            )
+        )
+
+        # Act
+        result = await get_tickets(max_pages=2)
+
+        # Assert
+        assert result == {
+            "status": "ok",
+            "data": {
+                "tickets": [{"id": 1}, {"id": 2}],
+                "meta": {"cursor": "c2", "pages_fetched": 2},
+            },
+        }
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_max_items_stops_after_filled_page(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets?cursor=c0").mock(
+            return_value=httpx.Response(
+                200, json={"tickets": [{"id": 1}, {"id": 2}], "meta": {"cursor": "c1"}}
+            )
+        )
+
+        # Act
+        result = await get_tickets(cursor="c0", max_items=2)
+
+        # Assert
+        assert result["data"]["tickets"] == [{"id": 1}, {"id": 2}]
+        assert result["data"]["meta"] == {"cursor": "c1", "pages_fetched": 1}
+        assert len(respx.calls) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "limits, expected_error",
+        [
+            ({"max_pages": 0}, "Max pages must be greater than 0"),
+            ({"max_items": 0}, "Max items must be greater than 0"),
+        ],
+    )
+    async def test_get_tickets_invalid_limits(self, limits, expected_error):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            await get_tickets(**limits)
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_filters_count_towards_max_items(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets?cursor=c1").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "tickets": [
+                        {"id": 3, "status": "open", "priority": "urgent"},
+                        {"id": 4, "status": "open", "priority": "low"},
+                    ],
+                    "meta": {"cursor": None},
+                },
+            )
+        )
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "tickets": [
+                        {"id": 1, "status": "solved", "priority": "urgent"},
+                        {"id": 2, "status": "open", "priority": "urgent"},
+                    ],
+                    "meta": {"cursor": "c1"},
+                },
+            )
+        )
+
+        # Act
+        result = await get_tickets(status="open", priority="urgent", max_items=2)
+
+        # Assert
+        assert [ticket["id"] for ticket in result["data"]["tickets"]] == [2, 3]
+        assert result["data"]["meta"] == {"cursor": None, "pages_fetched": 2}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_filtered_walk_stops_without_matches(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr("server.FILTER_MAX_PAGES", 3)
+        route = respx.get(url__startswith="https://api.tidio.com/tickets").mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                json={
+                    "tickets": [{"id": len(route.calls), "status": "open"}],
+                    "meta": {"cursor": f"c{len(route.calls)}"},
+                },
+            )
+        )
+
+        # Act
+        result = await get_tickets(created_after="2025-09-01", max_items=10)
+
+        # Assert
+        assert route.call_count == 3
+        assert result["data"] == {
+            "tickets": [],
+            "meta": {"cursor": "c2", "pages_fetched": 3},
+        }
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_filters_by_assignment_and_date(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "tickets": [
+                        {
+                            "id": 1,
+                            "assigned_operator_id": "o1",
+                            "assigned_department_id": "d1",
+                            "created_at": "2025-09-07T10:30:00+00:00",
+                        },
+                        {
+                            "id": 2,
+                            "assigned_operator_id": "o1",
+                            "assigned_department_id": "d1",
+                            "created_at": "2025-09-08T01:30:00+02:00",
+                        },
+                        {"id": 3, "assigned_operator_id": "o1"},
+                        {
+                            "id": 5,
+                            "assigned_operator_id": "o1",
+                            "assigned_department_id": "d1",
+                            "created_at": "last tuesday",
+                        },
+                        {
+                            "id": 4,
+                            "assigned_operator_id": "o2",
+                            "assigned_department_id": "d1",
+                            "created_at": "2025-09-07T10:30:00+00:00",
+                        },
+                    ],
+                    "meta": {"cursor": None},
+                },
+            )
+        )
+
+        # Act
+        result = await get_tickets(
+            assignee="o1",
+            department="d1",
+            created_after="2025-09-07",
+            created_before="2025-09-08",
+        )
+
+        # Assert
+        assert [ticket["id"] for ticket in result["data"]["tickets"]] == [1, 2]
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_projection_and_sorting(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "tickets": [
+                        {"id": 1, "subject": "A", "priority": "low", "link": "x"},
+                        {"id": 2, "subject": "B", "priority": None, "link": "y"},
+                        {"id": 3, "subject": "C", "priority": "urgent", "link": "z"},
+                    ],
+                    "meta": {"cursor": None, "limit": 100},
+                },
+            )
+        )
+
+        # Act
+        result = await get_tickets(fields=["priority"], sort_by="-priority")
+
+        # Assert
+        assert result["data"] == {
+            "tickets": [
+                {"id": 3, "priority": "urgent"},
+                {"id": 1, "priority": "low"},
+                {"id": 2, "priority": None},
+            ],
+            "meta": {"cursor": None, "limit": 100},
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "values",
+        [[{"name": "Ann"}, {"name": "Bob"}], ["low", 1]],
+    )
+    @respx.mock
+    async def test_get_tickets_sort_by_unsortable_field(self, values):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "tickets": [
+                        {"id": ticket_id, "field": value}
+                        for ticket_id, value in enumerate(values)
+                    ],
+                    "meta": {"cursor": None},
+                },
+            )
+        )
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="Sort by field 'field' must hold"):
+            await get_tickets(sort_by="field")
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "arguments,expected_error",
+        [
+            ({"status": "closed"}, "Status must be one of: open, pending, solved"),
+            ({"priority": "high"}, "Priority must be one of: low, normal, urgent"),
+            (
+                {"created_before": "yesterday"},
+                "Created after and created before must be ISO 8601 dates",
+            ),
+        ],
+    )
+    async def test_get_tickets_invalid_filters(self, arguments, expected_error):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            await get_tickets(**arguments)
+
 
 class TestGetTicketDetails:
     @pytest.mark.unit
-    @responses.activate
-    def test_get_ticket_details_success(self):
+    @respx.mock
+    async def test_get_ticket_details_success(self):
         # Arrange
         ticket_id = 10009
         ticket_data = {
@@ -526,141 +982,564 @@ class TestGetTicketDetails:
                 },
             ],
         }
-        responses.add(
-            responses.GET,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            json=ticket_data,
-            status=200,
+        respx.get(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(200, json=ticket_data)
         )
 
         # Act
-        result = get_ticket_details(ticket_id)
+        result = await get_ticket_details(ticket_id)
 
         # Assert
         assert result == {"status": "ok", "data": ticket_data}
 
 
-class TestDeleteTicket:
+class TestGetTicketMessages:
     @pytest.mark.unit
-    @responses.activate
-    def test_delete_ticket_success(self):
+    @respx.mock
+    async def test_page_backwards_without_fetching_again(self):
         # Arrange
-        ticket_id = 10009
-        responses.add(
-            responses.DELETE,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            status=204,
+        messages = [{"message_id": str(i)} for i in range(120)]
+        route = respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1, "messages": messages})
         )
 
         # Act
-        result = delete_ticket(ticket_id)
+        details = await get_ticket_details(1, last_messages=10)
+        page = details["data"]["messages_page"]
+        middle = await get_ticket_messages(
+            page["handle"], before=page["before"], limit=60
+        )
+        first = await get_ticket_messages(
+            page["handle"], before=middle["data"]["before"], limit=60
+        )
 
         # Assert
-        assert result == {"status": "ok", "data": {}}
-
+        assert details["data"]["messages"] == messages[110:]
+        assert page["before"] == 110
+        assert page["total"] == 120
+        assert middle["data"] == {
+            "messages": messages[50:110],
+            "before": 50,
+            "total": 120,
+        }
+        assert first["data"] == {
+            "messages": messages[:50],
+            "before": None,
+            "total": 120,
+        }
+        assert route.call_count == 1
 
-class TestCreateTicket:
     @pytest.mark.unit
-    @responses.activate
-    def test_create_ticket_minimal_data(self):
+    @respx.mock
+    async def test_short_ticket_has_no_handle(self):
         # Arrange
-        contact_email = "customer@example.com"
-        subject = "Test ticket subject"
-        message_content = "This is a test ticket message"
-
-        ticket_response = {"id": 10010}
-        responses.add(
-            responses.POST,
-            "https://api.tidio.com/tickets/as-contact",
-            json=ticket_response,
-            status=201,
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(
+                200, json={"id": 1, "messages": [{"message_id": "a"}]}
+            )
         )
 
         # Act
-        result = create_ticket(
-            contact_email,
-            subject,
-            message_content,
-        )
+        result = await get_ticket_details(1, last_messages=10)
 
         # Assert
-        assert result == {"status": "ok", "data": ticket_response}
-        assert len(responses.calls) == 1
-
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {
-            "contact_email": contact_email,
-            "subject": subject,
-            "message_content": message_content,
+        assert result["data"]["messages_page"] == {
+            "handle": None,
+            "before": None,
+            "total": 1,
         }
 
     @pytest.mark.unit
-    @responses.activate
-    def test_create_ticket_with_all_data(self):
+    @respx.mock
+    async def test_expired_handle(self):
         # Arrange
-        contact_email = "customer@example.com"
-        subject = "Test ticket with department"
-        message_content = "This is a test ticket with department assignment"
-        department_id = "535eb95e-107c-440a-8720-53649368a26a"
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(
+                200, json={"id": 1, "messages": [{"message_id": "a"}] * 3}
+            )
+        )
+        result = await get_ticket_details(1, last_messages=1)
+        await continuation_stores[tidio_api_client].clear()
 
-        ticket_response = {"id": 10011}
-        responses.add(
-            responses.POST,
-            "https://api.tidio.com/tickets/as-contact",
-            json=ticket_response,
-            status=201,
+        # Act & Assert
+        with pytest.raises(ValueError, match="Handle is unknown or expired"):
+            await get_ticket_messages(
+                result["data"]["messages_page"]["handle"], before=2
+            )
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_invalid_arguments(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(
+                200, json={"id": 1, "messages": [{"message_id": "a"}] * 3}
+            )
         )
+        result = await get_ticket_details(1, last_messages=1)
+        handle = result["data"]["messages_page"]["handle"]
 
-        # Act
-        result = create_ticket(
-            contact_email,
-            subject,
-            message_content,
-            department_id,
+        # Act & Assert
+        with pytest.raises(ValueError, match="Before must be between 1 and 3"):
+            await get_ticket_messages(handle, before=4)
+        with pytest.raises(ValueError, match="Limit must be greater than 0"):
+            await get_ticket_messages(handle, before=2, limit=0)
+        with pytest.raises(ValueError, match="Last messages must be greater than 0"):
+            await get_ticket_details(1, last_messages=0)
+
+
+class TestGetTicketsDetails:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_tickets_details_fetches_duplicates_once(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1})
+        )
+        respx.get("https://api.tidio.com/tickets/2").mock(
+            return_value=httpx.Response(200, json={"id": 2})
         )
 
-        # Assert
-        assert result == {"status": "ok", "data": ticket_response}
-        assert len(responses.calls) == 1
+        # Act
+        result = await get_tickets_details([1, 2, 1])
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {
-            "contact_email": contact_email,
-            "subject": subject,
-            "message_content": message_content,
-            "assigned_department_id": department_id,
+        # Assert
+        assert result == {
+            "status": "ok",
+            "data": {"tickets": {"1": {"id": 1}, "2": {"id": 2}}, "errors": {}},
         }
+        assert len(respx.calls) == 2
 
-
-class TestUpdateTicket:
     @pytest.mark.unit
-    @responses.activate
-    def test_update_ticket_with_all_data(self):
+    @respx.mock
+    async def test_get_tickets_details_respects_concurrency_cap(self, monkeypatch):
         # Arrange
-        ticket_id = 10009
-        status = "pending"
-        priority = "urgent"
-        assigned = {"type": "operator", "id": "fe7df646-6881-4d44-bcd5-639501a32bfe"}
-
-        responses.add(
-            responses.PATCH,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            status=204,
+        monkeypatch.setattr("server.FETCH_CONCURRENCY", 2)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def respond(request):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json={})
+
+        respx.get(url__regex=r"https://api.tidio.com/tickets/\d+").mock(
+            side_effect=respond
         )
 
         # Act
-        result = update_ticket(ticket_id, status, priority, assigned)
+        result = await get_tickets_details(list(range(6)))
 
         # Assert
-        assert result == {"status": "ok", "data": {}}
-        assert len(responses.calls) == 1
-
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {
-            "status": status,
-            "priority": priority,
-            "assigned": assigned,
-        }
+        assert len(result["data"]["tickets"]) == 6
+        assert max_in_flight == 2
+
+    @pytest.mark.unit
+    async def test_get_tickets_details_empty_list(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Ticket IDs cannot be empty"):
+            await get_tickets_details([])
+
+
+class TestSearchTickets:
+    def mock_account(self, tickets: list[dict], contacts: list[dict] = None):
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(
+                200, json={"tickets": tickets, "meta": {"cursor": None}}
+            )
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=httpx.Response(
+                200, json={"contacts": contacts or [], "meta": {"cursor": None}}
+            )
+        )
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_search_tickets_syncs_index_once(self):
+        # Arrange
+        self.mock_account(
+            [
+                {"id": 1, "subject": "Invoice", "status": "open"},
+                {"id": 2, "subject": "Login", "status": "open"},
+            ]
+        )
+        details_1 = respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "id": 1,
+                    "subject": "Invoice",
+                    "status": "open",
+                    "messages": [
+                        {
+                            "message_content": "Please refund me",
+                            "created_at": "2025-09-07T10:30:00+00:00",
+                        }
+                    ],
+                },
+            )
+        )
+        respx.get("https://api.tidio.com/tickets/2").mock(
+            return_value=httpx.Response(404)
+        )
+
+        # Act
+        result = await search_tickets(query="refund", status="open")
+        again = await search_tickets(query="login")
+
+        # Assert
+        assert result["data"]["tickets"] == [
+            {
+                "id": 1,
+                "subject": "Invoice",
+                "status": "open",
+                "created_at": "2025-09-07T10:30:00+00:00",
+                "updated_at": "2025-09-07T10:30:00+00:00",
+            }
+        ]
+        assert result["data"]["meta"]["count"] == 1
+        assert result["data"]["meta"]["complete"] is True
+        assert [t["id"] for t in again["data"]["tickets"]] == [2]
+        assert details_1.call_count == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_search_tickets_does_not_wait_for_slow_first_sync(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr("server.SEARCH_SYNC_WAIT", 0.05)
+        synced = asyncio.Event()
+
+        async def slow_contacts(request):
+            await synced.wait()
+            return httpx.Response(200, json={"contacts": [], "meta": {"cursor": None}})
+
+        self.mock_account([{"id": 1, "subject": "Invoice"}])
+        respx.get("https://api.tidio.com/contacts").mock(side_effect=slow_contacts)
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1, "messages": []})
+        )
+
+        # Act
+        result = await search_tickets(query="invoice")
+        synced.set()
+
+        # Assert
+        assert [t["id"] for t in result["data"]["tickets"]] == [1]
+        assert result["data"]["meta"]["complete"] is False
+        assert result["data"]["meta"]["synced_at"] is None
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_search_tickets_resync_removes_deleted_tickets(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr("server.SEARCH_MAX_STALENESS", 0)
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1, "messages": []})
+        )
+        self.mock_account([{"id": 1, "subject": "Invoice"}])
+        await search_tickets()
+        self.mock_account([])
+
+        # Act
+        result = await search_tickets()
+
+        # Assert
+        assert result["data"]["tickets"] == []
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "arguments,expected_error",
+        [
+            ({"status": "closed"}, "Status must be one of: open, pending, solved"),
+            ({"priority": "high"}, "Priority must be one of: low, normal, urgent"),
+            (
+                {"created_after": "last week"},
+                "Created after and created before must be ISO 8601 dates",
+            ),
+            ({"limit": 0}, "Limit must be greater than 0"),
+        ],
+    )
+    async def test_search_tickets_invalid_arguments(self, arguments, expected_error):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            await search_tickets(**arguments)
+
+
+class TestResponseShaping:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_continuations_do_not_evict_cached_responses(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(
+            "server.RESPONSE_SHAPING", ShapingOptions(max_text_length=10)
+        )
+        monkeypatch.setattr("server.CONTINUATIONS_PER_RESULT", 3)
+        monkeypatch.setattr(tidio_api_client.cache, "max_size", 2)
+        departments = respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "id": 1,
+                    "messages": [
+                        {"message_content": f"Message {i} " + "x" * 20}
+                        for i in range(5)
+                    ],
+                },
+            )
+        )
+        await get_departments()
+
+        # Act
+        result = await get_ticket_details(1)
+        first = result["data"]["messages"][0]["message_content_continuation"]
+        rest = await read_truncated_text(
+            first["handle"], offset=first["offset"], length=100
+        )
+        await get_departments()
+
+        # Assert
+        messages = result["data"]["messages"]
+        assert ["message_content_continuation" in message for message in messages] == [
+            True,
+            True,
+            True,
+            False,
+            False,
+        ]
+        assert messages[4]["message_content"] == "Message 4 " + "x" * 20
+        assert rest["data"]["text"] == "x" * 20
+        assert departments.call_count == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_long_html_message_is_stripped_and_truncated(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(
+            "server.RESPONSE_SHAPING",
+            ShapingOptions(strip_html=True, max_text_length=10),
+        )
+        ticket_data = {
+            "id": 1,
+            "messages": [{"message_content": "<p>Dear customer, thank you</p>"}],
+        }
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json=ticket_data)
+        )
+
+        # Act
+        result = await get_ticket_details(1)
+        message = result["data"]["messages"][0]
+        continuation = message["message_content_continuation"]
+        rest = await read_truncated_text(
+            continuation["handle"], offset=continuation["offset"], length=8
+        )
+        end = await read_truncated_text(
+            continuation["handle"], offset=rest["data"]["next_offset"]
+        )
+
+        # Assert
+        assert message["message_content"] == "Dear custo"
+        assert continuation["total_length"] == 24
+        assert result["bytes_saved"] == len(server.JSON_CODEC.dumps(ticket_data)) - len(
+            server.JSON_CODEC.dumps(result["data"])
+        )
+        assert rest == {
+            "status": "ok",
+            "data": {"text": "mer, tha", "next_offset": 18, "total_length": 24},
+        }
+        assert end["data"] == {
+            "text": "nk you",
+            "next_offset": None,
+            "total_length": 24,
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "arguments,expected_error",
+        [
+            ({"handle": "unknown", "offset": 0}, "Handle is unknown or expired"),
+            ({"handle": "unknown", "offset": -1}, "Offset cannot be negative"),
+            (
+                {"handle": "unknown", "offset": 0, "length": 0},
+                "Length must be greater than 0",
+            ),
+        ],
+    )
+    async def test_read_truncated_text_invalid_arguments(
+        self, arguments, expected_error
+    ):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            await read_truncated_text(**arguments)
+
+
+class TestDeleteTicket:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_delete_ticket_success(self):
+        # Arrange
+        ticket_id = 10009
+        respx.delete(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
+        )
+
+        # Act
+        result = await delete_ticket(ticket_id)
+
+        # Assert
+        assert result == {"status": "ok", "data": {}}
+
+
+class TestCreateTicket:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_create_ticket_minimal_data(self):
+        # Arrange
+        contact_email = "customer@example.com"
+        subject = "Test ticket subject"
+        message_content = "This is a test ticket message"
+
+        ticket_response = {"id": 10010}
+        respx.post("https://api.tidio.com/tickets/as-contact").mock(
+            return_value=httpx.Response(201, json=ticket_response)
+        )
+
+        # Act
+        result = await create_ticket(
+            contact_email,
+            subject,
+            message_content,
+        )
+
+        # Assert
+        assert result == {"status": "ok", "data": ticket_response}
+        assert len(respx.calls) == 1
+
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {
+            "contact_email": contact_email,
+            "subject": subject,
+            "message_content": message_content,
+        }
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_create_ticket_with_all_data(self):
+        # Arrange
+        contact_email = "customer@example.com"
+        subject = "Test ticket with department"
+        message_content = "This is a test ticket with department assignment"
+        department_id = "535eb95e-107c-440a-8720-53649368a26a"
+
+        ticket_response = {"id": 10011}
+        respx.post("https://api.tidio.com/tickets/as-contact").mock(
+            return_value=httpx.Response(201, json=ticket_response)
+        )
+
+        # Act
+        result = await create_ticket(
+            contact_email,
+            subject,
+            message_content,
+            department_id,
+        )
+
+        # Assert
+        assert result == {"status": "ok", "data": ticket_response}
+        assert len(respx.calls) == 1
+
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {
+            "contact_email": contact_email,
+            "subject": subject,
+            "message_content": message_content,
+            "assigned_department_id": department_id,
+        }
+
+
+class TestUpdateTicket:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_update_ticket_with_all_data(self):
+        # Arrange
+        ticket_id = 10009
+        status = "pending"
+        priority = "urgent"
+        assigned = {"type": "operator", "id": "fe7df646-6881-4d44-bcd5-639501a32bfe"}
+
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
+        )
+
+        # Act
+        result = await update_ticket(ticket_id, status, priority, assigned)
+
+        # Assert
+        assert result == {"status": "ok", "data": {}}
+        assert len(respx.calls) == 1
+
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {
+            "status": status,
+            "priority": priority,
+            "assigned": assigned,
+        }
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_update_ticket_patches_cached_ticket_details(self):
+        # Arrange
+        ticket_id = 10009
+        respx.get(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(
+                200, json={"id": ticket_id, "status": "open", "priority": "low"}
+            )
+        )
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
+        )
+        await get_ticket_details(ticket_id)
+
+        # Act
+        await update_ticket(ticket_id, status="solved", priority="urgent")
+        result = await get_ticket_details(ticket_id)
+
+        # Assert
+        assert result["data"] == {
+            "id": ticket_id,
+            "status": "solved",
+            "priority": "urgent",
+        }
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_update_ticket_assignment_evicts_cached_ticket_details(self):
+        # Arrange
+        ticket_id = 10009
+        respx.get(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(200, json={"id": ticket_id})
+        )
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
+        )
+        await get_ticket_details(ticket_id)
+
+        # Act
+        await update_ticket(
+            ticket_id, assigned={"type": "department", "id": "dept-uuid"}
+        )
+        await get_ticket_details(ticket_id)
+
+        # Assert
+        assert len(respx.calls) == 3
 
     @pytest.mark.unit
     @pytest.mark.parametrize(
@@ -693,57 +1572,53 @@ class TestUpdateTicket:
             ),
         ],
     )
-    def test_update_ticket_validation_errors(self, update_data, expected_error):
+    async def test_update_ticket_validation_errors(self, update_data, expected_error):
         # Arrange
         ticket_id = 10009
 
         # Act & Assert
         with pytest.raises(ValueError, match=expected_error):
-            update_ticket(ticket_id, **update_data)
+            await update_ticket(ticket_id, **update_data)
 
     @pytest.mark.unit
     @pytest.mark.parametrize("status", ["open", "pending", "solved"])
-    @responses.activate
-    def test_update_ticket_valid_status_values(self, status):
+    @respx.mock
+    async def test_update_ticket_valid_status_values(self, status):
         # Arrange
         ticket_id = 10009
-        responses.add(
-            responses.PATCH,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            status=204,
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
         )
 
         # Act
-        result = update_ticket(ticket_id, status=status)
+        result = await update_ticket(ticket_id, status=status)
 
         # Assert
         assert result == {"status": "ok", "data": {}}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {"status": status}
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {"status": status}
 
     @pytest.mark.unit
     @pytest.mark.parametrize("priority", ["low", "normal", "urgent"])
-    @responses.activate
-    def test_update_ticket_valid_priority_values(self, priority):
+    @respx.mock
+    async def test_update_ticket_valid_priority_values(self, priority):
         # Arrange
         ticket_id = 10009
-        responses.add(
-            responses.PATCH,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            status=204,
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
         )
 
         # Act
-        result = update_ticket(ticket_id, priority=priority)
+        result = await update_ticket(ticket_id, priority=priority)
 
         # Assert
         assert result == {"status": "ok", "data": {}}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {"priority": priority}
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {"priority": priority}
 
     @pytest.mark.unit
     @pytest.mark.parametrize(
@@ -753,28 +1628,26 @@ class TestUpdateTicket:
             {"type": "department", "id": "535eb95e-107c-440a-8720-53649368a26a"},
         ],
     )
-    @responses.activate
-    def test_update_ticket_valid_assigned_values(self, assigned):
+    @respx.mock
+    async def test_update_ticket_valid_assigned_values(self, assigned):
         # Arrange
         ticket_id = 10009
-        responses.add(
-            responses.PATCH,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            status=204,
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
         )
 
         # Act
-        result = update_ticket(ticket_id, assigned=assigned)
+        result = await update_ticket(ticket_id, assigned=assigned)
 
         # Assert
         assert result == {"status": "ok", "data": {}}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {"assigned": assigned}
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {"assigned": assigned}
 
     @pytest.mark.unit
-    def test_update_ticket_no_parameters_error(self):
+    async def test_update_ticket_no_parameters_error(self):
         # Arrange
         ticket_id = 10009
 
@@ -783,58 +1656,154 @@ class TestUpdateTicket:
             ValueError,
             match="At least one parameter \\(status, priority, or assigned\\) must be provided",
         ):
-            update_ticket(ticket_id)
+            await update_ticket(ticket_id)
 
 
 class TestUnassignTicket:
     @pytest.mark.unit
-    @responses.activate
-    def test_unassign_ticket_success(self):
+    @respx.mock
+    async def test_unassign_ticket_success(self):
         # Arrange
         ticket_id = 10009
-        responses.add(
-            responses.PATCH,
-            f"https://api.tidio.com/tickets/{ticket_id}",
-            status=204,
+        respx.patch(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(204)
         )
 
         # Act
-        result = unassign_ticket(ticket_id)
+        result = await unassign_ticket(ticket_id)
 
         # Assert
         assert result == {"status": "ok", "data": {}}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
+
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {"assigned": None}
+
+
+class TestBulkUpdateTickets:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_bulk_update_tickets_reports_result_per_id(self):
+        # Arrange
+        respx.patch("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(204)
+        )
+        respx.patch("https://api.tidio.com/tickets/2").mock(
+            return_value=httpx.Response(404, json={"error": "Not found"})
+        )
+
+        # Act
+        result = await bulk_update_tickets([1, 2, 1], status="solved")
+
+        # Assert
+        assert result["status"] == "ok"
+        assert result["data"]["succeeded"] == [1]
+        assert list(result["data"]["failed"]) == ["2"]
+        assert "Not found" in result["data"]["failed"]["2"]
+        assert len(respx.calls) == 2
+        for call in respx.calls:
+            assert json.loads(call.request.content) == {"status": "solved"}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_bulk_update_tickets_unassign(self):
+        # Arrange
+        route = respx.patch("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(204)
+        )
+
+        # Act
+        result = await bulk_update_tickets([1], priority="low", unassign=True)
+
+        # Assert
+        assert result["data"] == {"succeeded": [1], "failed": {}}
+        assert json.loads(route.calls[0].request.content) == {
+            "priority": "low",
+            "assigned": None,
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "arguments, expected_error",
+        [
+            ({"ticket_ids": [], "status": "open"}, "Ticket IDs cannot be empty"),
+            (
+                {"ticket_ids": [1]},
+                r"At least one parameter \(status, priority, assigned, or unassign\) must be provided",
+            ),
+            (
+                {
+                    "ticket_ids": [1],
+                    "assigned": {"type": "operator", "id": "uuid"},
+                    "unassign": True,
+                },
+                "Assigned and unassign cannot be used together",
+            ),
+            (
+                {"ticket_ids": [1], "status": "invalid"},
+                "Status must be one of: open, pending, solved",
+            ),
+        ],
+    )
+    async def test_bulk_update_tickets_validation_errors(
+        self, arguments, expected_error
+    ):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            await bulk_update_tickets(**arguments)
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {"assigned": None}
+
+class TestBulkDeleteTickets:
+    @pytest.mark.unit
+    @respx.mock
+    async def test_bulk_delete_tickets_reports_result_per_id(self):
+        # Arrange
+        respx.delete("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(204)
+        )
+        respx.delete("https://api.tidio.com/tickets/2").mock(
+            return_value=httpx.Response(204)
+        )
+
+        # Act
+        result = await bulk_delete_tickets([1, 2])
+
+        # Assert
+        assert result == {
+            "status": "ok",
+            "data": {"succeeded": [1, 2], "failed": {}},
+        }
+
+    @pytest.mark.unit
+    async def test_bulk_delete_tickets_empty_list(self):
+        # Act & Assert
+        with pytest.raises(ValueError, match="Ticket IDs cannot be empty"):
+            await bulk_delete_tickets([])
 
 
 class TestReplyToATicket:
     @pytest.mark.unit
-    @responses.activate
-    def test_reply_to_a_ticket_success(self):
+    @respx.mock
+    async def test_reply_to_a_ticket_success(self):
         # Arrange
         ticket_id = 10009
         content = "Thank you for contacting us. We'll look into this issue right away."
         operator_id = "fe7df646-6881-4d44-bcd5-639501a32bfe"
 
         reply_response = {"id": "01K4JT3B8KST23PAS1H20AF2HR"}
-        responses.add(
-            responses.POST,
-            f"https://api.tidio.com/tickets/{ticket_id}/reply",
-            json=reply_response,
-            status=201,
+        respx.post(f"https://api.tidio.com/tickets/{ticket_id}/reply").mock(
+            return_value=httpx.Response(201, json=reply_response)
         )
 
         # Act
-        result = reply_to_a_ticket(ticket_id, content, operator_id)
+        result = await reply_to_a_ticket(ticket_id, content, operator_id)
 
         # Assert
         assert result == {"status": "ok", "data": reply_response}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {
             "content": content,
             "operator_id": operator_id,
             "message_type": "public",
@@ -851,7 +1820,7 @@ class TestReplyToATicket:
             ("Valid content", None, "Operator ID cannot be empty"),
         ],
     )
-    def test_reply_to_a_ticket_validation_errors(
+    async def test_reply_to_a_ticket_validation_errors(
         self, content, operator_id, expected_error
     ):
         # Arrange
@@ -859,35 +1828,32 @@ class TestReplyToATicket:
 
         # Act & Assert
         with pytest.raises(ValueError, match=expected_error):
-            reply_to_a_ticket(ticket_id, content, operator_id)
+            await reply_to_a_ticket(ticket_id, content, operator_id)
 
 
 class TestAddInternalNoteToATicket:
     @pytest.mark.unit
-    @responses.activate
-    def test_add_internal_note_to_a_ticket_success(self):
+    @respx.mock
+    async def test_add_internal_note_to_a_ticket_success(self):
         # Arrange
         ticket_id = 10009
         content = "Internal note: Customer has been escalated to priority support."
         operator_id = "fe7df646-6881-4d44-bcd5-639501a32bfe"
 
         note_response = {"id": "01K4JT3C9LST23PAS1H20AF2HR"}
-        responses.add(
-            responses.POST,
-            f"https://api.tidio.com/tickets/{ticket_id}/reply",
-            json=note_response,
-            status=201,
+        respx.post(f"https://api.tidio.com/tickets/{ticket_id}/reply").mock(
+            return_value=httpx.Response(201, json=note_response)
         )
 
         # Act
-        result = add_internal_note_to_a_ticket(ticket_id, content, operator_id)
+        result = await add_internal_note_to_a_ticket(ticket_id, content, operator_id)
 
         # Assert
         assert result == {"status": "ok", "data": note_response}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == {
+        request = respx.calls[0].request
+        assert json.loads(request.content) == {
             "content": content,
             "operator_id": operator_id,
             "message_type": "internal",
@@ -904,7 +1870,7 @@ class TestAddInternalNoteToATicket:
             ("Valid content", None, "Operator ID cannot be empty"),
         ],
     )
-    def test_add_internal_note_to_a_ticket_validation_errors(
+    async def test_add_internal_note_to_a_ticket_validation_errors(
         self, content, operator_id, expected_error
     ):
         # Arrange
@@ -912,4 +1878,437 @@ class TestAddInternalNoteToATicket:
 
         # Act & Assert
         with pytest.raises(ValueError, match=expected_error):
-            add_internal_note_to_a_ticket(ticket_id, content, operator_id)
+            await add_internal_note_to_a_ticket(ticket_id, content, operator_id)
+
+
+class TestParseArgs:
+    @pytest.mark.unit
+    def test_parse_args_defaults_to_stdio(self, monkeypatch):
+        # Arrange
+        monkeypatch.delenv("TIDIO_MCP_TRANSPORT", raising=False)
+
+        # Act
+        result = _parse_args([])
+
+        # Assert
+        assert result.transport == "stdio"
+        assert (result.host, result.port) == ("127.0.0.1", 8000)
+
+    @pytest.mark.unit
+    def test_parse_args_from_environment(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv("TIDIO_MCP_TRANSPORT", "streamable-http")
+        monkeypatch.setenv("TIDIO_MCP_HOST", "0.0.0.0")
+        monkeypatch.setenv("TIDIO_MCP_PORT", "9000")
+
+        # Act
+        result = _parse_args([])
+
+        # Assert
+        assert result.transport == "streamable-http"
+        assert (result.host, result.port) == ("0.0.0.0", 9000)
+
+    @pytest.mark.unit
+    def test_parse_args_flags_override_environment(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv("TIDIO_MCP_TRANSPORT", "streamable-http")
+
+        # Act
+        result = _parse_args(["--transport", "sse", "--port", "8080"])
+
+        # Assert
+        assert result.transport == "sse"
+        assert result.port == 8080
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["--workers", "0"],
+            ["--workers", "2"],
+            ["--transport", "sse", "--workers", "2"],
+        ],
+    )
+    def test_parse_args_invalid_workers(self, argv, monkeypatch):
+        # Arrange
+        monkeypatch.delenv("TIDIO_MCP_TRANSPORT", raising=False)
+
+        # Act & Assert
+        with pytest.raises(SystemExit):
+            _parse_args(argv)
+
+    @pytest.mark.unit
+    def test_parse_args_workers(self):
+        # Act
+        result = _parse_args(["--transport", "streamable-http", "--workers", "4"])
+
+        # Assert
+        assert result.workers == 4
+
+    @pytest.mark.unit
+    def test_parse_args_invalid_transport(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv("TIDIO_MCP_TRANSPORT", "websocket")
+
+        # Act & Assert
+        with pytest.raises(SystemExit):
+            _parse_args([])
+
+
+class TestHttpApp:
+    @pytest.mark.unit
+    def test_http_app_is_stateless(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(mcp.settings, "stateless_http", False)
+        monkeypatch.setattr(mcp, "_session_manager", None)
+
+        # Act
+        app = http_app()
+
+        # Assert
+        assert app is not None
+        assert mcp.settings.stateless_http is True
+
+
+class TestServerMetrics:
+    @pytest.fixture(autouse=True)
+    def metrics(self, monkeypatch):
+        metrics = ServerMetrics()
+        monkeypatch.setattr("server.server_metrics", metrics)
+        monkeypatch.setattr(tidio_api_client, "metrics", metrics)
+        return metrics
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_tool_calls_are_recorded(self, metrics):
+        # Arrange
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+
+        # Act
+        await mcp.call_tool("get_departments", {})
+
+        # Assert
+        snapshot = metrics.snapshot()
+        assert snapshot["tools"]["get_departments"]["calls"] == 1
+        assert snapshot["tools"]["get_departments"]["errors"] == 0
+        assert snapshot["tools"]["get_departments"]["result_bytes"]["count"] == 1
+        assert snapshot["endpoints"]["GET /departments"]["requests"] == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_failed_tool_calls_are_recorded(self, metrics):
+        # Arrange
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(404)
+        )
+
+        # Act
+        with pytest.raises(ToolError):
+            await mcp.call_tool("get_departments", {})
+
+        # Assert
+        assert metrics.snapshot()["tools"]["get_departments"]["errors"] == 1
+        assert metrics.snapshot()["endpoints"]["GET /departments"]["statuses"] == {
+            "404": 1
+        }
+
+    @pytest.mark.unit
+    async def test_unknown_tools_are_not_recorded(self, metrics):
+        # Act
+        with pytest.raises(ToolError):
+            await mcp.call_tool("no_such_tool", {})
+
+        # Assert
+        assert metrics.snapshot()["tools"] == {}
+
+    @pytest.mark.unit
+    async def test_get_server_metrics(self, metrics):
+        # Arrange
+        with metrics.track_tool("get_tickets"):
+            pass
+
+        # Act
+        result = await get_server_metrics()
+
+        # Assert
+        assert result["status"] == "ok"
+        assert result["data"]["tools"]["get_tickets"]["calls"] == 1
+
+    @pytest.mark.unit
+    async def test_prometheus_endpoint(self, metrics, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(mcp, "_session_manager", None)
+        with metrics.track_tool("get_tickets"):
+            pass
+        transport = httpx.ASGITransport(app=mcp.streamable_http_app())
+
+        # Act
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'tidio_mcp_tool_errors_total{tool="get_tickets"} 0' in response.text
+
+
+class TestColdStart:
+    @pytest.mark.unit
+    def test_import_skips_optional_modules_and_client(self):
+        # Arrange
+        env = {
+            **os.environ,
+            "TIDIO_TRACING": "false",
+            "TIDIO_CACHE_BACKEND": "memory",
+        }
+        script = (
+            "import json, sys, server; "
+            "print(json.dumps({"
+            "'modules': sorted(sys.modules), "
+            "'client': 'tidio_api_client' in vars(server)}))"
+        )
+
+        # Act
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        # Assert
+        loaded = json.loads(output)
+        assert loaded["client"] is False
+        for module in ("redis", "opentelemetry", "h2"):
+            assert module not in loaded["modules"]
+
+    @pytest.mark.unit
+    def test_default_client_is_created_once(self):
+        # Act
+        client = server._default_tidio_api_client()
+
+        # Assert
+        assert client is server.tidio_api_client
+        assert server._default_tidio_api_client() is client
+
+
+class TestCreateResponseCache:
+    @pytest.mark.unit
+    def test_create_memory_cache_by_default(self, monkeypatch):
+        # Arrange
+        monkeypatch.delenv("TIDIO_CACHE_BACKEND", raising=False)
+        monkeypatch.setenv("TIDIO_CACHE_MAX_SIZE", "10")
+
+        # Act
+        result = _create_response_cache()
+
+        # Assert
+        assert isinstance(result, ResponseCache)
+        assert result.max_size == 10
+
+    @pytest.mark.unit
+    def test_create_sqlite_cache(self, monkeypatch, tmp_path):
+        # Arrange
+        monkeypatch.setenv("TIDIO_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("TIDIO_CACHE_SQLITE_PATH", str(tmp_path / "cache.db"))
+
+        # Act
+        result = _create_response_cache()
+
+        # Assert
+        assert isinstance(result, SQLiteResponseCache)
+        assert (tmp_path / "cache.db").exists()
+
+    @pytest.mark.unit
+    def test_create_unknown_cache(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv("TIDIO_CACHE_BACKEND", "memcached")
+
+        # Act & Assert
+        with pytest.raises(
+            ValueError, match="Cache backend must be one of: memory, sqlite, redis"
+        ):
+            _create_response_cache()
+
+    @pytest.mark.unit
+    async def test_create_sqlite_cache_with_namespace(self, monkeypatch, tmp_path):
+        # Arrange
+        monkeypatch.setenv("TIDIO_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("TIDIO_CACHE_SQLITE_PATH", str(tmp_path / "cache.db"))
+        shared = _create_response_cache()
+        tenant = _create_response_cache("tenant")
+
+        # Act
+        await tenant.set("/departments", {"departments": []}, ttl=10)
+
+        # Assert
+        assert await shared.get("/departments") is None
+        assert (await tenant.get("/departments")).value == {"departments": []}
+
+
+class TestRateLimits:
+    @pytest.mark.unit
+    def test_rate_limits_are_split_between_workers(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv("TIDIO_MCP_WORKERS", "4")
+        monkeypatch.setenv("TIDIO_READ_RATE_LIMIT", "10")
+        monkeypatch.setenv("TIDIO_READ_RATE_BURST", "20")
+        monkeypatch.setenv("TIDIO_WRITE_RATE_BURST", "2")
+
+        # Act
+        client = _create_tidio_api_client("client_id", "client_secret")
+
+        # Assert
+        assert client.read_rate_limiter.rate == 2.5
+        assert client.read_rate_limiter.burst == 5
+        assert client.write_rate_limiter.burst == 1
+
+
+class TestCreateContinuationStore:
+    @pytest.mark.unit
+    def test_create_memory_store_by_default(self, monkeypatch):
+        # Arrange
+        monkeypatch.delenv("TIDIO_CACHE_BACKEND", raising=False)
+        monkeypatch.setenv("TIDIO_CONTINUATION_MAX_SIZE", "10")
+
+        # Act
+        result = _create_continuation_store()
+
+        # Assert
+        assert isinstance(result, ResponseCache)
+        assert result.max_size == 10
+
+    @pytest.mark.unit
+    def test_create_sqlite_store_next_to_cache(self, monkeypatch, tmp_path):
+        # Arrange
+        monkeypatch.setenv("TIDIO_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("TIDIO_CACHE_SQLITE_PATH", str(tmp_path / "cache.db"))
+
+        # Act
+        result = _create_continuation_store("tenant")
+
+        # Assert
+        assert isinstance(result, SQLiteResponseCache)
+        assert (tmp_path / "cache-continuations.db").exists()
+
+
+class TestMultiTenant:
+    @pytest.fixture(autouse=True)
+    def tenant_pool(self, monkeypatch):
+        monkeypatch.setenv("TIDIO_MULTI_TENANT", "true")
+        monkeypatch.setattr(
+            server, "tidio_client_pool", TidioClientPool(_create_tidio_api_client)
+        )
+
+    def request_headers(self, monkeypatch, headers: dict | None):
+        request = None if headers is None else SimpleNamespace(headers=headers)
+        context = SimpleNamespace(request_context=SimpleNamespace(request=request))
+        monkeypatch.setattr(mcp, "get_context", lambda: context)
+
+    def mock_departments(self, client_id: str):
+        return respx.get(
+            "https://api.tidio.com/departments",
+            headers={"X-Tidio-Openapi-Client-Id": client_id},
+        ).mock(return_value=httpx.Response(200, json={"departments": []}))
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_request_headers_select_tenant_client(self, monkeypatch):
+        # Arrange
+        self.request_headers(
+            monkeypatch,
+            {"x-tidio-client-id": "tenant-a", "x-tidio-client-secret": "secret"},
+        )
+        route = self.mock_departments("tenant-a")
+
+        # Act
+        await get_departments()
+        await get_departments()
+
+        # Assert
+        assert route.call_count == 1
+        assert len(server.tidio_client_pool) == 1
+        assert await tidio_api_client.cache.size() == 0
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_tenants_do_not_share_cache(self, monkeypatch):
+        # Arrange
+        route_a = self.mock_departments("tenant-a")
+        route_b = self.mock_departments("tenant-b")
+
+        # Act
+        for client_id in ["tenant-a", "tenant-b"]:
+            self.request_headers(
+                monkeypatch,
+                {"x-tidio-client-id": client_id, "x-tidio-client-secret": "secret"},
+            )
+            await get_departments()
+
+        # Assert
+        assert route_a.call_count == 1
+        assert route_b.call_count == 1
+        assert len(server.tidio_client_pool) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_default_client_outside_http_request(self, monkeypatch):
+        # Arrange
+        self.request_headers(monkeypatch, None)
+        route = respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+
+        # Act
+        await get_departments()
+
+        # Assert
+        assert route.call_count == 1
+        assert len(server.tidio_client_pool) == 0
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "headers",
+        [{}, {"x-tidio-client-id": "tenant-a"}, {"x-tidio-client-secret": "secret"}],
+    )
+    @respx.mock
+    async def test_http_request_without_tenant_headers_is_rejected(
+        self, monkeypatch, headers
+    ):
+        # Arrange
+        self.request_headers(monkeypatch, headers)
+        route = respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="Multi-tenant mode requires"):
+            await get_departments()
+
+        assert route.call_count == 0
+        assert len(server.tidio_client_pool) == 0
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_headers_are_ignored_when_disabled(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv("TIDIO_MULTI_TENANT", "false")
+        self.request_headers(
+            monkeypatch,
+            {"x-tidio-client-id": "tenant-a", "x-tidio-client-secret": "secret"},
+        )
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+
+        # Act
+        await get_departments()
+
+        # Assert
+        assert len(server.tidio_client_pool) == 0
@@ -0,0 +1,45 @@
+import pytest
+
+from benchmarks.soak import TOOL_MIX, rss_growth_per_hour
+from benchmarks.suite import SCENARIOS
+
+
+class TestSoak:
+    @pytest.mark.unit
+    def test_rss_growth_skips_the_warm_up_sample(self):
+        # Arrange
+        samples = [
+            {"elapsed": 60, "rss_mb": 50.0},
+            {"elapsed": 120, "rss_mb": 100.0},
+            {"elapsed": 180, "rss_mb": 101.0},
+            {"elapsed": 240, "rss_mb": 102.0},
+        ]
+
+        # Act
+        growth = rss_growth_per_hour(samples)
+
+        # Assert
+        assert growth == 60.0
+
+    @pytest.mark.unit
+    def test_rss_growth_needs_two_samples(self):
+        # Arrange
+        samples = [
+            {"elapsed": 60, "rss_mb": 50.0},
+            {"elapsed": 120, "rss_mb": 100.0},
+            {"elapsed": 180, "rss_mb": None},
+        ]
+
+        # Act
+        growth = rss_growth_per_hour(samples)
+
+        # Assert
+        assert growth is None
+
+    @pytest.mark.unit
+    def test_replayed_tools_need_no_scenario_context(self):
+        # Act
+        arguments = [SCENARIOS[tool].arguments(7, {}) for tool in TOOL_MIX]
+
+        # Assert
+        assert len(arguments) == len(TOOL_MIX)
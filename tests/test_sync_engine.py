@@ -0,0 +1,350 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import respx
+
+from rate_limiter import TokenBucket
+from search_index import SearchIndex
+from sync_engine import SyncEngine
+from tidio_client import RetryPolicy, TidioApiClient, TidioApiError
+
+
+def page(key: str, items: list[dict], cursor: str = None) -> httpx.Response:
+    return httpx.Response(200, json={key: items, "meta": {"cursor": cursor}})
+
+
+def ticket(ticket_id: int, updated_at: str) -> dict:
+    return {"id": ticket_id, "subject": f"Ticket {ticket_id}", "updated_at": updated_at}
+
+
+class TestSyncEngine:
+    def setup_method(self):
+        self.client = TidioApiClient(
+            "test_client_id",
+            "test_client_secret",
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+        self.index = SearchIndex()
+        self.sut = SyncEngine(self.client, self.index, interval=60, concurrency=2)
+
+    def mock_details(self, ticket_id: int, content: str) -> respx.Route:
+        return respx.get(f"https://api.tidio.com/tickets/{ticket_id}").mock(
+            return_value=httpx.Response(
+                200,
+                json={
+                    "id": ticket_id,
+                    "messages": [{"message_content": content}],
+                },
+            )
+        )
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_sync_fetches_details_of_changed_tickets_only(self):
+        # Arrange
+        tickets = respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1"), ticket(2, "t1")])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [{"id": "c1", "email": "a@example.com"}])
+        )
+        details_1 = self.mock_details(1, "refund")
+        details_2 = self.mock_details(2, "login")
+        await self.sut.sync()
+        tickets.mock(return_value=page("tickets", [ticket(1, "t1"), ticket(2, "t2")]))
+        details_2.mock(
+            return_value=httpx.Response(
+                200, json={"id": 2, "messages": [{"message_content": "password"}]}
+            )
+        )
+
+        # Act
+        await self.sut.sync()
+
+        # Assert
+        assert details_1.call_count == 1
+        assert details_2.call_count == 2
+        assert [t["id"] for t in self.index.search_tickets(query="refund")] == [1]
+        assert [t["id"] for t in self.index.search_tickets(query="password")] == [2]
+        assert self.index.search_tickets(query="login") == []
+        assert self.index.contact_ids() == {"c1"}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_interrupted_sync_resumes_from_checkpoint(self):
+        # Arrange
+        second_page = respx.get(
+            "https://api.tidio.com/tickets", params={"cursor": "next"}
+        ).mock(return_value=httpx.Response(503))
+        first_page = respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1")], cursor="next")
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+        self.mock_details(1, "refund")
+        self.mock_details(2, "login")
+
+        with pytest.raises(TidioApiError):
+            await self.sut.sync()
+
+        second_page.mock(return_value=page("tickets", [ticket(2, "t1")]))
+
+        # Act
+        await self.sut.sync()
+
+        # Assert
+        assert first_page.call_count == 1
+        assert self.index.ticket_ids() == {1, 2}
+        assert self.index.synced_at is not None
+        assert self.index.get_state("tickets_cursor") == ""
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_interrupted_contacts_sync_resumes_from_checkpoint(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [])
+        )
+        second_page = respx.get(
+            "https://api.tidio.com/contacts", params={"cursor": "next"}
+        ).mock(return_value=httpx.Response(503))
+        first_page = respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [{"id": "c1"}], cursor="next")
+        )
+
+        with pytest.raises(TidioApiError):
+            await self.sut.sync()
+
+        second_page.mock(return_value=page("contacts", [{"id": "c2"}]))
+
+        # Act
+        await self.sut.sync()
+
+        # Assert
+        assert first_page.call_count == 1
+        assert self.index.contact_ids() == {"c1", "c2"}
+        assert self.index.get_state("contacts_cursor") == ""
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_sync_removes_deleted_entities(self):
+        # Arrange
+        tickets = respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1"), ticket(2, "t1")])
+        )
+        contacts = respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [{"id": "c1"}, {"id": "c2"}])
+        )
+        self.mock_details(1, "refund")
+        self.mock_details(2, "login")
+        await self.sut.sync()
+        tickets.mock(return_value=page("tickets", [ticket(2, "t1")]))
+        contacts.mock(return_value=page("contacts", [{"id": "c1"}]))
+
+        # Act
+        await self.sut.sync()
+
+        # Assert
+        assert self.index.ticket_ids() == {2}
+        assert self.index.contact_ids() == {"c1"}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_failed_details_are_retried_in_next_pass(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1")])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+        details = respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(503)
+        )
+        await self.sut.sync()
+        self.mock_details(1, "refund")
+
+        # Act
+        await self.sut.sync()
+
+        # Assert
+        assert details.call_count == 2
+        assert [t["id"] for t in self.index.search_tickets(query="refund")] == [1]
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_sync_requests_acquire_sync_rate_limiter(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1"), ticket(2, "t1")])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+        self.mock_details(1, "refund")
+        self.mock_details(2, "login")
+        rate_limiter = TokenBucket(rate=1000, burst=10)
+        rate_limiter.acquire = AsyncMock(wraps=rate_limiter.acquire)
+        sut = SyncEngine(self.client, self.index, rate_limiter=rate_limiter)
+
+        # Act
+        await sut.sync()
+
+        # Assert
+        assert rate_limiter.acquire.await_count == 4
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_sync_does_not_mark_a_write(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1")])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+        self.mock_details(1, "refund")
+        self.client.cache_ttls = {"/tickets/{ticket_id}": 60}
+        await self.client.cache.set("/tickets/1", {"id": 1, "messages": []}, ttl=60)
+
+        # Act
+        await self.sut.sync()
+
+        # Assert
+        assert self.client._write_generation == 0
+        assert (await self.client.cache.get("/tickets/1")).value["messages"] == [
+            {"message_content": "refund"}
+        ]
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_ensure_fresh_skips_recent_sync(self):
+        # Arrange
+        tickets = respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+
+        # Act
+        await self.sut.ensure_fresh(max_staleness=60)
+        await self.sut.ensure_fresh(max_staleness=60)
+
+        # Assert
+        assert tickets.call_count == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_ensure_fresh_returns_partial_index_after_timeout(self):
+        # Arrange
+        contacts_listed = asyncio.Event()
+
+        async def slow_contacts(request):
+            await contacts_listed.wait()
+            return page("contacts", [])
+
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [ticket(1, "t1")])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(side_effect=slow_contacts)
+        self.mock_details(1, "refund")
+
+        # Act
+        fresh = await self.sut.ensure_fresh(max_staleness=60, timeout=0.05)
+        partial = self.index.search_tickets(query="refund")
+        contacts_listed.set()
+        fresh_after_sync = await self.sut.ensure_fresh(max_staleness=60, timeout=1)
+
+        # Assert
+        assert fresh is False
+        assert [t["id"] for t in partial] == [1]
+        assert fresh_after_sync is True
+        assert self.index.synced_at is not None
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_background_sync_stops_when_client_is_closed(self):
+        # Arrange
+        tickets = respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+        sut = SyncEngine(self.client, self.index, interval=0.01)
+
+        # Act
+        sut.start()
+        sut.start()
+        await asyncio.sleep(0.05)
+        await self.client.aclose()
+        await asyncio.sleep(0.05)
+
+        # Assert
+        assert tickets.call_count >= 2
+        assert sut._task.done()
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_background_sync_stops_when_client_is_closed_mid_pass(self):
+        # Arrange
+        async def close_client(request):
+            await self.client.aclose()
+            return page("tickets", [ticket(1, "2025-01-01T00:00:00+00:00")])
+
+        respx.get("https://api.tidio.com/tickets").mock(side_effect=close_client)
+        sut = SyncEngine(self.client, self.index, interval=0.01)
+
+        # Act
+        sut.start()
+        await asyncio.sleep(0.05)
+
+        # Assert
+        assert sut._task.done()
+        assert sut._task.exception() is None
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_only_lock_holder_syncs_in_background(self, tmp_path):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=page("tickets", [])
+        )
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=page("contacts", [])
+        )
+        lock_path = str(tmp_path / "search.sqlite3.lock")
+        leader = SyncEngine(self.client, SearchIndex(), 0.01, lock_path=lock_path)
+        follower = SyncEngine(self.client, self.index, 0.01, lock_path=lock_path)
+
+        # Act
+        leader.start()
+        await asyncio.sleep(0.02)
+        follower.start()
+        await asyncio.sleep(0.05)
+        synced_at_before_takeover = self.index.synced_at
+        await leader.stop()
+        await asyncio.sleep(0.05)
+        await follower.stop()
+
+        # Assert
+        assert leader.index.synced_at is not None
+        assert synced_at_before_takeover is None
+        assert self.index.synced_at is not None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "arguments,expected_error",
+        [
+            ({"interval": 0}, "Sync interval must be greater than 0"),
+            ({"concurrency": 0}, "Sync concurrency must be greater than 0"),
+        ],
+    )
+    def test_invalid_arguments(self, arguments, expected_error):
+        # Act & Assert
+        with pytest.raises(ValueError, match=expected_error):
+            SyncEngine(self.client, self.index, **arguments)
@@ -1,10 +1,15 @@
+import asyncio
 import json
+from unittest.mock import AsyncMock, Mock
 
+import httpx
 import pytest
-import requests
-import responses
+import respx
 
-from tidio_client import TidioApiClient, TidioApiError
+from json_codec import JsonCodec
+from rate_limiter import TokenBucket
+from response_cache import ResponseCache
+from tidio_client import RetryPolicy, TidioApiClient, TidioApiError
 
 
 class TestTidioApiClient:
@@ -13,88 +18,79 @@ class TestTidioApiClient:
     ACCEPT_HEADER = "application/json; version=1"
 
     def setup_method(self):
-        self.sut = TidioApiClient(self.TEST_CLIENT_ID, self.TEST_CLIENT_SECRET)
+        self.sut = TidioApiClient(
+            self.TEST_CLIENT_ID,
+            self.TEST_CLIENT_SECRET,
+            retry_policy=RetryPolicy(base_backoff=0),
+        )
 
     @pytest.mark.unit
-    @responses.activate
+    @respx.mock
     @pytest.mark.parametrize(
         "status_code", [400, 401, 403, 404, 405, 409, 422, 500, 501, 502, 503, 504]
     )
-    def test_request_http_error(self, status_code):
+    async def test_request_http_error(self, status_code):
         # Arrange
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/test",
-            json={"error": "HTTP Error"},
-            status=status_code,
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(status_code, json={"error": "HTTP Error"})
         )
 
         # Act & Assert
         with pytest.raises(TidioApiError, match="Tidio API request failed"):
-            self.sut.get("/test")
+            await self.sut.get("/test")
 
     @pytest.mark.unit
-    @responses.activate
-    def test_request_connection_error(self):
+    @respx.mock
+    async def test_request_connection_error(self):
         # Arrange
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/test",
-            body=responses.ConnectionError("Connection error"),
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=httpx.ConnectError("Connection error")
         )
 
         # Act & Assert
         with pytest.raises(TidioApiError, match="Tidio API request failed"):
-            self.sut.get("/test")
+            await self.sut.get("/test")
 
     @pytest.mark.unit
-    @responses.activate
-    def test_request_timeout(self):
+    @respx.mock
+    async def test_request_timeout(self):
         # Arrange
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/test",
-            body=requests.exceptions.Timeout("Request timed out"),
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=httpx.ReadTimeout("Request timed out")
         )
 
         # Act & Assert
         with pytest.raises(TidioApiError, match="Tidio API request timed out."):
-            self.sut.get("/test")
+            await self.sut.get("/test")
 
     @pytest.mark.unit
-    @responses.activate
+    @respx.mock
     @pytest.mark.parametrize("body_content", [None, "", "{}"])
-    def test_request_empty_response(self, body_content):
+    async def test_request_empty_response(self, body_content):
         # Arrange
-        responses.add(
-            responses.PUT,
-            "https://api.tidio.com/test",
-            body=body_content,
-            status=202,
+        respx.put("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(202, content=body_content)
         )
 
         # Act
-        result = self.sut.put("/test")
+        result = await self.sut.put("/test")
 
         # Assert
         assert result == {}
 
     @pytest.mark.unit
-    @responses.activate
-    def test_request_verifies_headers(self):
+    @respx.mock
+    async def test_request_verifies_headers(self):
         # Arrange
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/test",
-            json={},
-            status=200,
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(200, json={})
         )
 
         # Act
-        self.sut.get("/test")
+        await self.sut.get("/test")
 
         # Assert
-        request = responses.calls[0].request
+        request = respx.calls[0].request
         assert request.headers["X-Tidio-Openapi-Client-Id"] == self.TEST_CLIENT_ID
         assert (
             request.headers["X-Tidio-Openapi-Client-Secret"] == self.TEST_CLIENT_SECRET
@@ -102,106 +98,762 @@ class TestTidioApiClient:
         assert request.headers["Accept"] == self.ACCEPT_HEADER
 
     @pytest.mark.unit
-    @responses.activate
-    def test_get_method(self):
+    @respx.mock
+    async def test_get_method(self):
         # Arrange
         response_data = {"data": [{"id": "1530ab70-5cad-40ed-bfcc-0c19be5e7977"}]}
 
-        responses.add(
-            responses.GET,
-            "https://api.tidio.com/test",
-            json=response_data,
-            status=200,
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(200, json=response_data)
         )
 
         # Act
-        result = self.sut.get("/test")
+        result = await self.sut.get("/test")
 
         # Assert
         assert result == response_data
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
     @pytest.mark.unit
-    @responses.activate
-    def test_post_method(self):
+    @respx.mock
+    async def test_post_method(self):
         # Arrange
         request_data = {"name": "John Doe"}
         response_data = {"id": "c3582dae-2f86-4e3c-9003-ef80d522578c"}
 
-        responses.add(
-            responses.POST,
-            "https://api.tidio.com/test",
-            json=response_data,
-            status=201,
+        respx.post("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(201, json=response_data)
         )
 
         # Act
-        result = self.sut.post("/test", json_data=request_data)
+        result = await self.sut.post("/test", json_data=request_data)
 
         # Assert
         assert result == response_data
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == request_data
+        request = respx.calls[0].request
+        assert json.loads(request.content) == request_data
 
     @pytest.mark.unit
-    @responses.activate
-    def test_patch_method(self):
+    @respx.mock
+    async def test_patch_method(self):
         # Arrange
         request_data = {"priority": "urgent"}
 
-        responses.add(
-            responses.PATCH,
-            "https://api.tidio.com/test",
-            status=204,
-        )
+        respx.patch("https://api.tidio.com/test").mock(return_value=httpx.Response(204))
 
         # Act
-        result = self.sut.patch("/test", json_data=request_data)
+        result = await self.sut.patch("/test", json_data=request_data)
 
         # Assert
         assert result == {}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == request_data
+        request = respx.calls[0].request
+        assert json.loads(request.content) == request_data
 
     @pytest.mark.unit
-    @responses.activate
-    def test_delete_method(self):
+    @respx.mock
+    async def test_delete_method(self):
         # Arrange
-        responses.add(
-            responses.DELETE,
-            "https://api.tidio.com/test",
-            status=204,
+        respx.delete("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(204)
         )
 
         # Act
-        result = self.sut.delete("/test")
+        result = await self.sut.delete("/test")
 
         # Assert
         assert result == {}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
 
     @pytest.mark.unit
-    @responses.activate
-    def test_put_method(self):
+    @respx.mock
+    async def test_put_method(self):
         # Arrange
         request_data = {"name": "John Doe"}
 
-        responses.add(
-            responses.PUT,
-            "https://api.tidio.com/test",
-            status=204,
-        )
+        respx.put("https://api.tidio.com/test").mock(return_value=httpx.Response(204))
 
         # Act
-        result = self.sut.put("/test", json_data=request_data)
+        result = await self.sut.put("/test", json_data=request_data)
 
         # Assert
         assert result == {}
-        assert len(responses.calls) == 1
+        assert len(respx.calls) == 1
+
+        request = respx.calls[0].request
+        assert json.loads(request.content) == request_data
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_request_uses_codec(self):
+        # Arrange
+        codec = JsonCodec()
+        codec.dumps = Mock(wraps=codec.dumps)
+        codec.loads = Mock(wraps=codec.loads)
+        sut = TidioApiClient(self.TEST_CLIENT_ID, self.TEST_CLIENT_SECRET, codec=codec)
+        respx.post("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(200, json={"id": 1})
+        )
+
+        # Act
+        result = await sut.post("/test", json_data={"name": "Zoë"})
+
+        # Assert
+        assert result == {"id": 1}
+        codec.dumps.assert_called_once_with({"name": "Zoë"})
+        codec.loads.assert_called_once()
+        request = respx.calls[0].request
+        assert request.headers["Content-Type"] == "application/json"
+        assert json.loads(request.content) == {"name": "Zoë"}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_paginate_follows_cursor(self):
+        # Arrange
+        respx.get("https://api.tidio.com/test?email=john%40example.com").mock(
+            return_value=httpx.Response(
+                200, json={"items": [{"id": 1}], "meta": {"cursor": "abc"}}
+            )
+        )
+        respx.get(
+            "https://api.tidio.com/test?email=john%40example.com&cursor=abc"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"items": [{"id": 2}], "meta": {"cursor": None}}
+            )
+        )
+
+        # Act
+        pages = [
+            page
+            async for page in self.sut.paginate(
+                "/test", query_params={"email": "john@example.com"}
+            )
+        ]
+
+        # Assert
+        assert [page["items"] for page in pages] == [[{"id": 1}], [{"id": 2}]]
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_paginate_stops_without_meta(self):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(200, json={"items": []})
+        )
+
+        # Act
+        pages = [page async for page in self.sut.paginate("/test")]
+
+        # Assert
+        assert pages == [{"items": []}]
+        assert len(respx.calls) == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_stream_items_follows_cursor(self):
+        # Arrange
+        respx.get(
+            "https://api.tidio.com/test?email=john%40example.com&cursor=abc"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"items": [{"id": 3}], "meta": {"cursor": None}}
+            )
+        )
+        respx.get("https://api.tidio.com/test?email=john%40example.com").mock(
+            return_value=httpx.Response(
+                200, json={"items": [{"id": 1}, {"id": 2}], "meta": {"cursor": "abc"}}
+            )
+        )
+        pages = []
+
+        # Act
+        items = [
+            item
+            async for item in self.sut.stream_items(
+                "/test",
+                "items",
+                query_params={"email": "john@example.com"},
+                on_page=pages.append,
+            )
+        ]
+
+        # Assert
+        assert items == [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert pages == [{"meta": {"cursor": "abc"}}, {"meta": {"cursor": None}}]
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_stream_items_retries_failed_page(self):
+        # Arrange
+        route = respx.get("https://api.tidio.com/test")
+        route.side_effect = [
+            httpx.Response(503, json={"error": "Unavailable"}),
+            httpx.Response(200, json={"items": [{"id": 1}]}),
+        ]
+
+        # Act
+        items = [item async for item in self.sut.stream_items("/test", "items")]
+
+        # Assert
+        assert items == [{"id": 1}]
+        assert route.call_count == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_stream_items_http_error(self):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(404, json={"error": "Not found"})
+        )
+
+        # Act & Assert
+        with pytest.raises(TidioApiError, match="Not found"):
+            [item async for item in self.sut.stream_items("/test", "items")]
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_stream_items_invalid_json(self):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(200, content=b'{"items": [{"id": 1}, {"id"')
+        )
+        items = []
+
+        # Act & Assert
+        with pytest.raises(TidioApiError, match="invalid JSON"):
+            async for item in self.sut.stream_items("/test", "items"):
+                items.append(item)
+        assert items == [{"id": 1}]
+
+
+class TestTidioApiClientSingleFlight:
+    def setup_method(self):
+        self.sut = TidioApiClient(
+            "test_client_id",
+            "test_client_secret",
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+    @staticmethod
+    def slow_response(response: httpx.Response):
+        async def respond(request):
+            await asyncio.sleep(0.01)
+            return response
+
+        return respond
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_concurrent_identical_gets_share_one_request(self):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=self.slow_response(
+                httpx.Response(200, json={"items": [{"id": 1}]})
+            )
+        )
+
+        # Act
+        results = await asyncio.gather(*(self.sut.get("/test") for _ in range(5)))
+
+        # Assert
+        assert len(respx.calls) == 1
+        assert all(result == {"items": [{"id": 1}]} for result in results)
+        results[0]["items"].clear()
+        assert all(result == {"items": [{"id": 1}]} for result in results[1:])
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_concurrent_identical_gets_share_error(self):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=self.slow_response(httpx.Response(500))
+        )
+
+        # Act
+        results = await asyncio.gather(
+            *(self.sut.get("/test") for _ in range(3)), return_exceptions=True
+        )
+
+        # Assert
+        assert len(respx.calls) == 1
+        assert all(isinstance(result, TidioApiError) for result in results)
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_different_gets_are_not_shared(self):
+        # Arrange
+        respx.get("https://api.tidio.com/first").mock(
+            side_effect=self.slow_response(httpx.Response(200, json={}))
+        )
+        respx.get("https://api.tidio.com/second").mock(
+            side_effect=self.slow_response(httpx.Response(200, json={}))
+        )
+
+        # Act
+        await asyncio.gather(self.sut.get("/first"), self.sut.get("/second"))
+
+        # Assert
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_after_write_does_not_join_earlier_flight(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            side_effect=self.slow_response(httpx.Response(200, json={}))
+        )
+        respx.delete("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(204)
+        )
+
+        async def write_then_read():
+            await self.sut.delete("/tickets/1")
+            return await self.sut.get("/tickets/1")
+
+        # Act
+        await asyncio.gather(self.sut.get("/tickets/1"), write_then_read())
+
+        # Assert
+        assert len(respx.calls) == 3
+
+
+class TestTidioApiClientRetry:
+    def setup_method(self):
+        self.sut = TidioApiClient(
+            "test_client_id",
+            "test_client_secret",
+            retry_policy=RetryPolicy(max_attempts=3, base_backoff=0, deadline=10),
+        )
+
+    @pytest.fixture
+    def sleep(self, monkeypatch):
+        sleep = AsyncMock()
+        monkeypatch.setattr("tidio_client.asyncio.sleep", sleep)
+        return sleep
+
+    @pytest.mark.unit
+    @respx.mock
+    @pytest.mark.parametrize("status_code", [429, 500, 502, 503, 504])
+    async def test_get_retried_on_transient_status(self, status_code, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=[
+                httpx.Response(status_code),
+                httpx.Response(200, json={"id": 1}),
+            ]
+        )
 
-        request = responses.calls[0].request
-        assert json.loads(request.body) == request_data
+        # Act
+        result = await self.sut.get("/test")
+
+        # Assert
+        assert result == {"id": 1}
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_retries_and_status_are_recorded(self, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            side_effect=[
+                httpx.Response(503),
+                httpx.Response(200, json={"id": 1}),
+            ]
+        )
+
+        # Act
+        await self.sut.get("/tickets/1")
+
+        # Assert
+        stats = self.sut.metrics.snapshot()["endpoints"]["GET /tickets/{id}"]
+        assert stats["requests"] == 1
+        assert stats["retries"] == 1
+        assert stats["statuses"] == {"200": 1}
+        assert stats["response_bytes"]["count"] == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_retried_on_timeout(self, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=[
+                httpx.ReadTimeout("Request timed out"),
+                httpx.Response(200, json={"id": 1}),
+            ]
+        )
+
+        # Act
+        result = await self.sut.get("/test")
+
+        # Assert
+        assert result == {"id": 1}
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_request_gives_up_after_max_attempts(self, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(return_value=httpx.Response(503))
+
+        # Act & Assert
+        with pytest.raises(TidioApiError, match="Tidio API request failed"):
+            await self.sut.get("/test")
+
+        assert len(respx.calls) == 3
+        assert sleep.await_count == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_request_not_retried_on_client_error(self, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(return_value=httpx.Response(404))
+
+        # Act & Assert
+        with pytest.raises(TidioApiError, match="Tidio API request failed"):
+            await self.sut.get("/test")
+
+        assert len(respx.calls) == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    @pytest.mark.parametrize("method", ["post", "patch"])
+    async def test_non_idempotent_request_not_retried(self, method, sleep):
+        # Arrange
+        respx.route(method=method.upper(), url="https://api.tidio.com/test").mock(
+            return_value=httpx.Response(503)
+        )
+
+        # Act & Assert
+        with pytest.raises(TidioApiError, match="Tidio API request failed"):
+            await getattr(self.sut, method)("/test", json_data={})
+
+        assert len(respx.calls) == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"Retry-After": "2"},
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2"},
+        ],
+    )
+    async def test_request_waits_as_requested_by_api(self, headers, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=[
+                httpx.Response(429, headers=headers),
+                httpx.Response(200, json={}),
+            ]
+        )
+
+        # Act
+        await self.sut.get("/test")
+
+        # Assert
+        sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_request_gives_up_when_wait_exceeds_deadline(self, sleep):
+        # Arrange
+        respx.get("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(429, headers={"Retry-After": "60"})
+        )
+
+        # Act & Assert
+        with pytest.raises(TidioApiError, match="Tidio API request failed"):
+            await self.sut.get("/test")
+
+        assert len(respx.calls) == 1
+        sleep.assert_not_awaited()
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_every_attempt_takes_a_rate_limit_token(self, sleep):
+        # Arrange
+        read_rate_limiter = AsyncMock(spec=TokenBucket)
+        write_rate_limiter = AsyncMock(spec=TokenBucket)
+        self.sut.read_rate_limiter = read_rate_limiter
+        self.sut.write_rate_limiter = write_rate_limiter
+        respx.get("https://api.tidio.com/test").mock(
+            side_effect=[httpx.Response(503), httpx.Response(200, json={})]
+        )
+        respx.delete("https://api.tidio.com/test").mock(
+            return_value=httpx.Response(204)
+        )
+
+        # Act
+        await self.sut.get("/test")
+        await self.sut.delete("/test")
+
+        # Assert
+        assert read_rate_limiter.acquire.await_count == 2
+        assert write_rate_limiter.acquire.await_count == 1
+
+
+class TestRetryPolicy:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("attempt, cap", [(1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)])
+    def test_delay_uses_capped_exponential_backoff(self, attempt, cap):
+        # Arrange
+        sut = RetryPolicy(base_backoff=1.0, max_backoff=5.0)
+
+        # Act
+        delays = [sut.delay(attempt) for _ in range(50)]
+
+        # Assert
+        assert all(0 <= delay <= cap for delay in delays)
+
+    @pytest.mark.unit
+    def test_delay_parses_http_date_retry_after(self):
+        # Arrange
+        sut = RetryPolicy()
+        response = httpx.Response(
+            429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+
+        # Act
+        result = sut.delay(1, response)
+
+        # Assert
+        assert result == 0.0
+
+
+class TestTidioApiClientCache:
+    def setup_method(self):
+        self.now = 0.0
+        self.sut = TidioApiClient(
+            "test_client_id",
+            "test_client_secret",
+            cache_ttls={
+                "/departments": 10,
+                "/tickets": 10,
+                "/tickets/{ticket_id}": 10,
+            },
+            cache_stale_ttls={"/departments": 60},
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+        self.sut.cache = ResponseCache(clock=lambda: self.now)
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_cached_endpoint_hits_api_once(self):
+        # Arrange
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+
+        # Act
+        first = await self.sut.get("/departments")
+        second = await self.sut.get("/departments")
+
+        # Assert
+        assert first == second == {"departments": []}
+        assert len(respx.calls) == 1
+        assert (await self.sut.cache.stats())["hits"] == 1
+        stats = self.sut.metrics.snapshot()["endpoints"]["GET /departments"]
+        assert stats["cache_lookups"] == {"miss": 1, "hit": 1}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_matches_path_templates(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1})
+        )
+
+        # Act
+        await self.sut.get("/tickets/1")
+        await self.sut.get("/tickets/1")
+
+        # Assert
+        assert len(respx.calls) == 1
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_uncached_endpoint_always_hits_api(self):
+        # Arrange
+        respx.get("https://api.tidio.com/contacts").mock(
+            return_value=httpx.Response(200, json={"contacts": []})
+        )
+
+        # Act
+        await self.sut.get("/contacts")
+        await self.sut.get("/contacts")
+
+        # Assert
+        assert len(respx.calls) == 2
+        assert (await self.sut.cache.stats())["size"] == 0
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_stale_entry_refreshes_in_background(self):
+        # Arrange
+        respx.get("https://api.tidio.com/departments").mock(
+            side_effect=[
+                httpx.Response(200, json={"departments": ["old"]}),
+                httpx.Response(200, json={"departments": ["new"]}),
+            ]
+        )
+        await self.sut.get("/departments")
+        self.now = 20
+
+        # Act
+        stale = await self.sut.get("/departments")
+        await asyncio.gather(*self.sut._refresh_tasks.values())
+        fresh = await self.sut.get("/departments")
+
+        # Assert
+        assert stale == {"departments": ["old"]}
+        assert fresh == {"departments": ["new"]}
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_stale_entry_kept_when_refresh_fails(self):
+        # Arrange
+        respx.get("https://api.tidio.com/departments").mock(
+            side_effect=[
+                httpx.Response(200, json={"departments": ["old"]}),
+                httpx.Response(503),
+            ]
+        )
+        await self.sut.get("/departments")
+        self.now = 20
+
+        # Act
+        await self.sut.get("/departments")
+        await asyncio.gather(*self.sut._refresh_tasks.values())
+        result = await self.sut.get("/departments")
+
+        # Assert
+        assert result == {"departments": ["old"]}
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_write_evicts_resource_and_parent_collection(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1})
+        )
+        respx.get("https://api.tidio.com/tickets/2").mock(
+            return_value=httpx.Response(200, json={"id": 2})
+        )
+        respx.get("https://api.tidio.com/tickets").mock(
+            return_value=httpx.Response(200, json={"tickets": []})
+        )
+        respx.get("https://api.tidio.com/departments").mock(
+            return_value=httpx.Response(200, json={"departments": []})
+        )
+        respx.post("https://api.tidio.com/tickets/1/reply").mock(
+            return_value=httpx.Response(201, json={"message_id": "m1"})
+        )
+        for endpoint in ["/tickets/1", "/tickets/2", "/tickets", "/departments"]:
+            await self.sut.get(endpoint)
+
+        # Act
+        await self.sut.post("/tickets/1/reply", json_data={"content": "Hi"})
+
+        # Assert
+        assert sorted(await self.sut.cache.keys()) == ["/departments", "/tickets/2"]
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_failed_write_still_evicts_resource(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1})
+        )
+        respx.delete("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(500)
+        )
+        await self.sut.get("/tickets/1")
+
+        # Act
+        with pytest.raises(TidioApiError):
+            await self.sut.delete("/tickets/1")
+
+        # Assert
+        assert await self.sut.cache.keys() == []
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_patch_with_cached_changes_updates_cached_resource(self):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1, "status": "open"})
+        )
+        respx.patch("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(204)
+        )
+        await self.sut.get("/tickets/1")
+
+        # Act
+        await self.sut.patch(
+            "/tickets/1",
+            json_data={"status": "solved"},
+            cached_changes={"status": "solved"},
+        )
+        result = await self.sut.get("/tickets/1")
+
+        # Assert
+        assert result == {"id": 1, "status": "solved"}
+        assert len(respx.calls) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "side_effect",
+        [httpx.Response(422), httpx.TimeoutException("timed out")],
+    )
+    @respx.mock
+    async def test_failed_patch_evicts_instead_of_merging_cached_changes(
+        self, side_effect
+    ):
+        # Arrange
+        get_route = respx.get("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(200, json={"id": 1, "status": "open"})
+        )
+        respx.patch("https://api.tidio.com/tickets/1").mock(side_effect=[side_effect])
+        await self.sut.get("/tickets/1")
+        get_route.mock(
+            return_value=httpx.Response(200, json={"id": 1, "status": "pending"})
+        )
+
+        # Act
+        with pytest.raises(TidioApiError):
+            await self.sut.patch(
+                "/tickets/1",
+                json_data={"status": "solved"},
+                cached_changes={"status": "solved"},
+            )
+        result = await self.sut.get("/tickets/1")
+
+        # Assert
+        assert result == {"id": 1, "status": "pending"}
+        assert get_route.call_count == 2
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_get_skips_caching_when_write_happens_during_fetch(self):
+        # Arrange
+        async def slow_response(request):
+            await self.sut.delete("/tickets/1")
+            return httpx.Response(200, json={"id": 1})
+
+        respx.get("https://api.tidio.com/tickets/1").mock(side_effect=slow_response)
+        respx.delete("https://api.tidio.com/tickets/1").mock(
+            return_value=httpx.Response(204)
+        )
+
+        # Act
+        await self.sut.get("/tickets/1")
+
+        # Assert
+        assert await self.sut.cache.keys() == []
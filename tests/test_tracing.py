@@ -0,0 +1,107 @@
+import httpx
+import pytest
+import respx
+
+import tracing
+from tidio_client import RetryPolicy, TidioApiClient, TidioApiError
+
+sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+in_memory = pytest.importorskip(
+    "opentelemetry.sdk.trace.export.in_memory_span_exporter"
+)
+export = pytest.importorskip("opentelemetry.sdk.trace.export")
+
+
+class TestTracing:
+    @pytest.fixture(autouse=True)
+    def exporter(self):
+        exporter = in_memory.InMemorySpanExporter()
+        provider = sdk_trace.TracerProvider()
+        provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+        tracing.configure_tracing(tracer_provider=provider)
+        yield exporter
+        tracing.disable_tracing()
+
+    def setup_method(self):
+        self.client = TidioApiClient(
+            "test_client_id",
+            "test_client_secret",
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_request_span_is_child_of_tool_span(self, exporter):
+        # Arrange
+        route = respx.get("https://api.tidio.com/tickets/42").mock(
+            return_value=httpx.Response(200, json={"id": 42})
+        )
+
+        # Act
+        with tracing.tool_span("get_ticket_details"):
+            await self.client.get("/tickets/42")
+
+        # Assert
+        request_span, tool_span = exporter.get_finished_spans()
+        assert tool_span.name == "tools/call get_ticket_details"
+        assert tool_span.attributes["mcp.tool.name"] == "get_ticket_details"
+        assert request_span.name == "GET /tickets/{id}"
+        assert request_span.parent.span_id == tool_span.context.span_id
+        assert request_span.attributes["http.request.method"] == "GET"
+        assert request_span.attributes["url.template"] == "/tickets/{id}"
+        assert request_span.attributes["http.response.status_code"] == 200
+        assert request_span.attributes["http.response.body.size"] == len(
+            route.calls[0].response.content
+        )
+        traceparent = route.calls[0].request.headers["traceparent"]
+        assert f"{request_span.context.span_id:016x}" in traceparent
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_failed_request_span_has_error_status(self, exporter):
+        # Arrange
+        respx.get("https://api.tidio.com/tickets/42").mock(
+            return_value=httpx.Response(404)
+        )
+
+        # Act
+        with pytest.raises(TidioApiError):
+            await self.client.get("/tickets/42")
+
+        # Assert
+        (span,) = exporter.get_finished_spans()
+        assert span.attributes["http.response.status_code"] == 404
+        assert span.attributes["error.type"] == "404"
+        assert not span.status.is_ok
+
+    @pytest.mark.unit
+    def test_tool_span_continues_incoming_trace(self, exporter):
+        # Arrange
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        headers = {"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+
+        # Act
+        with tracing.tool_span("get_tickets", headers):
+            pass
+
+        # Assert
+        (span,) = exporter.get_finished_spans()
+        assert f"{span.context.trace_id:032x}" == trace_id
+        assert f"{span.parent.span_id:016x}" == "00f067aa0ba902b7"
+
+    @pytest.mark.unit
+    @respx.mock
+    async def test_disabled_tracing_records_nothing(self, exporter):
+        # Arrange
+        tracing.disable_tracing()
+        route = respx.get("https://api.tidio.com/tickets/42").mock(
+            return_value=httpx.Response(200, json={"id": 42})
+        )
+
+        # Act
+        with tracing.tool_span("get_ticket_details"):
+            await self.client.get("/tickets/42")
+
+        # Assert
+        assert exporter.get_finished_spans() == ()
+        assert "traceparent" not in route.calls[0].request.headers
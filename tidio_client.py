@@ -1,62 +1,562 @@
+import asyncio
+import copy
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from typing import Literal
+from urllib.parse import urlencode, urlsplit
 
-import requests
+import httpx
+
+import tracing
+from json_codec import JsonCodec, get_codec
+from json_stream import iter_items
+from metrics import ServerMetrics
+from rate_limiter import TokenBucket
+from response_cache import CacheBackend, ResponseCache
 
 
 class TidioApiError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry policy for failed Tidio API requests.
+
+    Delays use exponential backoff with full jitter, unless the API tells how long
+    to wait with Retry-After or X-RateLimit-* headers.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts, including the first one.
+        base_backoff (float): Backoff cap in seconds for the first retry, doubled
+            with every next retry.
+        max_backoff (float): Upper bound of the backoff in seconds.
+        deadline (float): Seconds after which no more retries are made.
+        retry_statuses (frozenset): HTTP statuses worth retrying.
+        retry_methods (frozenset): HTTP methods that are retried. Only idempotent
+            methods by default, as a retried POST or PATCH may be applied twice.
+    """
+
+    max_attempts: int = 3
+    base_backoff: float = 0.5
+    max_backoff: float = 8.0
+    deadline: float = 30.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    retry_methods: frozenset[str] = frozenset({"GET", "PUT", "DELETE"})
+
+    def delay(self, attempt: int, response: httpx.Response = None) -> float:
+        """
+        Args:
+            attempt (int): Number of the failed attempt, starting from 1.
+            response (httpx.Response, optional): Failed response, if any.
+
+        Returns:
+            float: Seconds to wait before the next attempt.
+        """
+        if response is not None:
+            server_delay = _server_delay(response.headers)
+            if server_delay is not None:
+                return server_delay
+
+        return random.uniform(
+            0, min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+        )
+
+
 class TidioApiClient:
     BASE_URL = "https://api.tidio.com"
 
-    def __init__(self, client_id: str, client_secret: str):
-        self.client = requests.Session()
-        self.client.headers.update(
-            {
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 15,
+        cache_ttls: dict[str, float] = None,
+        cache_stale_ttls: dict[str, float] = None,
+        cache_max_size: int = 256,
+        cache: CacheBackend = None,
+        retry_policy: RetryPolicy = None,
+        read_rate_limiter: TokenBucket = None,
+        write_rate_limiter: TokenBucket = None,
+        codec: JsonCodec = None,
+        metrics: ServerMetrics = None,
+        base_url: str = BASE_URL,
+    ):
+        """
+        Args:
+            client_id (str): Tidio OpenAPI client ID.
+            client_secret (str): Tidio OpenAPI client secret.
+            max_connections (int): Maximum number of concurrent connections in the pool.
+            max_keepalive_connections (int): Maximum number of idle connections kept alive.
+            keepalive_expiry (float): Seconds an idle connection is kept in the pool.
+            http2 (bool): Enable HTTP/2, so concurrent requests share a single connection.
+            timeout (float): Request timeout in seconds.
+            cache_ttls (dict, optional): GET responses to cache, as a mapping of endpoint
+                path to TTL in seconds, e.g. {"/departments": 300}. Path segments
+                in braces match any value, e.g. "/tickets/{ticket_id}".
+            cache_stale_ttls (dict, optional): Seconds an expired entry is still returned
+                while it is refreshed in the background, per endpoint path.
+            cache_max_size (int): Maximum number of cached responses.
+            cache (CacheBackend, optional): Cache backend, e.g. one shared between
+                processes. Defaults to an in-process ResponseCache of cache_max_size.
+            retry_policy (RetryPolicy, optional): Retry policy for failed requests.
+                Defaults to RetryPolicy().
+            read_rate_limiter (TokenBucket, optional): Limits GET requests, including
+                retries. Share one bucket between clients using the same credentials.
+            write_rate_limiter (TokenBucket, optional): Limits all other requests.
+            codec (JsonCodec, optional): Encodes request bodies and decodes
+                responses. Defaults to the fastest installed one.
+            metrics (ServerMetrics, optional): Records request latencies, retries,
+                sizes and cache lookups, e.g. shared by all clients of a server.
+            base_url (str): Tidio API URL, e.g. of a local stand-in for benchmarks.
+        """
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
                 "X-Tidio-Openapi-Client-Id": client_id,
                 "X-Tidio-Openapi-Client-Secret": client_secret,
                 "Accept": "application/json; version=1",
-            }
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            timeout=timeout,
         )
+        self.cache_ttls = cache_ttls or {}
+        self.cache_stale_ttls = cache_stale_ttls or {}
+        self.cache = cache or ResponseCache(max_size=cache_max_size)
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+        self._write_generation = 0
+        self._in_flight: dict[tuple[str, int], _Flight] = {}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.read_rate_limiter = read_rate_limiter
+        self.write_rate_limiter = write_rate_limiter
+        self.codec = codec or get_codec()
+        self.metrics = metrics or ServerMetrics()
 
-    def get(self, endpoint: str) -> dict:
-        return self._request("GET", endpoint)
+    async def get(self, endpoint: str, rate_limiter: TokenBucket = None) -> dict:
+        """
+        Args:
+            endpoint (str): The resource endpoint, including the query string.
+            rate_limiter (TokenBucket, optional): Limits the request in addition
+                to read_rate_limiter, e.g. to keep background syncs slower.
+        """
+        ttl = _match_template(self.cache_ttls, endpoint)
+        if ttl is None:
+            return await self._single_flight(
+                endpoint, lambda: self._request("GET", endpoint, None, rate_limiter)
+            )
+
+        entry = await self.cache.get(endpoint)
+        self.metrics.record_cache_lookup(
+            endpoint, "miss" if entry is None else "stale" if entry.stale else "hit"
+        )
+        if entry is not None:
+            if entry.stale:
+                self._schedule_refresh(endpoint, ttl)
 
-    def post(self, endpoint: str, json_data: dict = None) -> dict:
-        return self._request("POST", endpoint, json_data)
+            return entry.value
 
-    def put(self, endpoint: str, json_data: dict = None) -> dict:
-        return self._request("PUT", endpoint, json_data)
+        return await self._single_flight(
+            endpoint, lambda: self._fetch_and_cache(endpoint, ttl, rate_limiter)
+        )
+
+    async def post(self, endpoint: str, json_data: dict = None) -> dict:
+        return await self._write("POST", endpoint, json_data)
 
-    def patch(self, endpoint: str, json_data: dict = None) -> dict:
-        return self._request("PATCH", endpoint, json_data)
+    async def put(self, endpoint: str, json_data: dict = None) -> dict:
+        return await self._write("PUT", endpoint, json_data)
 
-    def delete(self, endpoint: str) -> dict:
-        return self._request("DELETE", endpoint)
+    async def patch(
+        self, endpoint: str, json_data: dict = None, cached_changes: dict = None
+    ) -> dict:
+        """
+        Args:
+            endpoint (str): The resource endpoint.
+            json_data (dict, optional): Request body.
+            cached_changes (dict, optional): Fields to merge into the cached response
+                of the endpoint, when the effect of the update on the GET representation
+                is known. Without it the cached response is evicted.
+        """
+        return await self._write("PATCH", endpoint, json_data, cached_changes)
+
+    async def delete(self, endpoint: str) -> dict:
+        return await self._write("DELETE", endpoint)
+
+    async def paginate(
+        self, endpoint: str, query_params: dict = None, rate_limiter: TokenBucket = None
+    ) -> AsyncIterator[dict]:
+        """
+        Walk a cursor-paginated endpoint, yielding one page at a time until
+        meta.cursor is null.
+
+        Args:
+            endpoint (str): The list endpoint, without a query string.
+            query_params (dict, optional): Query parameters for the first page.
+                May include a cursor to resume from.
+            rate_limiter (TokenBucket, optional): Limits the page requests in
+                addition to read_rate_limiter.
+
+        Yields:
+            Dict: Raw response of each page.
+        """
+        query_params = dict(query_params or {})
 
-    def _request(
+        while True:
+            page_endpoint = endpoint
+            if query_params:
+                page_endpoint += f"?{urlencode(query_params)}"
+
+            page = await self.get(page_endpoint, rate_limiter)
+            yield page
+
+            cursor = (page.get("meta") or {}).get("cursor")
+            if not cursor:
+                return
+
+            query_params["cursor"] = cursor
+
+    async def stream_items(
         self,
-        method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"],
+        endpoint: str,
+        items_key: str,
+        query_params: dict = None,
+        on_page: Callable[[dict], None] = None,
+        rate_limiter: TokenBucket = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Walk a cursor-paginated endpoint like paginate, but yield its items one at
+        a time. Every page is decoded while it is received, so memory use stays
+        flat however long the list is. Responses are neither cached nor shared
+        with concurrent requests.
+
+        Args:
+            endpoint (str): The list endpoint, without a query string.
+            items_key (str): Key of the items in a page, e.g. "contacts".
+            query_params (dict, optional): Query parameters for the first page.
+                May include a cursor to resume from.
+            on_page (Callable, optional): Called with the other fields of every
+                page, e.g. meta, once all its items were consumed.
+            rate_limiter (TokenBucket, optional): Limits the page requests in
+                addition to read_rate_limiter.
+
+        Yields:
+            Dict: Each item of each page.
+
+        Raises:
+            TidioApiError: For timeout, HTTP or decoding errors. An error while a
+                page is received is raised after the items decoded so far.
+        """
+        query_params = dict(query_params or {})
+
+        while True:
+            page_endpoint = endpoint
+            if query_params:
+                page_endpoint += f"?{urlencode(query_params)}"
+
+            page_rest = {}
+            response = await self._send(
+                "GET", page_endpoint, stream=True, rate_limiter=rate_limiter
+            )
+            try:
+                async for item in iter_items(
+                    response.aiter_text(), items_key, page_rest
+                ):
+                    yield item
+            except ValueError as e:
+                raise TidioApiError(f"Tidio API returned invalid JSON. {e}") from None
+            except httpx.HTTPError as e:
+                raise TidioApiError(f"Tidio API request failed. {e}") from None
+            finally:
+                await response.aclose()
+
+            if on_page is not None:
+                on_page(page_rest)
+
+            cursor = (page_rest.get("meta") or {}).get("cursor")
+            if not cursor:
+                return
+
+            query_params["cursor"] = cursor
+
+    async def invalidate(self, endpoint: str, cached_changes: dict = None) -> None:
+        """
+        Evict cached responses of the written resource, its parent collections
+        and its sub-resources, or merge cached_changes into the resource itself.
+        """
+        self._write_generation += 1
+        path = urlsplit(endpoint).path
+        resource = "/" + path.strip("/").split("/")[0]
+
+        for key in await self.cache.keys(prefix=resource):
+            key_path = urlsplit(key).path
+            if key_path == path and cached_changes is not None:
+                await self.cache.update(key, cached_changes)
+            elif _paths_related(key_path, path):
+                await self.cache.delete(key)
+
+    async def aclose(self) -> None:
+        for task in self._refresh_tasks.values():
+            task.cancel()
+
+        await self.client.aclose()
+
+    async def _write(
+        self,
+        method: Literal["POST", "PUT", "PATCH", "DELETE"],
         endpoint: str,
         json_data: dict = None,
+        cached_changes: dict = None,
+    ) -> dict:
+        try:
+            response = await self._request(method, endpoint, json_data)
+        except BaseException:
+            # The write may or may not have reached the API, so the cached
+            # resource is evicted instead of updated with the changes.
+            await self.invalidate(endpoint)
+            raise
+
+        await self.invalidate(endpoint, cached_changes)
+
+        return response
+
+    async def _single_flight(
+        self, endpoint: str, fetch: Callable[[], Awaitable[dict]]
     ) -> dict:
         """
-        Raises:
-            TidioApiError: For timeout or HTTP errors
+        Share one upstream request between concurrent identical GETs. Requests
+        made after a write never join a flight started before it.
         """
-        url = f"{self.BASE_URL}{endpoint}"
+        key = (endpoint, self._write_generation)
+        flight = self._in_flight.get(key)
+
+        if flight is not None:
+            flight.followers += 1
+            return copy.deepcopy(await asyncio.shield(flight.task))
+
+        flight = _Flight(task=asyncio.ensure_future(fetch()))
+        self._in_flight[key] = flight
 
         try:
-            response = self.client.request(method, url, json=json_data, timeout=15)
-            response.raise_for_status()
-        except requests.exceptions.Timeout:
-            raise TidioApiError("Tidio API request timed out.") from None
-        except requests.exceptions.RequestException as e:
-            error_text = e.response.text if e.response is not None else ""
-            raise TidioApiError(f"Tidio API request failed. {e} {error_text}") from None
+            response = await asyncio.shield(flight.task)
+        finally:
+            self._in_flight.pop(key, None)
+
+        # Followers get their own copies, so the response is never shared.
+        return copy.deepcopy(response) if flight.followers else response
+
+    async def _fetch_and_cache(
+        self, endpoint: str, ttl: float, rate_limiter: TokenBucket = None
+    ) -> dict:
+        write_generation = self._write_generation
+        response = await self._request("GET", endpoint, None, rate_limiter)
+
+        # Skip caching when a write happened in the meantime, the response may
+        # already be outdated.
+        if write_generation == self._write_generation:
+            stale_ttl = _match_template(self.cache_stale_ttls, endpoint) or 0
+            await self.cache.set(endpoint, response, ttl, stale_ttl)
+            if write_generation != self._write_generation:
+                # A write invalidated the resource while the response was stored.
+                await self.cache.delete(endpoint)
+
+        return response
+
+    def _schedule_refresh(self, endpoint: str, ttl: float) -> None:
+        if endpoint in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch_and_cache(endpoint, ttl)
+            except TidioApiError:
+                pass
+            finally:
+                del self._refresh_tasks[endpoint]
+
+        self._refresh_tasks[endpoint] = asyncio.create_task(refresh())
+
+    async def _request(
+        self,
+        method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"],
+        endpoint: str,
+        json_data: dict = None,
+        rate_limiter: TokenBucket = None,
+    ) -> dict:
+        """
+        Raises:
+            TidioApiError: For timeout or HTTP errors, once retries are exhausted
+        """
+        response = await self._send(
+            method, endpoint, json_data, rate_limiter=rate_limiter
+        )
 
         if not response.content:
             return {}
 
-        return response.json()
+        return self.codec.loads(response.content)
+
+    async def _send(
+        self,
+        method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"],
+        endpoint: str,
+        json_data: dict = None,
+        stream: bool = False,
+        rate_limiter: TokenBucket = None,
+    ) -> httpx.Response:
+        """
+        Send a request with rate limiting and retries.
+
+        Args:
+            stream (bool): Return as soon as the headers of a successful response
+                are received. The caller reads the body and closes the response.
+            rate_limiter (TokenBucket, optional): Acquired before the read or
+                write rate limiter of every attempt.
+
+        Raises:
+            TidioApiError: For timeout or HTTP errors, once retries are exhausted
+        """
+        policy = self.retry_policy
+        rate_limiters = [
+            limiter
+            for limiter in [
+                rate_limiter,
+                self.read_rate_limiter if method == "GET" else self.write_rate_limiter,
+            ]
+            if limiter is not None
+        ]
+        content = None
+        headers = {}
+        if json_data is not None:
+            content = self.codec.dumps(json_data)
+            headers["Content-Type"] = "application/json"
+
+        with (
+            self.metrics.track_request(method, endpoint) as record,
+            tracing.request_span(method, endpoint, record),
+        ):
+            tracing.inject_context(headers)
+            started_at = time.monotonic()
+            attempt = 0
+
+            while True:
+                attempt += 1
+
+                for limiter in rate_limiters:
+                    await limiter.acquire()
+
+                try:
+                    request = self.client.build_request(
+                        method, endpoint, content=content, headers=headers
+                    )
+                    response = await self.client.send(request, stream=stream)
+                    if stream and response.is_error:
+                        # The error body is part of the error message.
+                        await response.aread()
+                    record.status = str(response.status_code)
+                    response.raise_for_status()
+                    break
+                except httpx.TimeoutException:
+                    record.status = "timeout"
+                    error = TidioApiError("Tidio API request timed out.")
+                    delay = policy.delay(attempt)
+                except httpx.HTTPStatusError as e:
+                    error = TidioApiError(
+                        f"Tidio API request failed. {e} {e.response.text}"
+                    )
+                    if e.response.status_code not in policy.retry_statuses:
+                        raise error from None
+                    delay = policy.delay(attempt, e.response)
+                except httpx.HTTPError as e:
+                    record.status = "error"
+                    error = TidioApiError(f"Tidio API request failed. {e}")
+                    delay = policy.delay(attempt)
+
+                elapsed = time.monotonic() - started_at
+                if (
+                    method not in policy.retry_methods
+                    or attempt >= policy.max_attempts
+                    or elapsed + delay > policy.deadline
+                ):
+                    raise error from None
+
+                record.retries += 1
+                await asyncio.sleep(delay)
+
+            if not stream:
+                record.size = len(response.content)
+
+        return response
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Future
+    followers: int = 0
+
+
+def _server_delay(headers: httpx.Headers) -> float | None:
+    """
+    Returns:
+        float | None: Seconds the API asked to wait, or None when it did not say.
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(
+                0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()
+            )
+        except (TypeError, ValueError):
+            pass
+
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            reset = float(headers.get("X-RateLimit-Reset", ""))
+        except ValueError:
+            return None
+
+        # The reset is either a Unix timestamp or a number of seconds.
+        if reset > 1_000_000_000:
+            reset -= time.time()
+
+        return max(0.0, reset)
+
+    return None
+
+
+def _match_template(mapping: dict[str, float], endpoint: str) -> float | None:
+    path_parts = urlsplit(endpoint).path.strip("/").split("/")
+
+    for template, value in mapping.items():
+        template_parts = template.strip("/").split("/")
+        if len(template_parts) == len(path_parts) and all(
+            (t.startswith("{") and t.endswith("}")) or t == p
+            for t, p in zip(template_parts, path_parts, strict=True)
+        ):
+            return value
+
+    return None
+
+
+def _paths_related(first: str, second: str) -> bool:
+    first_parts = first.strip("/").split("/")
+    second_parts = second.strip("/").split("/")
+    common = min(len(first_parts), len(second_parts))
+
+    return first_parts[:common] == second_parts[:common]
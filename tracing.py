@@ -0,0 +1,136 @@
+from collections.abc import Mapping
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING
+
+from metrics import RequestRecord, endpoint_template
+
+# Imported by configure_tracing, so servers without tracing start faster.
+propagate = trace = None
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Tracer
+
+# Reused by every span helper while tracing is disabled, so a disabled tracer
+# costs one global lookup per call.
+_NOOP = nullcontext()
+_tracer: "Tracer | None" = None
+
+
+def configure_tracing(service_name: str = "tidio-mcp", tracer_provider=None) -> None:
+    """
+    Enable tracing of tool calls and Tidio API requests.
+
+    Args:
+        service_name (str): Service name of exported spans.
+        tracer_provider (TracerProvider, optional): Provider to create spans
+            with. Defaults to one exporting over OTLP/HTTP to the collector of
+            OTEL_EXPORTER_OTLP_ENDPOINT, http://localhost:4318 by default.
+
+    Raises:
+        ImportError: If the OpenTelemetry packages are not installed.
+    """
+    global _tracer, propagate, trace
+
+    try:
+        from opentelemetry import propagate, trace
+    except ImportError:
+        raise ImportError(
+            "Tracing requires the OpenTelemetry packages. "
+            "Install them with: pip install 'tidio-mcp[tracing]'"
+        ) from None
+
+    if tracer_provider is None:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            raise ImportError(
+                "Tracing requires the OpenTelemetry SDK and OTLP exporter. "
+                "Install them with: pip install 'tidio-mcp[tracing]'"
+            ) from None
+
+        tracer_provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name})
+        )
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+
+    _tracer = tracer_provider.get_tracer("tidio-mcp")
+
+
+def disable_tracing() -> None:
+    global _tracer
+
+    _tracer = None
+
+
+def tool_span(tool: str, headers: Mapping[str, str] = None):
+    """
+    Span of one tool call, the parent of the API requests made by the tool.
+
+    Args:
+        tool (str): Tool name.
+        headers (Mapping, optional): Headers of the MCP HTTP request. A trace
+            context in them, e.g. traceparent, becomes the parent of the span.
+    """
+    if _tracer is None:
+        return _NOOP
+
+    return _tracer.start_as_current_span(
+        f"tools/call {tool}",
+        context=propagate.extract(headers) if headers else None,
+        kind=trace.SpanKind.SERVER,
+        attributes={"mcp.tool.name": tool},
+    )
+
+
+def request_span(method: str, endpoint: str, record: RequestRecord):
+    """
+    Span of one Tidio API request, including its retries.
+
+    Args:
+        method (str): HTTP method.
+        endpoint (str): Endpoint, recorded as its path template.
+        record (RequestRecord): Outcome of the request, recorded as status,
+            retries and size attributes when the span ends.
+    """
+    if _tracer is None:
+        return _NOOP
+
+    return _request_span(method, endpoint, record)
+
+
+@contextmanager
+def _request_span(method: str, endpoint: str, record: RequestRecord):
+    template = endpoint_template(endpoint)
+
+    with _tracer.start_as_current_span(
+        f"{method} {template}",
+        kind=trace.SpanKind.CLIENT,
+        attributes={"http.request.method": method, "url.template": template},
+    ) as span:
+        try:
+            yield span
+        finally:
+            span.set_attribute("tidio.retries", record.retries)
+            if record.size is not None:
+                span.set_attribute("http.response.body.size", record.size)
+
+            if record.status.isdigit():
+                span.set_attribute("http.response.status_code", int(record.status))
+            if not record.status.isdigit() or int(record.status) >= 400:
+                span.set_attribute("error.type", record.status)
+                span.set_status(trace.StatusCode.ERROR)
+
+
+def inject_context(headers: dict) -> None:
+    """
+    Context propagation hook: add the trace context of the current span to
+    outgoing request headers, e.g. traceparent. Does nothing while tracing is
+    disabled.
+    """
+    if _tracer is not None:
+        propagate.inject(headers)